@@ -1,5 +1,24 @@
 from .mt5gw import MetaTraderManager
-from . import mtds_ni
+from .session import MT5Session
+from .broker import MT5Broker
+from .symbols import SymbolCatalog
+from .bars import BarBuilder
+from .orders import OrderExecutor, LatencyHistogram
+from .watch import TradeWatcher
+from .ringbuffer import RingBuffer
+from .depth import DepthRecorder
+from .ticks import TickRecorder
+from .profiling import FetchProfiler
+from .aio import AsyncMetaTraderManager
+from .splits import WalkForward
+from . import registry
 
 __version__ = '0.1.0'
-__all__ = ['MetaTraderManager', 'mtds_ni']
+__all__ = ['MetaTraderManager', 'AsyncMetaTraderManager', 'MT5Session', 'MT5Broker', 'SymbolCatalog', 'BarBuilder', 'OrderExecutor', 'LatencyHistogram', 'TradeWatcher', 'RingBuffer', 'DepthRecorder', 'TickRecorder', 'FetchProfiler', 'WalkForward', 'mtds_ni']
+
+
+def __getattr__(name):
+    # mtds_ni needs TA-Lib, so it is only imported when first used
+    if name == 'mtds_ni':
+        return registry.load('mtds_ni')
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+from .mt5gw import MetaTraderManager
+from .broker import PRIORITY_ORDER, PRIORITY_QUERY
+
+
+class AsyncMetaTraderManager:
+    """
+    asyncio facade over MetaTraderManager.
+
+    Terminal calls are awaited on the manager's broker thread, so they never
+    block the event loop and stay serialized with every other user of the
+    same manager. fetch() runs its pandas pipeline in the loop's default
+    executor; its history download still goes through the broker at bulk
+    priority, behind any pending order operations.
+
+    Parameters:
+    - manager (MetaTraderManager, optional): Manager to wrap. A new one is created if omitted.
+    - **kwargs: Forwarded to MetaTraderManager() when no manager is given.
+    """
+
+    def __init__(self, manager=None, **kwargs):
+        self.manager = manager if manager is not None else MetaTraderManager(**kwargs)
+
+    def _submit(self, priority, func, *args, **kwargs):
+        return asyncio.wrap_future(self.manager.broker.submit(priority, func, *args, **kwargs))
+
+    async def fetch(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.manager.fetch, *args, **kwargs))
+
+    async def get_last_tick(self, symbol):
+        return await self._submit(PRIORITY_QUERY, self.manager.get_last_tick, symbol)
+
+    async def get_positions(self, instrument=None):
+        return await self._submit(PRIORITY_QUERY, self.manager.get_positions, instrument)
+
+    async def get_orders(self, instrument=None):
+        return await self._submit(PRIORITY_QUERY, self.manager.get_orders, instrument)
+
+    async def get_symbol_info(self, symbol):
+        return await self._submit(PRIORITY_QUERY, self.manager.get_symbol_info, symbol)
+
+    async def place_order(self, order):
+        return await self._submit(PRIORITY_ORDER, self.manager.place_order, order)
+
+    async def close_position(self, ticket, volume=None, idempotency_key=None):
+        return await self._submit(PRIORITY_ORDER, self.manager.close_position, ticket, volume, idempotency_key)
+
+    async def close_positions(self, symbol=None, tickets=None, idempotency_key=None):
+        return await self._submit(PRIORITY_ORDER, self.manager.close_positions, symbol, tickets, idempotency_key)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.manager.close)
+
+    async def __aenter__(self):
+        await self._submit(PRIORITY_QUERY, self.manager.session.ensure)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
@@ -0,0 +1,419 @@
+import numpy as np
+import pandas as pd
+from .history import TIMEFRAME_SECONDS
+
+# Bars built by this module; time is the bar open time in milliseconds since epoch
+BAR_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                      ('close', '<f8'), ('volume', '<f8')])
+
+DAY_MS = 86400000
+
+
+def tick_prices(ticks, price='bid'):
+    """
+    Price series used to build bars from an MT5 ticks array.
+
+    Parameters:
+    - ticks: numpy structured array as returned by copy_ticks_*.
+    - price (str): 'bid', 'ask', 'mid' or 'last'.
+
+    Returns:
+    - float64 numpy array aligned with `ticks`.
+    """
+    if price == 'mid':
+        return (ticks['bid'] + ticks['ask']) * 0.5
+    if price in ('bid', 'ask', 'last'):
+        return ticks[price].astype(np.float64, copy=False)
+    raise ValueError("Unsupported tick price: %s" % price)
+
+
+def tick_volumes(ticks, volume='tick'):
+    """Per-tick volume: 1 per tick ('tick', like MT5 tick_volume) or the traded volume ('real')."""
+    if volume == 'tick':
+        return np.ones(len(ticks))
+    if volume == 'real':
+        if 'volume_real' in ticks.dtype.names:
+            return ticks['volume_real'].astype(np.float64, copy=False)
+        return ticks['volume'].astype(np.float64)
+    raise ValueError("Unsupported tick volume: %s" % volume)
+
+
+def interval_ms(interval):
+    """
+    Bar length in milliseconds from a timeframe name or pandas offset alias ('1h', '90s',
+    '7min'), Timedelta or seconds.
+
+    Timeframe names mean what they mean everywhere else in the package: '1m' is the
+    monthly timeframe (not a minute, as pd.Timedelta would read it), and is rejected
+    because months have no fixed length. Use '1min' for one-minute bars.
+    """
+    if isinstance(interval, (int, np.integer, float)):
+        return int(interval * 1000)
+    if isinstance(interval, str) and interval in TIMEFRAME_SECONDS:
+        if interval == '1m':
+            raise ValueError("'1m' is the monthly timeframe, which has no fixed length; use '1min' for minutes")
+        return TIMEFRAME_SECONDS[interval] * 1000
+    return int(pd.Timedelta(interval).total_seconds() * 1000)
+
+
+def anchor_ms(anchor):
+    """Offset of a time of day ('09:30') from midnight, in milliseconds."""
+    if anchor is None:
+        return None
+    if not isinstance(anchor, str):
+        return int(pd.Timedelta(anchor).total_seconds() * 1000)
+    parts = [int(p) for p in anchor.split(':')] + [0, 0]
+    return ((parts[0] * 60 + parts[1]) * 60 + parts[2]) * 1000
+
+
+def check_anchor(step_ms, anchor=None):
+    """Raise a ValueError for anchored bars longer than one day, which cannot restart every day."""
+    if anchor is not None and step_ms > DAY_MS:
+        raise ValueError("Anchored bars restart every day, so they cannot be longer than one day")
+
+
+def bar_keys(times_ms, step_ms, anchor=None):
+    """
+    Integer bucket id of each timestamp.
+
+    Without an anchor buckets are aligned to the epoch. With an anchor (time of
+    day in ms) buckets restart every day at the anchor, so the first bar of each
+    session always opens at the anchor time (session-anchored bars); the bar
+    length must then be at most one day (see check_anchor).
+    """
+    check_anchor(step_ms, anchor)
+    if anchor is None:
+        return times_ms // step_ms
+    shifted = times_ms - anchor
+    day = shifted // DAY_MS
+    per_day = -(-DAY_MS // step_ms)
+    return day * per_day + (shifted - day * DAY_MS) // step_ms
+
+
+def key_times(keys, step_ms, anchor=None):
+    """Open time (ms) of each bucket returned by bar_keys()."""
+    if anchor is None:
+        return keys * step_ms
+    per_day = -(-DAY_MS // step_ms)
+    day = keys // per_day
+    return day * DAY_MS + anchor + (keys - day * per_day) * step_ms
+
+
+def bucket_starts(times_ms, step_ms, anchor=None):
+    """
+    First row of every non-empty bucket of a sorted time array.
+
+    Only the bucket edges are computed (one per possible bar, not one per
+    observation) and located with a single searchsorted call.
+
+    Returns:
+    - (starts, open_times): Row index where each bar starts and the bar open time in ms.
+    """
+    first, last = bar_keys(times_ms[[0, -1]], step_ms, anchor)
+    edges = key_times(np.arange(first, last + 2, dtype=np.int64), step_ms, anchor)
+    pos = np.searchsorted(times_ms, edges)
+    nonempty = pos[:-1] < pos[1:]
+    return pos[:-1][nonempty], edges[:-1][nonempty]
+
+
+def aggregate(starts, open_times, prices, volumes):
+    """
+    Reduce runs of observations into OHLCV rows.
+
+    Parameters:
+    - starts: First row of each bar (as returned by bucket_starts).
+    - open_times: Open time (ms) of each bar.
+    - prices, volumes: Contiguous float64 arrays, one value per observation.
+
+    Returns:
+    - numpy structured array with BAR_DTYPE.
+    """
+    out = np.empty(len(starts), dtype=BAR_DTYPE)
+    if len(starts) == 0:
+        return out
+    out['time'] = open_times
+    out['open'] = prices[starts]
+    out['high'] = np.maximum.reduceat(prices, starts)
+    out['low'] = np.minimum.reduceat(prices, starts)
+    out['close'] = prices[np.r_[starts[1:], len(prices)] - 1]
+    out['volume'] = np.add.reduceat(volumes, starts)
+    return out
+
+
+def ticks_to_bars(ticks, interval, price='bid', volume='tick', anchor=None):
+    """
+    Build OHLCV bars of any length from an MT5 ticks array.
+
+    Fully vectorized: bar edges are located in the tick times with one
+    searchsorted call and OHLCV values come from ufunc.reduceat over contiguous
+    copies of the tick fields, so the cost is a few linear passes over the ticks.
+
+    Parameters:
+    - ticks: numpy structured array as returned by copy_ticks_* (sorted by time_msc).
+    - interval: Bar length ('90s', '7min', pd.Timedelta or seconds).
+    - price (str): Tick price to aggregate ('bid', 'ask', 'mid', 'last').
+    - volume (str): 'tick' counts ticks, 'real' sums traded volume.
+    - anchor (str, optional): Time of day ('09:30') at which bars restart every day.
+
+    Returns:
+    - numpy structured array with BAR_DTYPE (time is the bar open time in ms).
+    """
+    if len(ticks) == 0:
+        return np.empty(0, dtype=BAR_DTYPE)
+    prices = np.ascontiguousarray(tick_prices(ticks, price), dtype=np.float64)
+    times = np.ascontiguousarray(ticks['time_msc'], dtype=np.int64)
+    volumes = np.ascontiguousarray(tick_volumes(ticks, volume), dtype=np.float64)
+    if prices.min() <= 0:
+        # Ticks that did not update the chosen price carry 0
+        valid = prices > 0
+        prices, times, volumes = prices[valid], times[valid], volumes[valid]
+        if len(prices) == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+    starts, open_times = bucket_starts(times, interval_ms(interval), anchor_ms(anchor))
+    return aggregate(starts, open_times, prices, volumes)
+
+
+def concat_bars(parts):
+    """
+    Concatenate bar arrays built from consecutive tick chunks, merging a bar that
+    was split across a chunk boundary.
+    """
+    parts = [p for p in parts if p is not None and len(p) > 0]
+    if not parts:
+        return np.empty(0, dtype=BAR_DTYPE)
+    out = [parts[0].copy()]
+    for p in parts[1:]:
+        prev = out[-1]
+        if len(prev) and prev['time'][-1] == p['time'][0]:
+            last = prev[-1]
+            last['high'] = max(last['high'], p['high'][0])
+            last['low'] = min(last['low'], p['low'][0])
+            last['close'] = p['close'][0]
+            last['volume'] += p['volume'][0]
+            p = p[1:]
+        out.append(p.copy())
+    return np.concatenate(out)
+
+
+def bars_to_frame(bars):
+    """OHLCV DataFrame indexed by 'Date', in the same layout fetch() builds from MT5 rates."""
+    index = pd.DatetimeIndex(bars['time'].view('datetime64[ms]').astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame({'open': bars['open'], 'high': bars['high'], 'low': bars['low'],
+                         'close': bars['close'], 'volume': bars['volume']}, index=index)
+
+
+# Information-driven bars ('<kind>:<parameter>' timeframes, e.g. 'volume:5e5')
+INFO_BAR_KINDS = ('tick', 'volume', 'dollar', 'imbalance')
+
+def parse_bar_spec(timeframe):
+    """
+    Split an information-driven bar spec into (kind, parameter).
+
+    'tick:1000', 'volume:5e5' and 'dollar:1e7' close a bar every N ticks, units of
+    volume or units of notional; 'imbalance:100' builds tick-imbalance bars with an
+    initial expectation of 100 ticks per bar. Returns None for any other timeframe.
+    """
+    if not isinstance(timeframe, str) or ':' not in timeframe:
+        return None
+    kind, _, value = timeframe.partition(':')
+    if kind not in INFO_BAR_KINDS:
+        return None
+    value = float(value)
+    if value <= 0:
+        raise ValueError("Bar threshold must be positive: %s" % timeframe)
+    return kind, value
+
+
+def _imbalance_closes(prices, state, alpha, min_ticks, max_ticks, closes):
+    """
+    Tick-imbalance bar kernel.
+
+    state holds [last_price, last_sign, theta, expected_ticks, expected_imbalance,
+    ticks_in_bar] and is updated in place so the next chunk continues the open bar.
+    Writes the index of every closing tick into `closes` and returns their count.
+    """
+    last_price = state[0]
+    sign = state[1]
+    theta = state[2]
+    exp_t = state[3]
+    exp_b = state[4]
+    count = state[5]
+    n = 0
+    for i in range(len(prices)):
+        p = prices[i]
+        if p > last_price:
+            sign = 1.0
+        elif p < last_price:
+            sign = -1.0
+        last_price = p
+        theta += sign
+        count += 1.0
+        if count >= max_ticks or (count >= min_ticks and abs(theta) >= exp_t * abs(exp_b)):
+            exp_t += alpha * (count - exp_t)
+            exp_b += alpha * (theta / count - exp_b)
+            closes[n] = i
+            n += 1
+            theta = 0.0
+            count = 0.0
+    state[0] = last_price
+    state[1] = sign
+    state[2] = theta
+    state[3] = exp_t
+    state[4] = exp_b
+    state[5] = count
+    return n
+
+
+_kernels = {}
+
+
+def imbalance_kernel():
+    """_imbalance_closes compiled with numba when it is installed; numba is imported on first use."""
+    kernel = _kernels.get('imbalance')
+    if kernel is None:
+        try:
+            from numba import njit
+            kernel = njit(cache=False, nogil=True)(_imbalance_closes)
+        except ImportError:
+            kernel = _imbalance_closes
+        _kernels['imbalance'] = kernel
+    return kernel
+
+
+class BarBuilder:
+    """
+    Stateful builder of tick, volume, dollar and tick-imbalance bars.
+
+    Feed tick chunks in time order to update(); every call returns the bars
+    completed by that chunk and keeps the open bar (and the accumulated volume or
+    imbalance state) for the next one, so chunked downloads and live streams give
+    the same bars as a single pass over all ticks.
+
+    Tick, volume and dollar bars use a cumulative sum and threshold crossing: a
+    tick belongs to bar floor(S / threshold), where S is the amount accumulated
+    before it. A tick that crosses several thresholds closes a single bar and the
+    excess counts towards the next one, so bar edges stay on a fixed grid of
+    cumulative volume. Imbalance bars follow the tick rule and close when the
+    signed tick count exceeds E[T] * |E[b]| (both exponentially weighted over
+    past bars); the loop is compiled with numba when it is installed.
+
+    Parameters:
+    - kind (str): 'tick', 'volume', 'dollar' or 'imbalance'.
+    - threshold (float): Ticks, volume or notional per bar; for 'imbalance', the initial E[T].
+    - price (str): Tick price to aggregate ('bid', 'ask', 'mid', 'last').
+    - volume (str): Output volume column: 'tick' counts ticks, 'real' sums traded volume.
+    - alpha (float): EWMA weight of the imbalance expectations.
+    - min_ticks, max_ticks (int, optional): Bounds on imbalance bar length
+      (default threshold / 10 and threshold * 10).
+    """
+
+    def __init__(self, kind, threshold, price='bid', volume='tick', alpha=0.1, min_ticks=None, max_ticks=None):
+        if kind not in INFO_BAR_KINDS:
+            raise ValueError("Unsupported bar type: %s" % kind)
+        self.kind = kind
+        self.threshold = float(threshold)
+        self.price = price
+        self.volume = volume
+        self.alpha = alpha
+        self.min_ticks = max(1, int(self.threshold // 10)) if min_ticks is None else min_ticks
+        self.max_ticks = max(self.min_ticks, int(self.threshold * 10)) if max_ticks is None else max_ticks
+        self.carry = 0.0
+        self.state = None
+        self.pending = None
+
+    def _quantities(self, ticks, prices, valid):
+        if self.kind == 'tick':
+            return np.ones(len(prices))
+        amount = tick_volumes(ticks, 'real')
+        if valid is not None:
+            amount = amount[valid]
+        if self.kind == 'dollar':
+            return amount * prices
+        return np.ascontiguousarray(amount, dtype=np.float64)
+
+    def _threshold_starts(self, quantities):
+        cum = np.cumsum(quantities)
+        cum += self.carry
+        ids = np.floor((cum - quantities) / self.threshold).astype(np.int64)
+        starts = np.r_[0, np.flatnonzero(np.diff(ids)) + 1]
+        total = cum[-1]
+        closed = np.floor(total / self.threshold) > ids[-1]
+        self.carry = total - np.floor(total / self.threshold) * self.threshold
+        return starts, closed
+
+    def _imbalance_starts(self, prices):
+        if self.state is None:
+            # Seed E[b] with the tick-rule imbalance of the first expected bar
+            head = prices[:int(self.threshold) + 1]
+            signs = np.sign(np.diff(head)) if len(head) > 1 else np.zeros(1)
+            self.state = np.array([prices[0], 0.0, 0.0, self.threshold, np.mean(signs), 0.0])
+        closes = np.empty(len(prices), dtype=np.int64)
+        n = imbalance_kernel()(prices, self.state, self.alpha, self.min_ticks, self.max_ticks, closes)
+        ends = closes[:n]
+        starts = np.r_[0, ends + 1]
+        closed = n > 0 and ends[-1] == len(prices) - 1
+        if closed:
+            starts = starts[:-1]
+        return starts, closed
+
+    def update(self, ticks):
+        """
+        Add a chunk of ticks (numpy structured array sorted by time_msc).
+
+        Returns:
+        - numpy structured array with BAR_DTYPE holding the bars completed by this chunk.
+        """
+        if ticks is None or len(ticks) == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        prices = np.ascontiguousarray(tick_prices(ticks, self.price), dtype=np.float64)
+        times = np.ascontiguousarray(ticks['time_msc'], dtype=np.int64)
+        volumes = np.ascontiguousarray(tick_volumes(ticks, self.volume), dtype=np.float64)
+        valid = None
+        if prices.min() <= 0:
+            valid = prices > 0
+            prices, times, volumes = prices[valid], times[valid], volumes[valid]
+            if len(prices) == 0:
+                return np.empty(0, dtype=BAR_DTYPE)
+
+        if self.kind == 'imbalance':
+            starts, closed = self._imbalance_starts(prices)
+        elif self.kind == 'tick':
+            step, held = int(self.threshold), int(self.carry)
+            starts = np.r_[0, np.arange(step - held, len(prices), step)]
+            self.carry = float((held + len(prices)) % step)
+            closed = self.carry == 0
+        else:
+            starts, closed = self._threshold_starts(self._quantities(ticks, prices, valid))
+        bars = aggregate(starts, times[starts], prices, volumes)
+
+        if self.pending is not None:
+            first, prev = bars[0], self.pending
+            first['time'] = prev['time']
+            first['open'] = prev['open']
+            first['high'] = max(first['high'], prev['high'])
+            first['low'] = min(first['low'], prev['low'])
+            first['volume'] += prev['volume']
+        if closed:
+            self.pending = None
+            return bars
+        self.pending = bars[-1].copy()
+        return bars[:-1]
+
+    def flush(self):
+        """Open bar built so far (BAR_DTYPE array with 0 or 1 rows); the builder keeps its state."""
+        if self.pending is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.array([self.pending], dtype=BAR_DTYPE)
+
+
+def info_bars(ticks, kind, threshold, price='bid', volume='tick', include_open=True, **kwargs):
+    """
+    Build tick, volume, dollar or tick-imbalance bars from one ticks array.
+
+    Convenience wrapper around BarBuilder; see it for parameters.
+    """
+    builder = BarBuilder(kind, threshold, price=price, volume=volume, **kwargs)
+    bars = builder.update(ticks)
+    if include_open:
+        bars = np.concatenate([bars, builder.flush()])
+    return bars
@@ -0,0 +1,79 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+# Lower values are served first
+PRIORITY_ORDER = 0
+PRIORITY_QUERY = 5
+PRIORITY_HISTORY = 10
+
+
+class MT5Broker:
+    """
+    Serializes every MetaTrader 5 call on one dedicated worker thread.
+
+    The MetaTrader5 Python API talks to the terminal over a single IPC channel
+    and is not safe to call from several threads. Calls are queued by priority
+    (then by submission order), so order operations jump ahead of queued bulk
+    history downloads. Calls made from the worker thread itself run inline,
+    which keeps nested calls from deadlocking.
+    """
+
+    def __init__(self, name="mt5gw-broker"):
+        self.name = name
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def stop(self, wait=True):
+        with self.lock:
+            thread = self.thread
+            self.thread = None
+        if thread is None or not thread.is_alive():
+            return
+        # The sentinel goes behind everything already queued
+        self.queue.put((float('inf'), next(self.counter), None, None, None, None))
+        if wait and threading.current_thread() is not thread:
+            thread.join()
+
+    def in_worker(self):
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, priority, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return a concurrent.futures.Future for its result."""
+        future = Future()
+        if self.in_worker():
+            self._execute(future, func, args, kwargs)
+            return future
+        self.start()
+        self.queue.put((priority, next(self.counter), future, func, args, kwargs))
+        return future
+
+    def call(self, priority, func, *args, **kwargs):
+        """Run func on the worker thread and block until it returns."""
+        return self.submit(priority, func, *args, **kwargs).result()
+
+    @staticmethod
+    def _execute(future, func, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            # BaseException as well: a SystemExit raised by a call must not kill the worker
+            future.set_exception(e)
+
+    def _run(self):
+        while True:
+            _, _, future, func, args, kwargs = self.queue.get()
+            if future is None:
+                return
+            self._execute(future, func, args, kwargs)
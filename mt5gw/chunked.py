@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+
+
+class BlockWriter:
+    """
+    Appends feature blocks to one file as they are finished.
+
+    '.parquet' files are written with pyarrow, one row group per block; any other
+    extension is written as CSV, with the header taken from the first block.
+
+    Parameters:
+    - path (str): Output file; an existing file is replaced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.writer = None
+        self.columns = None
+        self.rows = 0
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame):
+        header = self.columns is None
+        if header:
+            self.columns = list(frame.columns)
+        elif list(frame.columns) != self.columns:
+            raise ValueError("Block columns differ from the first block")
+        if self.parquet:
+            try:
+                import pyarrow
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Writing .parquet files requires pyarrow")
+            table = pyarrow.Table.from_pandas(frame, preserve_index=True)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.rename_axis(columns=None).to_csv(self.path, mode='a', header=header)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def trim_warmup(rf, start):
+    """Rows of `rf` from `start` on, i.e. without the warm-up bars prepended to a block."""
+    return rf[rf.index >= start]
+
+
+def warmup_tail(frame, warmup):
+    """Last `warmup` bars of `frame` (none for warmup=0), prepended to the next block."""
+    return frame.iloc[max(len(frame) - int(warmup), 0):]
+
+
+def concat_blocks(tail, block):
+    """`block` with the warm-up bars of the previous block prepended."""
+    return block if tail is None or len(tail) == 0 else pd.concat([tail, block])
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+
+# Column groups of cross_asset_features()
+CROSS_FEATURES = ('corr', 'cov', 'beta', 'zscore')
+
+# Window variances at or below this count as flat. The moments are of log returns and log
+# prices, which have no unit, so one absolute tolerance fits every price level, and a row
+# does not depend on any later bar
+FLAT_TOLERANCE = 1e-12
+
+
+def rolling_sums(values, window, out=None):
+    """
+    Sums of every `window` consecutive values along the last axis, from one cumulative sum.
+
+    Parameters:
+    - values (numpy array): Values to sum.
+    - window (int): Values per sum.
+    - out (numpy array, optional): Array to write the sums to; may be `values` itself.
+
+    Returns:
+    - numpy array of the shape of `values`; element t sums values t - window + 1 .. t
+      (NaN for t < window - 1).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    result = np.empty(values.shape) if out is None else out
+    if window <= n:
+        sums = np.zeros(values.shape[:-1] + (n + 1,))
+        np.cumsum(values, axis=-1, out=sums[..., 1:])
+        np.subtract(sums[..., window:], sums[..., :-window], out=result[..., window - 1:])
+    result[..., :window - 1] = np.nan
+    return result
+
+
+def centre(values):
+    """
+    Columns of a (T, I) array minus their first finite row, with the rows that are not finite
+    in every column set to 0. The offset comes from the start of the series only, so no row
+    depends on later ones.
+
+    Returns:
+    - (centred values as an (I, T) array, one contiguous row per column; boolean array of
+      the finite rows).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values).all(axis=1)
+    x = np.where(valid, values.T, 0.0)
+    if valid.any():
+        x -= np.where(valid, x[:, np.argmax(valid)][:, None], 0.0)
+    return x, valid
+
+
+class RollingMoments:
+    """
+    Rolling means and pairwise covariances of the columns of a (T, I) array.
+
+    The I (I + 1) / 2 distinct products of every row are summed over the window with one
+    cumulative sum each, so all pairs cost O(T x I^2) in a handful of array operations,
+    without a loop over pairs or windows. Columns are centred on their first value first
+    (see centre(); covariances do not change), which keeps the cumulative sums small.
+    Windows containing a non-finite row are NaN.
+
+    Series are stored as rows (shape (I, T)), so every cumulative sum runs over contiguous
+    memory, and the products of series i with series i..I-1 are written in place, one
+    series at a time. Covariances are kept packed, one row per pair i <= j;
+    covariance(i, j) reads any pairs at once and matrices() unpacks them.
+
+    Parameters:
+    - values (numpy array): Shape (T, I), one column per series.
+    - window (int): Rows per window (>= 2).
+    - ddof (int): Delta degrees of freedom, 1 as pandas' rolling().cov().
+    """
+
+    def __init__(self, values, window, ddof=1):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = int(window)
+        self.x, self.valid = centre(values)
+        width = len(self.x)
+        first, second = np.triu_indices(width)
+        self.slots = np.empty((width, width), dtype=np.intp)
+        self.slots[first, second] = self.slots[second, first] = np.arange(len(first))
+        self.means = rolling_sums(self.x, window)
+        self.means /= window
+        products = np.empty((len(first), len(self.valid)))
+        for i in range(width):
+            np.multiply(self.x[i], self.x[i:], out=products[self._pairs(i)])
+        rolling_sums(products, window, out=products)
+        for i in range(width):
+            shift = np.multiply(self.means[i], self.means[i:])
+            shift *= window
+            products[self._pairs(i)] -= shift
+        products /= window - ddof
+        gaps = rolling_sums(~self.valid, window) > 0
+        self.means[:, gaps] = np.nan
+        products[:, gaps] = np.nan
+        self.packed = products
+
+    def _pairs(self, i):
+        """Packed rows of the pairs (i, i), (i, i + 1), ... (i, I - 1), which are consecutive."""
+        return slice(self.slots[i, i], self.slots[i, i] + len(self.slots) - i)
+
+    def covariance(self, i, j, out=None):
+        """Rolling covariance of columns i and j (ints, or index arrays for one row per pair)."""
+        return np.take(self.packed, self.slots[i, j], axis=0, out=out)
+
+    def variance(self, i):
+        """Rolling variance of column(s) i."""
+        return self.covariance(i, i)
+
+    def inverse_deviation(self, variance):
+        """
+        1 / sqrt(variance), with 0 where the window is flat (variance at most FLAT_TOLERANCE;
+        e.g. prices of a closed market), so the ratios it scales are 0 instead of a division
+        by zero. NaN stays NaN.
+        """
+        flat = variance <= FLAT_TOLERANCE
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = 1 / np.sqrt(variance)
+        result[flat] = 0.0
+        return result
+
+    def correlation(self, i, j, out=None):
+        """Rolling correlation of columns i and j; 0 where either column is flat in the window."""
+        columns = np.arange(len(self.slots))
+        inverse = self.inverse_deviation(self.variance(columns))
+        result = np.multiply(self.covariance(i, j), inverse[i], out=out)
+        result *= inverse[j]
+        return result
+
+    def matrices(self, correlation=False):
+        """Rolling covariance (or correlation) matrices, of shape (T, I, I)."""
+        width, rows = self.x.shape
+        if correlation:
+            i, j = np.indices((width, width)).reshape(2, -1)
+            return self.correlation(i, j).T.reshape(rows, width, width)
+        return self.packed[self.slots.ravel()].T.reshape(rows, width, width)
+
+
+def rolling_covariance(values, window, ddof=1):
+    """Rolling covariance matrices of the columns of a (T, I) array, shape (T, I, I) (see RollingMoments)."""
+    return RollingMoments(values, window, ddof).matrices()
+
+
+def rolling_correlation(values, window):
+    """Rolling correlation matrices of the columns of a (T, I) array, shape (T, I, I) (see RollingMoments)."""
+    return RollingMoments(values, window).matrices(correlation=True)
+
+
+def cross_asset_features(closes, names, window=100, benchmark=None, features=CROSS_FEATURES, index=None):
+    """
+    Rolling cross-asset features of several instruments, as one column block.
+
+    Correlations, covariances and betas use log returns, z-scores log price ratios; each
+    comes from one RollingMoments of all instruments, and every output column is written
+    into one preallocated matrix, laid out as the frame's single float block:
+    - 'corr': corr-<A>-<B>, correlation of the returns of A and B, for every pair.
+    - 'cov': cov-<A>-<B>, covariance of the returns of A and B, for every pair.
+    - 'beta': beta-<A>, slope of the returns of A on those of the benchmark, for every
+      other instrument.
+    - 'zscore': zscore-<A>-<B>, distance of log(A / B) from its window mean in window
+      standard deviations, for every pair. The variance of the spread is
+      var(A) + var(B) - 2 cov(A, B), so no spread series is built.
+    Windows where a series (or spread) does not move give 0 instead of a division by zero.
+
+    Parameters:
+    - closes (numpy array): Prices of shape (T, I), aligned on the same rows.
+    - names (list of str): Instrument of each column.
+    - window (int): Rows per window.
+    - benchmark (str, optional): Instrument the betas are measured against (first by default).
+    - features (list of str): Any of CROSS_FEATURES.
+    - index (optional): Index of the returned frame.
+
+    Returns:
+    - DataFrame of the features, NaN until a full window exists.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    names = list(names)
+    if closes.ndim != 2 or closes.shape[1] != len(names):
+        raise ValueError("closes must have one column per instrument")
+    unknown = [f for f in features if f not in CROSS_FEATURES]
+    if unknown:
+        raise ValueError("Unknown cross-asset features: %s" % ", ".join(unknown))
+    benchmark = names[0] if benchmark is None else benchmark
+    if benchmark not in names:
+        raise ValueError("Benchmark %s is not one of the instruments" % benchmark)
+    rows, width = closes.shape
+    first, second = np.triu_indices(width, k=1)
+    pairs = ["%s-%s" % (names[i], names[j]) for i, j in zip(first, second)]
+    base = names.index(benchmark)
+    others = np.array([i for i in range(width) if i != base], dtype=np.intp)
+
+    columns = []
+    for feature in CROSS_FEATURES:
+        if feature in features:
+            columns += ["beta-%s" % names[i] for i in others] if feature == 'beta' else \
+                ["%s-%s" % (feature, p) for p in pairs]
+    block = np.empty((len(columns), rows))
+    position = 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prices = np.log(np.where(closes > 0, closes, np.nan))
+    if any(f in features for f in ('corr', 'cov', 'beta')):
+        returns = np.full_like(prices, np.nan)
+        np.subtract(prices[1:], prices[:-1], out=returns[1:])
+        moments = RollingMoments(returns, window)
+        if 'corr' in features:
+            moments.correlation(first, second, out=block[position:position + len(pairs)])
+            position += len(pairs)
+        if 'cov' in features:
+            moments.covariance(first, second, out=block[position:position + len(pairs)])
+            position += len(pairs)
+        if 'beta' in features:
+            inverse = moments.inverse_deviation(moments.variance(base))
+            betas = moments.covariance(others, base, out=block[position:position + len(others)])
+            betas *= inverse
+            betas *= inverse
+            position += len(others)
+    if 'zscore' in features:
+        moments = RollingMoments(prices, window)
+        scores = block[position:position + len(pairs)]
+        for i in range(width - 1):
+            # Pairs (i, i + 1) .. (i, I - 1)
+            rows = scores[i * (2 * width - i - 1) // 2:(i + 1) * (2 * width - i - 2) // 2]
+            np.subtract(moments.x[i], moments.x[i + 1:], out=rows)
+            rows -= moments.means[i]
+            rows += moments.means[i + 1:]
+            partners = np.arange(i + 1, width)
+            variance = moments.variance(partners)
+            variance += moments.variance(i)
+            variance -= 2 * moments.covariance(i, partners)
+            rows *= moments.inverse_deviation(variance)
+    return pd.DataFrame(block.T, index=index, columns=columns, copy=False)
@@ -0,0 +1,210 @@
+import threading
+import numpy as np
+import pandas as pd
+from .broker import PRIORITY_QUERY
+from .ringbuffer import RingBuffer
+
+
+def book_dtype(levels):
+    """Snapshot dtype: time (ms) plus `levels` bid/ask prices and volumes, best level first."""
+    return np.dtype([('time', '<i8'),
+                     ('bid_price', '<f8', (levels,)), ('bid_volume', '<f8', (levels,)),
+                     ('ask_price', '<f8', (levels,)), ('ask_volume', '<f8', (levels,))])
+
+
+def book_snapshot(book, levels, time_msc, mt5):
+    """
+    Convert one market_book_get() result into a snapshot row.
+
+    Missing levels are left as NaN prices with 0 volume.
+
+    Parameters:
+    - book (sequence): BookInfo records (type, price, volume, volume_dbl).
+    - levels (int): Levels kept per side.
+    - time_msc (int): Snapshot time in milliseconds.
+    - mt5: MetaTrader5 module, for the BOOK_TYPE_* constants.
+
+    Returns:
+    - numpy structured scalar with book_dtype(levels).
+    """
+    row = np.zeros((), dtype=book_dtype(levels))
+    row['time'] = time_msc
+    row['bid_price'] = np.nan
+    row['ask_price'] = np.nan
+    if not book:
+        return row
+    entries = np.array([(b.type, b.price, getattr(b, 'volume_dbl', b.volume)) for b in book],
+                       dtype=[('type', '<i4'), ('price', '<f8'), ('volume', '<f8')])
+    asks = entries[np.isin(entries['type'], (mt5.BOOK_TYPE_SELL, mt5.BOOK_TYPE_SELL_MARKET))]
+    bids = entries[np.isin(entries['type'], (mt5.BOOK_TYPE_BUY, mt5.BOOK_TYPE_BUY_MARKET))]
+    asks = asks[np.argsort(asks['price'], kind='stable')][:levels]
+    bids = bids[np.argsort(-bids['price'], kind='stable')][:levels]
+    row['ask_price'][:len(asks)] = asks['price']
+    row['ask_volume'][:len(asks)] = asks['volume']
+    row['bid_price'][:len(bids)] = bids['price']
+    row['bid_volume'][:len(bids)] = bids['volume']
+    return row
+
+
+def book_features(snapshots, levels=None):
+    """
+    Order-book features for a whole array of snapshots at once.
+
+    Every feature is computed on the (snapshots x levels) blocks with no
+    per-snapshot Python work.
+
+    Parameters:
+    - snapshots: numpy structured array with book_dtype().
+    - levels (int, optional): Levels used for the depth features (all by default).
+
+    Returns:
+    - pd.DataFrame indexed by snapshot time with:
+      - spread: best ask - best bid.
+      - mid: (best bid + best ask) / 2.
+      - microprice: best bid/ask weighted by the opposite side's top-of-book volume.
+      - imbalance_l1: (bid volume - ask volume) / (bid volume + ask volume) at the top of book.
+      - imbalance: Same over all levels used.
+      - depth_spread: Volume-weighted ask price - volume-weighted bid price over the levels used.
+      - bid_depth, ask_depth: Total volume over the levels used.
+    """
+    n = slice(None) if levels is None else slice(0, levels)
+    bid_p, bid_v = snapshots['bid_price'][:, n], snapshots['bid_volume'][:, n]
+    ask_p, ask_v = snapshots['ask_price'][:, n], snapshots['ask_volume'][:, n]
+    bid, ask = bid_p[:, 0], ask_p[:, 0]
+    bid_top, ask_top = bid_v[:, 0], ask_v[:, 0]
+    bid_depth, ask_depth = bid_v.sum(axis=1), ask_v.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        top = bid_top + ask_top
+        total = bid_depth + ask_depth
+        bid_vwap = np.nansum(bid_p * bid_v, axis=1) / bid_depth
+        ask_vwap = np.nansum(ask_p * ask_v, axis=1) / ask_depth
+        features = {
+            'spread': ask - bid,
+            'mid': (ask + bid) * 0.5,
+            'microprice': (bid * ask_top + ask * bid_top) / top,
+            'imbalance_l1': (bid_top - ask_top) / top,
+            'imbalance': (bid_depth - ask_depth) / total,
+            'depth_spread': ask_vwap - bid_vwap,
+            'bid_depth': bid_depth,
+            'ask_depth': ask_depth,
+        }
+    index = pd.DatetimeIndex(snapshots['time'].view('datetime64[ms]').astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame(features, index=index)
+
+
+def bar_book_features(features, timeframe, how='mean', prefix='book_'):
+    """
+    Aggregate snapshot features to bars so they can be joined onto a fetch() frame.
+
+    Bars are labelled by their open time, like fetch() frames, so the result can be
+    joined directly: rf.join(bar_book_features(features, '1min')).
+
+    Parameters:
+    - features (pd.DataFrame): Output of book_features().
+    - timeframe (str): Bar length as a pandas interval ('1min', '5min', '1h').
+    - how (str): 'mean' over the bar or 'last' snapshot of the bar.
+    - prefix (str): Prefix added to the column names.
+    """
+    bars = features.resample(pd.Timedelta(timeframe), label='left', closed='left')
+    bars = bars.last() if how == 'last' else bars.mean()
+    return bars.add_prefix(prefix)
+
+
+class DepthRecorder(threading.Thread):
+    """
+    Records Depth of Market snapshots into per-symbol ring buffers.
+
+    Subscribes each symbol with market_book_add, polls market_book_get and
+    stores every changed snapshot in a fixed-size RingBuffer of structured rows
+    (levels x bid/ask price and volume), so memory stays bounded and features
+    are computed over the whole buffer in one vectorized pass.
+
+    Snapshots are stamped with the symbol's last tick time (server clock), the
+    same clock as the bars returned by fetch().
+
+    Parameters:
+    - manager (MetaTraderManager): Gateway to poll.
+    - symbols (list of str): Symbols to record.
+    - levels (int): Book levels kept per side.
+    - capacity (int): Snapshots kept per symbol.
+    - interval (float): Seconds between polls when run as a thread.
+    """
+
+    def __init__(self, manager, symbols, levels=10, capacity=100000, interval=0.1):
+        super().__init__(name="mt5gw-depth-recorder", daemon=True)
+        self.manager = manager
+        self.symbols = list(symbols)
+        self.levels = levels
+        self.interval = interval
+        self.buffers = {s: RingBuffer(capacity, book_dtype(levels)) for s in self.symbols}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.subscribed = False
+
+    def subscribe(self):
+        for symbol in self.symbols:
+            if not self.manager._call(PRIORITY_QUERY, 'market_book_add', symbol):
+                raise Exception("Market depth is not available for %s" % symbol)
+        self.subscribed = True
+
+    def release(self):
+        if self.subscribed:
+            for symbol in self.symbols:
+                self.manager._call(PRIORITY_QUERY, 'market_book_release', symbol)
+            self.subscribed = False
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        if not self.subscribed:
+            self.subscribe()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    print("Depth recorder failed: %s" % e)
+                self.stopped.wait(self.interval)
+        finally:
+            self.release()
+
+    def poll(self):
+        """Take one snapshot per symbol; returns the number of snapshots stored."""
+        if not self.subscribed:
+            self.subscribe()
+        stored = 0
+        for symbol in self.symbols:
+            book = self.manager.get_market_book(symbol)
+            tick = self.manager.get_last_tick(symbol)
+            if book is None or tick is None:
+                continue
+            row = book_snapshot(book, self.levels, tick.time_msc, self.manager.mt5)
+            buffer = self.buffers[symbol]
+            with self.lock:
+                last = buffer.last()
+                if last is not None and self._same_book(last, row):
+                    continue
+                buffer.append(row)
+            stored += 1
+        return stored
+
+    @staticmethod
+    def _same_book(a, b):
+        for field in ('bid_price', 'bid_volume', 'ask_price', 'ask_volume'):
+            if not np.array_equal(a[field], b[field], equal_nan=True):
+                return False
+        return True
+
+    def snapshots(self, symbol, n=None):
+        """Newest n snapshots of `symbol` (all by default) as a copy of the ring buffer."""
+        with self.lock:
+            return self.buffers[symbol].view(n).copy()
+
+    def features(self, symbol, levels=None, n=None):
+        """Order-book features (see book_features) over the recorded snapshots of `symbol`."""
+        return book_features(self.snapshots(symbol, n), levels)
+
+    def bar_features(self, symbol, timeframe, how='mean', levels=None):
+        """Features aggregated to bars of `timeframe`, ready to join onto a fetch() frame."""
+        return bar_book_features(self.features(symbol, levels), timeframe, how=how)
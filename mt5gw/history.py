@@ -0,0 +1,155 @@
+import datetime
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import as_strided
+
+# Nominal length of each MT5 timeframe, used to size download windows and buffers
+TIMEFRAME_SECONDS = {'1min': 60, '2min': 120, '3min': 180, '4min': 240, '5min': 300,
+                     '10min': 600, '12min': 720, '15min': 900, '20min': 1200, '30min': 1800,
+                     '1h': 3600, '2h': 7200, '3h': 10800, '4h': 14400, '6h': 21600,
+                     '8h': 28800, '12h': 43200, '1d': 86400, '1w': 604800, '1m': 2592000}
+
+
+def timeframe_seconds(timeframe):
+    """
+    Nominal duration of a timeframe in seconds.
+
+    Parameters:
+    - timeframe (str): MT5 timeframe name ('1min', '1h', ...) or any pandas offset alias ('90s', '7min').
+
+    Returns:
+    - int: Number of seconds in one bar ('1m' is counted as 30 days).
+    """
+    if timeframe in TIMEFRAME_SECONDS:
+        return TIMEFRAME_SECONDS[timeframe]
+    return int(pd.Timedelta(timeframe).total_seconds())
+
+
+class RatesBuffer:
+    """
+    Growable structured-array buffer for MT5 rates.
+
+    Chunks are copied into a preallocated array whose capacity doubles when
+    full, so appending many chunks costs amortized O(1) per row and the final
+    result is available as a view without another concatenation.
+
+    Parameters:
+    - capacity (int): Initial number of rows to preallocate.
+    - dtype (numpy.dtype, optional): Row dtype; taken from the first chunk if omitted.
+    """
+
+    def __init__(self, capacity=1024, dtype=None):
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.data = np.empty(self.capacity, dtype=dtype) if dtype is not None else None
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, rates):
+        if rates is None or len(rates) == 0:
+            return
+        if self.data is None:
+            self.data = np.empty(self.capacity, dtype=rates.dtype)
+        needed = self.size + len(rates)
+        if needed > self.capacity:
+            self.capacity = max(self.capacity * 2, needed)
+            grown = np.empty(self.capacity, dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = rates
+        self.size = needed
+
+    def view(self):
+        """Filled part of the buffer (a view, not a copy)."""
+        if self.data is None:
+            return None
+        return self.data[:self.size]
+
+
+def estimate_capacity(rows, covered, span, bar_seconds):
+    """
+    Rows to preallocate for a date range of `span` seconds, given that its first window of
+    `covered` seconds returned `rows` bars.
+
+    The first window gives the share of calendar bars that actually exist (markets are
+    closed at weekends and on holidays); 10% is added so that a RatesBuffer rarely has
+    to grow. The result never exceeds the calendar count of bars.
+    """
+    calendar = int(span // bar_seconds) + 1
+    density = min(rows / (int(covered // bar_seconds) + 1), 1.0)
+    return max(min(calendar, int(calendar * density * 1.1)), rows, 1)
+
+
+def time_windows(date_from, date_to, step):
+    """
+    Split [date_from, date_to] into consecutive windows of length `step`.
+
+    Consecutive windows share their boundary, as copy_rates_range is inclusive
+    at both ends; callers drop the duplicated bar.
+    """
+    start = date_from
+    while True:
+        end = min(start + step, date_to)
+        yield start, end
+        if end >= date_to:
+            return
+        start = end
+
+
+def to_timedelta(chunk_size, timeframe):
+    """Window length for a chunk given as a bar count, a timedelta or a pandas offset string."""
+    if isinstance(chunk_size, datetime.timedelta):
+        return chunk_size
+    if isinstance(chunk_size, str):
+        return pd.Timedelta(chunk_size).to_pytimedelta()
+    return datetime.timedelta(seconds=int(chunk_size) * timeframe_seconds(timeframe))
+
+
+def field_block(rates, fields):
+    """
+    View consecutive same-dtype fields of a structured array as one 2-D array.
+
+    Parameters:
+    - rates: numpy structured array.
+    - fields (sequence of str): Field names, in memory order.
+
+    Returns:
+    - (rows x len(fields)) strided view sharing memory with `rates`, or None if the
+      fields are not adjacent in memory or do not share a dtype.
+    """
+    names = rates.dtype.fields
+    base, offset = names[fields[0]][:2]
+    for i, f in enumerate(fields):
+        dtype, off = names[f][:2]
+        if dtype != base or off != offset + i * base.itemsize:
+            return None
+    first = rates[fields[0]]
+    return as_strided(first, shape=(len(rates), len(fields)), strides=(rates.strides[0], base.itemsize))
+
+
+def rates_to_frame(rates, price_fields=('open', 'high', 'low', 'close')):
+    """
+    Build the OHLCV frame used by fetch() from an MT5 rates array.
+
+    The price fields are wrapped as a single strided float64 view of the
+    structured array and `time` is reinterpreted as datetime64[s] in place,
+    so no intermediate frames or Series are created; the only allocations are
+    the datetime index (converted to datetime64[ns], the resolution pandas uses
+    for frames built any other way) and the volume column.
+
+    Parameters:
+    - rates: numpy structured array as returned by copy_rates_*.
+    - price_fields (tuple): Price columns to keep, in memory order.
+
+    Returns:
+    - pd.DataFrame with open/high/low/close/volume columns indexed by 'Date'.
+    """
+    index = pd.DatetimeIndex(rates['time'].view('datetime64[s]').astype('datetime64[ns]'), name='Date')
+    block = field_block(rates, price_fields)
+    if block is not None:
+        rf = pd.DataFrame(block, index=index, columns=list(price_fields), copy=False)
+    else:
+        rf = pd.DataFrame({f: rates[f] for f in price_fields}, index=index)
+    rf['volume'] = rates['tick_volume']
+    return rf
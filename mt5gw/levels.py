@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# Outputs of support_resistance(); 'level' gives the original support_/resistance_ columns
+SR_OUTPUTS = ('level', 'distance', 'since')
+
+
+def _pick(first, second, lower):
+    """Element-wise extreme of two (values, positions) pairs; ties go to `second`, the later bars."""
+    a, b = first[0], second[0]
+    take = a < b if lower else a > b
+    return np.where(take, a, b), np.where(take, first[1], second[1])
+
+
+def window_extremes(values, windows, lower=True, positions=False):
+    """
+    Rolling minimum (lower=True) or maximum of `values` for several windows at once.
+
+    Uses a sparse table: extremes over spans of 1, 2, 4, ... bars are built once, each by
+    combining two halves of the previous span, and every window w is answered from the
+    two (overlapping) spans of the largest power of two <= w. The tables for all windows
+    cost O(N log max(windows)) and memory stays O(N), as only the current span is kept.
+
+    Parameters:
+    - values (numpy array): float values.
+    - windows (list of int): Window lengths (>= 1).
+    - lower (bool): Minimum if True, maximum otherwise.
+    - positions (bool): Also return the index of the extreme; among equal values the most
+      recent one is taken. Positions are meaningless in windows containing NaN.
+
+    Returns:
+    - dict of window -> array of length len(values) - window + 1, whose element j covers
+      values[j:j + window] (a (values, positions) pair of such arrays with positions=True).
+      Windows longer than `values` give empty arrays.
+    """
+    n = len(values)
+    reduce = np.minimum if lower else np.maximum
+    table = np.asarray(values, dtype=np.float64)
+    index = np.arange(n) if positions else None
+    span = 1
+    result = {}
+    for window in sorted(set(int(w) for w in windows)):
+        if window < 1:
+            raise ValueError("Window lengths must be at least 1")
+        if window > n:
+            result[window] = (table[:0], index[:0]) if positions else table[:0]
+            continue
+        while span * 2 <= window:
+            if positions:
+                table, index = _pick((table[:-span], index[:-span]), (table[span:], index[span:]), lower)
+            else:
+                table = reduce(table[:-span], table[span:])
+            span *= 2
+        first, second = slice(0, n - window + 1), slice(window - span, n - span + 1)
+        if positions:
+            result[window] = _pick((table[first], index[first]), (table[second], index[second]), lower)
+        else:
+            result[window] = reduce(table[first], table[second])
+    return result
+
+
+def support_resistance(frame, fields, windows, outputs=('level',)):
+    """
+    Support (rolling minimum) and resistance (rolling maximum) of the previous `window`
+    bars of each field, for every window at once.
+
+    Bar i sees bars i - window .. i - 1, as field.shift(1).rolling(window).min()/max(),
+    and is NaN until `window` previous bars exist (or when one of them is NaN).
+    Every output is written into one preallocated block.
+
+    Parameters:
+    - frame (DataFrame): Source frame.
+    - fields (list of str): Numeric columns to use.
+    - windows (list of int): Window lengths (sr_levels).
+    - outputs (list of str): Any of SR_OUTPUTS:
+        - 'level': support_{w}_{field} and resistance_{w}_{field}.
+        - 'distance': support_distance_{w}_{field} (field - support) and
+          resistance_distance_{w}_{field} (resistance - field), in price units.
+        - 'since': support_since_{w}_{field} and resistance_since_{w}_{field}, the bars since
+          the field last touched the level (1 when the previous bar set it).
+
+    Returns:
+    - DataFrame with the index of `frame`; per field and window the support and resistance
+      columns of each output, in SR_OUTPUTS order.
+    """
+    unknown = [o for o in outputs if o not in SR_OUTPUTS]
+    if unknown:
+        raise ValueError("Unknown sr_outputs: %s" % ", ".join(unknown))
+    windows = list(dict.fromkeys(int(w) for w in windows))
+    selected = [o for o in SR_OUTPUTS if o in outputs]
+    names = []
+    for field in fields:
+        for window in windows:
+            for output in selected:
+                infix = '' if output == 'level' else output + '_'
+                names += ["support_%s%s_%s" % (infix, window, field), "resistance_%s%s_%s" % (infix, window, field)]
+    n = len(frame)
+    positions = 'since' in selected
+    block = np.empty((n, len(names)), order='F')
+    column = 0
+    for field in fields:
+        values = frame[field].to_numpy(dtype=np.float64)
+        extremes = {lower: window_extremes(values, windows, lower=lower, positions=positions)
+                    for lower in (True, False)}
+        if positions:
+            # Windows containing a NaN give NaN, as in pandas rolling (values propagate it themselves)
+            nans = np.concatenate(([0], np.cumsum(np.isnan(values))))
+        for window in windows:
+            stop = max(n - window, 0)
+            rows = slice(window, window + stop)
+            invalid = nans[window:window + stop] != nans[:stop] if positions else None
+            for output in selected:
+                for lower in (True, False):
+                    if positions:
+                        level, found = (a[:stop] for a in extremes[lower][window])
+                    else:
+                        level = extremes[lower][window][:stop]
+                    if output == 'level':
+                        out = level
+                    elif output == 'distance':
+                        out = values[rows] - level if lower else level - values[rows]
+                    else:
+                        out = np.arange(window, window + stop) - found
+                    block[:window, column] = np.nan
+                    block[rows, column] = out
+                    if positions:
+                        block[rows, column][invalid] = np.nan
+                    column += 1
+    return pd.DataFrame(block, index=frame.index, columns=names, copy=False)
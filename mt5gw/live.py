@@ -0,0 +1,239 @@
+import queue
+import threading
+import numpy as np
+import pandas as pd
+
+
+class Subscription:
+    """
+    Handle returned by LiveFeed.subscribe. Events are read with get() and the
+    subscription must be released with close() once the client goes away.
+    """
+
+    def __init__(self, feed, instrument, timeframe, denoise_methods, maxsize=1000):
+        self.feed = feed
+        self.instrument = instrument
+        self.timeframe = timeframe
+        self.denoise_methods = list(denoise_methods)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def put(self, event):
+        # Slow clients lose their oldest events instead of stalling the poller
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self.queue.get(timeout=timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.feed.unsubscribe(self)
+
+
+class _BarStream:
+    """Per-timeframe state of a SymbolPoller: last bars seen and the denoising window."""
+
+    def __init__(self, timeframe, window):
+        self.timeframe = timeframe
+        self.window = window
+        self.subscribers = []
+        self.seeded = False
+        self.times = np.empty(0, dtype=np.int64)
+        self.closes = np.empty(0, dtype=float)
+        self.last_bar = None
+
+    def denoise_methods(self):
+        methods = []
+        for sub in self.subscribers:
+            for m in sub.denoise_methods:
+                if m not in methods:
+                    methods.append(m)
+        return methods
+
+    def seed(self, rates):
+        self.seeded = True
+        if rates is None or len(rates) < 1:
+            return
+        rates = rates[-self.window:]
+        self.times = rates['time'].astype(np.int64)
+        self.closes = rates['close'].astype(float)
+        self.last_bar = tuple(rates[-1])
+
+    def update(self, rates):
+        """Merge the newest rates and return the bars that are new or changed."""
+        changed = []
+        if rates is None:
+            return changed
+        for r in rates:
+            t = int(r['time'])
+            if len(self.times) and t < self.times[-1]:
+                continue
+            if len(self.times) and t == self.times[-1]:
+                if tuple(r) == self.last_bar:
+                    continue
+                self.closes[-1] = r['close']
+            else:
+                self.times = np.append(self.times, t)[-self.window:]
+                self.closes = np.append(self.closes, float(r['close']))[-self.window:]
+            self.last_bar = tuple(r)
+            changed.append(r)
+        return changed
+
+
+class SymbolPoller(threading.Thread):
+    """
+    Background poller for a single instrument. It serves every subscribed
+    timeframe of that instrument, so the terminal is polled once per symbol
+    regardless of how many clients are connected.
+    """
+
+    def __init__(self, feed, instrument):
+        super().__init__(name="mt5gw-poller-%s" % instrument, daemon=True)
+        self.feed = feed
+        self.manager = feed.manager
+        self.instrument = instrument
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.last_tick_msc = None
+
+    def add(self, sub):
+        with self.lock:
+            stream = self.streams.get(sub.timeframe)
+            if stream is None:
+                stream = self.streams[sub.timeframe] = _BarStream(sub.timeframe, self.feed.window)
+            stream.subscribers.append(sub)
+
+    def remove(self, sub):
+        with self.lock:
+            stream = self.streams.get(sub.timeframe)
+            if stream is not None and sub in stream.subscribers:
+                stream.subscribers.remove(sub)
+                if not stream.subscribers:
+                    del self.streams[sub.timeframe]
+            return len(self.streams) == 0
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print("Live poller for %s failed: %s" % (self.instrument, e))
+            self.stopped.wait(self.feed.interval)
+
+    def poll(self):
+        with self.lock:
+            streams = list(self.streams.values())
+
+        for stream in streams:
+            if not stream.seeded:
+                stream.seed(self.manager.get_rates(self.instrument, stream.timeframe, 0, stream.window))
+
+        tick = self.manager.get_last_tick(self.instrument)
+        if tick is None or tick.time_msc == self.last_tick_msc:
+            return
+        self.last_tick_msc = tick.time_msc
+
+        tick_event = {'type': 'tick', 'instrument': self.instrument,
+                      'time': pd.Timestamp(tick.time_msc, unit='ms').strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                      'bid': tick.bid, 'ask': tick.ask, 'last': tick.last}
+
+        for stream in streams:
+            self.publish(stream, tick_event)
+            # The two newest bars cover both a bar that just closed and the new open bar
+            changed = stream.update(self.manager.get_rates(self.instrument, stream.timeframe, 0, 2))
+            if changed:
+                bars = [self.bar_event(stream, r, i == len(changed) - 1) for i, r in enumerate(changed)]
+                self.publish(stream, {'type': 'bar', 'bars': bars})
+
+    def bar_event(self, stream, rate, denoise):
+        event = {'instrument': self.instrument,
+                 'timeframe': stream.timeframe,
+                 'time': pd.Timestamp(int(rate[0]), unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+                 'open': float(rate[1]),
+                 'high': float(rate[2]),
+                 'low': float(rate[3]),
+                 'close': float(rate[4]),
+                 'volume': int(rate[5])}
+        if denoise:
+            event['denoised'] = self.denoise(stream)
+        return event
+
+    def denoise(self, stream):
+        """Denoise the rolling window of closes and return the newest value per method."""
+        values = {}
+        if len(stream.closes) < self.feed.min_denoise_bars:
+            return values
+        frame = pd.DataFrame({'close': stream.closes})
+        for method in stream.denoise_methods():
+            try:
+                out = self.manager.denoise_dataframe(frame.copy(), method=method, apply_columns=['close'])
+                values[method] = float(out['denoised_close'].iloc[-1])
+            except Exception as e:
+                print("Live denoising with %s failed: %s" % (method, e))
+        return values
+
+    def publish(self, stream, event):
+        with self.lock:
+            subscribers = list(stream.subscribers)
+        for sub in subscribers:
+            sub.put(event)
+
+
+class LiveFeed:
+    """
+    Fan-out of live bars and ticks to any number of subscribers.
+
+    Parameters:
+    - manager (MetaTraderManager): Gateway used to read ticks and bars.
+    - interval (float): Seconds between polls of each symbol.
+    - window (int): Number of bars kept per (instrument, timeframe) for incremental denoising.
+    - min_denoise_bars (int): Minimum window length before denoised values are published.
+    """
+
+    def __init__(self, manager, interval=0.5, window=256, min_denoise_bars=32):
+        self.manager = manager
+        self.interval = interval
+        self.window = window
+        self.min_denoise_bars = min_denoise_bars
+        self.pollers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, instrument, timeframe, denoise_methods=()):
+        if self.manager.get_mt5_timeframe(timeframe) is None:
+            raise ValueError("Timeframe not supported!")
+        sub = Subscription(self, instrument, timeframe, denoise_methods)
+        with self.lock:
+            poller = self.pollers.get(instrument)
+            if poller is None:
+                poller = self.pollers[instrument] = SymbolPoller(self, instrument)
+                poller.add(sub)
+                poller.start()
+            else:
+                poller.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            poller = self.pollers.get(sub.instrument)
+            if poller is not None and poller.remove(sub):
+                poller.stop()
+                del self.pollers[sub.instrument]
+
+    def stop(self):
+        with self.lock:
+            for poller in self.pollers.values():
+                poller.stop()
+            self.pollers = {}
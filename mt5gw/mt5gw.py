@@ -1,18 +1,36 @@
 import os
-import MetaTrader5 as mt5
 import numpy as np
 import pandas as pd
 import datetime
-from dateutil.parser import parse
-import pywt
-import ta
-import talib
-import pandas_ta
-import tulipy
-from . import mtds_ni
-from . import mySSA
+import numbers
+from .registry import lazy
+from .session import MT5Session
+from .broker import MT5Broker, PRIORITY_ORDER, PRIORITY_QUERY, PRIORITY_HISTORY
+from .symbols import SymbolCatalog
+from .orders import OrderExecutor
+from .history import RatesBuffer, estimate_capacity, rates_to_frame, time_windows, timeframe_seconds, to_timedelta
+from .profiling import NULL_PROFILER, get_profiler
+from .bars import (BarBuilder, anchor_ms, bars_to_frame, check_anchor, concat_bars, interval_ms, parse_bar_spec,
+                   ticks_to_bars)
+from .levels import support_resistance
+from .mtf import OHLCV, join_completed, resample_bars
+from .chunked import BlockWriter, concat_blocks, trim_warmup, warmup_tail
+from .cross_asset import CROSS_FEATURES, cross_asset_features
+from .warmup import recursive_features, required_warmup
+from . import ta_native
 from warnings import simplefilter
 
+# Terminal, indicator and denoising libraries are imported on first use (see mt5gw.registry)
+mt5 = lazy('MetaTrader5')
+dateutil_parser = lazy('dateutil')
+pywt = lazy('pywt')
+ta = lazy('ta')
+talib = lazy('talib')
+pandas_ta = lazy('pandas_ta')
+tulipy = lazy('tulipy')
+mtds_ni = lazy('mtds_ni')
+mySSA = lazy('mySSA')
+
 # Ignore warnings
 simplefilter(action="ignore", category=pd.errors.PerformanceWarning)
 simplefilter(action="ignore", category=FutureWarning)
@@ -20,76 +38,355 @@ simplefilter(action="ignore", category=RuntimeWarning)
 
 
 class MetaTraderManager:
-    def __init__(self):
-        self.mt5 = mt5
-        try:
-            self.mt5.initialize()
-            self.tfs = {'1min': mt5.TIMEFRAME_M1,
-                        '2min': mt5.TIMEFRAME_M2,
-                        '3min': mt5.TIMEFRAME_M3,
-                        '4min': mt5.TIMEFRAME_M4,
-                        '5min': mt5.TIMEFRAME_M5,
-                        '10min': mt5.TIMEFRAME_M10,
-                        '12min': mt5.TIMEFRAME_M12,
-                        '15min': mt5.TIMEFRAME_M15,
-                        '20min': mt5.TIMEFRAME_M20,
-                        '30min': mt5.TIMEFRAME_M30,
-                        '1h': mt5.TIMEFRAME_H1,
-                        '2h': mt5.TIMEFRAME_H2,
-                        '3h': mt5.TIMEFRAME_H3,
-                        '4h': mt5.TIMEFRAME_H4,
-                        '6h': mt5.TIMEFRAME_H6,
-                        '8h': mt5.TIMEFRAME_H8,
-                        '12h': mt5.TIMEFRAME_H12,
-                        '1d': mt5.TIMEFRAME_D1,
-                        '1w': mt5.TIMEFRAME_W1,
-                        '1m': mt5.TIMEFRAME_MN1}
-
-        except Exception as e:
-            print(e)
-            print("initialize() failed, error code =", self.mt5.last_error())
-            quit()
+    def __init__(self, path=None, login=None, password=None, server=None, timeout=None, session=None, broker=None,
+                 symbols_ttl=300.0, terminal=None):
+        """
+        Parameters:
+        - path, login, password, server, timeout: Terminal connection settings forwarded to mt5.initialize().
+        - session (MT5Session, optional): Existing session to share between managers.
+        - broker (MT5Broker, optional): Existing broker to share between managers.
+        - symbols_ttl (float): Seconds the symbol catalog is cached before it is reloaded.
+        - terminal (optional): Stand-in for the MetaTrader5 module, e.g. a
+          mt5gw.synthetic.SyntheticTerminal for offline runs and benchmarks.
+
+        The terminal is attached lazily on the first call and the connection is kept
+        open until close() is called. Every terminal call is executed on the broker's
+        worker thread, so the manager can be used from several threads at once.
+        """
+        self.mt5 = terminal if terminal is not None else mt5
+        self.session = session if session is not None else MT5Session(
+            self.mt5, path=path, login=login, password=password, server=server, timeout=timeout)
+        self.broker = broker if broker is not None else MT5Broker()
+        self.symbols = SymbolCatalog(lambda: self._call(PRIORITY_QUERY, 'symbols_get'), ttl=symbols_ttl)
+        self.orders = OrderExecutor(self)
+        self.last_profile = None
+        self.tfs = {'1min': self.mt5.TIMEFRAME_M1,
+                    '2min': self.mt5.TIMEFRAME_M2,
+                    '3min': self.mt5.TIMEFRAME_M3,
+                    '4min': self.mt5.TIMEFRAME_M4,
+                    '5min': self.mt5.TIMEFRAME_M5,
+                    '10min': self.mt5.TIMEFRAME_M10,
+                    '12min': self.mt5.TIMEFRAME_M12,
+                    '15min': self.mt5.TIMEFRAME_M15,
+                    '20min': self.mt5.TIMEFRAME_M20,
+                    '30min': self.mt5.TIMEFRAME_M30,
+                    '1h': self.mt5.TIMEFRAME_H1,
+                    '2h': self.mt5.TIMEFRAME_H2,
+                    '3h': self.mt5.TIMEFRAME_H3,
+                    '4h': self.mt5.TIMEFRAME_H4,
+                    '6h': self.mt5.TIMEFRAME_H6,
+                    '8h': self.mt5.TIMEFRAME_H8,
+                    '12h': self.mt5.TIMEFRAME_H12,
+                    '1d': self.mt5.TIMEFRAME_D1,
+                    '1w': self.mt5.TIMEFRAME_W1,
+                    '1m': self.mt5.TIMEFRAME_MN1}
+
+    def __enter__(self):
+        self.broker.call(PRIORITY_QUERY, self.session.ensure)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        self.broker.call(PRIORITY_QUERY, self.session.shutdown)
+        self.broker.stop()
+
+    def _invoke(self, name, args, kwargs):
+        self.session.ensure()
+        return getattr(self.mt5, name)(*args, **kwargs)
+
+    def _call(self, priority, name, *args, **kwargs):
+        """Run mt5.<name>(*args, **kwargs) on the broker thread with the given priority."""
+        return self.broker.call(priority, self._invoke, name, args, kwargs)
+
+    def get_connection_metrics(self):
+        return self.session.metrics()
+
+    def get_order_metrics(self):
+        """order_send latency histograms (see OrderExecutor.metrics)."""
+        return self.orders.metrics()
 
     def get_all_symbols(self):
-        self.mt5.initialize()
-        return self.mt5.symbols_get()
+        return self.symbols.all()
 
     def get_all_symbols_list(self):
-        self.mt5.initialize()
-        symbols = self.mt5.symbols_get()
-        return [symbol.name for symbol in symbols]
+        return self.symbols.names()
 
     def get_supported_timeframes(self):
         return list(self.tfs.keys())
 
     def get_market_book(self, symbol):
-        self.mt5.initialize()
-        return self.mt5.market_book_get(symbol)
+        return self._call(PRIORITY_QUERY, 'market_book_get', symbol)
 
     def get_mt5_timeframe(self, tf):
         return self.tfs.get(tf, None)
 
-    def get_orders(self, instrument):
-        self.mt5.initialize()
-        return self.mt5.orders_get(symbol=instrument)
+    def get_orders(self, instrument=None):
+        if instrument:
+            return self._call(PRIORITY_QUERY, 'orders_get', symbol=instrument)
+        return self._call(PRIORITY_QUERY, 'orders_get')
 
     def get_positions(self, instrument=None):
-        self.mt5.initialize()
         if instrument:
-            return self.mt5.positions_get(symbol=instrument)
-        return self.mt5.positions_get()
+            return self._call(PRIORITY_QUERY, 'positions_get', symbol=instrument)
+        return self._call(PRIORITY_QUERY, 'positions_get')
+
+    def get_symbol_info(self, symbol, live=False):
+        """
+        Symbol properties from the cached catalog; unknown symbols are looked up in the terminal.
 
-    def get_symbol_info(self, symbol):
-        self.mt5.initialize()
-        return self.mt5.symbol_info(symbol)
+        Quote fields of the cached record (bid, ask, last, spread, ...) are as of the last
+        catalog refresh (up to symbols_ttl seconds old), not current: callers that need
+        fresh quotes must pass live=True, which queries symbol_info() on the terminal as
+        before, or use get_last_tick().
+        """
+        info = None if live else self.symbols.get(symbol)
+        if info is None:
+            info = self._call(PRIORITY_QUERY, 'symbol_info', symbol)
+        return info
 
     def get_last_tick(self, symbol):
-        self.mt5.initialize()
-        return self.mt5.symbol_info_tick(symbol)
+        return self._call(PRIORITY_QUERY, 'symbol_info_tick', symbol)
 
-    def place_order(self, order):
-        self.mt5.initialize()
+    def get_rates(self, instrument, timeframe, start_pos=0, count=1):
+        """
+        Return the raw MT5 rates array for the newest bars of an instrument.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - timeframe (str): One of the supported timeframes (e.g. '1min', '1h').
+        - start_pos (int): Bar index to start from (0 is the currently open bar).
+        - count (int): Number of bars to return.
+
+        Returns:
+        - numpy structured array as returned by copy_rates_from_pos, oldest bar first.
+        """
+        mt_timeframe = self.get_mt5_timeframe(timeframe)
+        if mt_timeframe is None:
+            raise Exception("Timeframe not supported!")
+        return self._call(PRIORITY_QUERY, 'copy_rates_from_pos', instrument, mt_timeframe, start_pos, count)
+
+    def iter_rates(self, instrument, timeframe, bars=None, date_from=None,
+                   date_to=None, chunk_size=50000, provide_open_bar=True):
+        """
+        Download history in chunks, oldest chunk first.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - timeframe (str): One of the supported timeframes.
+        - bars (int, optional): Number of newest bars to download, paged with copy_rates_from_pos.
+        - date_from, date_to (datetime or str, optional): Range to download, paged with copy_rates_range.
+        - chunk_size (int, str or timedelta): Bars per page, or the time span of each page
+          for date ranges (e.g. '30D').
+        - provide_open_bar (bool): Include the currently open bar when paging by bars.
+
+        Yields:
+        - numpy structured arrays of rates in chronological order, without overlapping bars.
+        """
+        mt_timeframe = self.get_mt5_timeframe(timeframe)
+        if mt_timeframe is None:
+            raise Exception("Timeframe not supported!")
 
+        last_time = None
+        if bars is not None:
+            if not isinstance(chunk_size, numbers.Integral):
+                raise ValueError("chunk_size must be a number of bars when paging by bars")
+            chunk_size = int(chunk_size)
+            first = 0 if provide_open_bar else 1
+            remaining = int(bars)
+            while remaining > 0:
+                count = min(chunk_size, remaining)
+                remaining -= count
+                rates = self._call(PRIORITY_HISTORY, 'copy_rates_from_pos',
+                                   instrument, mt_timeframe, first + remaining, count)
+                if rates is None or len(rates) < 1:
+                    # Pages older than the available history come back empty
+                    continue
+                if last_time is not None:
+                    # Positions shift when a new bar opens mid-download
+                    rates = rates[rates['time'] > last_time]
+                if len(rates) > 0:
+                    last_time = rates['time'][-1]
+                    yield rates
+        elif date_from is not None:
+            if not isinstance(date_from, datetime.datetime):
+                date_from = dateutil_parser.parse(date_from)
+            if date_to is None:
+                date_to = datetime.datetime.now()
+            elif not isinstance(date_to, datetime.datetime):
+                date_to = dateutil_parser.parse(date_to)
+            for start, end in time_windows(date_from, date_to, to_timedelta(chunk_size, timeframe)):
+                rates = self._call(PRIORITY_HISTORY, 'copy_rates_range',
+                                   instrument, mt_timeframe, start, end)
+                if rates is None or len(rates) < 1:
+                    continue
+                if last_time is not None:
+                    rates = rates[rates['time'] > last_time]
+                if len(rates) > 0:
+                    last_time = rates['time'][-1]
+                    yield rates
+        else:
+            raise Exception("Either bars or date_from must be provided!")
+
+    def fetch_chunks(self, instrument, timeframe, bars=None, date_from=None,
+                     date_to=None, chunk_size=50000, provide_open_bar=True):
+        """
+        Generator version of the raw download: yields one OHLCV DataFrame per chunk,
+        so long histories can be processed in bounded memory while they download.
+        Parameters are the same as iter_rates().
+        """
+        for rates in self.iter_rates(instrument, timeframe, bars=bars, date_from=date_from,
+                                     date_to=date_to, chunk_size=chunk_size,
+                                     provide_open_bar=provide_open_bar):
+            yield self.rates_to_frame(rates)
+
+    def download_rates(self, instrument, timeframe, bars=None, date_from=None,
+                       date_to=None, chunk_size=50000, provide_open_bar=True):
+        """
+        Download a full range chunk by chunk into one preallocated RatesBuffer.
+
+        With bars, the buffer holds exactly `bars` rows. With a date range, the calendar
+        count of bars overstates the history (weekends, holidays, closed sessions), so the
+        buffer is sized once the first chunk has arrived, from the bars per second it
+        contains, and grows if the estimate is short.
+
+        Returns:
+        - numpy structured array of rates (a view into the buffer), or None if nothing was returned.
+        """
+        buffer = RatesBuffer(capacity=int(bars)) if bars is not None else None
+        if bars is None:
+            start = date_from if isinstance(date_from, datetime.datetime) else dateutil_parser.parse(date_from)
+            end = date_to if isinstance(date_to, datetime.datetime) else (
+                dateutil_parser.parse(date_to) if date_to is not None else datetime.datetime.now())
+            span = max((end - start).total_seconds(), 0)
+            covered = min(to_timedelta(chunk_size, timeframe).total_seconds(), span)
+        for rates in self.iter_rates(instrument, timeframe, bars=bars, date_from=date_from,
+                                     date_to=date_to, chunk_size=chunk_size,
+                                     provide_open_bar=provide_open_bar):
+            if buffer is None:
+                buffer = RatesBuffer(capacity=estimate_capacity(len(rates), covered, span,
+                                                                timeframe_seconds(timeframe)))
+            buffer.extend(rates)
+        return buffer.view() if buffer is not None else None
+
+    def rates_to_frame(self, rates):
+        """Convert an MT5 rates array into the OHLCV DataFrame used by fetch()."""
+        return rates_to_frame(rates)
+
+    def iter_ticks(self, instrument, date_from, date_to=None, chunk_size='1D', flags='all'):
+        """
+        Download ticks in time windows with copy_ticks_range, oldest first.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - date_from, date_to (datetime or str): Range to download (date_to defaults to now).
+        - chunk_size (str or timedelta): Time span of each window (e.g. '1D', '6h').
+        - flags (str): 'all', 'info' (bid/ask changes) or 'trade' (last/volume changes).
+
+        Yields:
+        - numpy structured arrays of ticks. Each window is cut to [start, end) on time_msc,
+          so ticks on a window boundary are returned exactly once.
+        """
+        tick_flags = {'all': self.mt5.COPY_TICKS_ALL,
+                      'info': self.mt5.COPY_TICKS_INFO,
+                      'trade': self.mt5.COPY_TICKS_TRADE}[flags]
+        if not isinstance(date_from, datetime.datetime):
+            date_from = dateutil_parser.parse(date_from)
+        if date_to is None:
+            date_to = datetime.datetime.now()
+        elif not isinstance(date_to, datetime.datetime):
+            date_to = dateutil_parser.parse(date_to)
+        epoch = datetime.datetime(1970, 1, 1)
+        windows = list(time_windows(date_from, date_to, to_timedelta(chunk_size, None)))
+        for i, (start, end) in enumerate(windows):
+            ticks = self._call(PRIORITY_HISTORY, 'copy_ticks_range', instrument, start, end, tick_flags)
+            if ticks is None or len(ticks) < 1:
+                continue
+            lo = int((start - epoch).total_seconds() * 1000)
+            hi = int((end - epoch).total_seconds() * 1000)
+            t = ticks['time_msc']
+            keep = (t >= lo) & ((t < hi) if i < len(windows) - 1 else (t <= hi))
+            ticks = ticks[keep]
+            if len(ticks) > 0:
+                yield ticks
+
+    def fetch_ticks(self, instrument, date_from, date_to=None, chunk_size='1D', flags='all'):
+        """
+        Download a tick range chunk by chunk into one preallocated buffer.
+
+        Returns:
+        - numpy structured array of ticks (None if the range is empty).
+        """
+        buffer = RatesBuffer(capacity=1 << 20)
+        for ticks in self.iter_ticks(instrument, date_from, date_to=date_to,
+                                     chunk_size=chunk_size, flags=flags):
+            buffer.extend(ticks)
+        return buffer.view()
+
+    def _tick_range_end(self, instrument):
+        """Datetime just after the last tick of `instrument`, used to walk tick history backwards."""
+        tick = self._call(PRIORITY_QUERY, 'symbol_info_tick', instrument)
+        if tick is None:
+            raise Exception("Instrument %s has no data!" % instrument)
+        return datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=int(tick.time_msc) + 1)
+
+    def download_tick_bars(self, instrument, interval, bars=None, date_from=None, date_to=None,
+                           provide_open_bar=True, anchor=None, price='bid', volume='tick',
+                           chunk_size='1D'):
+        """
+        Build OHLCV bars of an arbitrary interval from ticks.
+
+        Ticks are downloaded and aggregated chunk by chunk, so only one chunk of ticks
+        is held in memory at a time. With `bars`, the range is walked backwards from
+        the last tick until enough bars have been built.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - interval: Bar length ('90s', '7min', pd.Timedelta or seconds).
+        - bars (int, optional): Number of newest bars to build.
+        - date_from, date_to (optional): Range to build when bars is not given.
+        - provide_open_bar (bool): Keep the last, possibly incomplete, bar.
+        - anchor (str, optional): Time of day ('09:30') at which bars restart every day.
+        - price (str): Tick price to use ('bid', 'ask', 'mid', 'last').
+        - volume (str): 'tick' counts ticks, 'real' sums traded volume.
+        - chunk_size (str or timedelta): Tick download window.
+
+        Returns:
+        - pd.DataFrame with open/high/low/close/volume columns indexed by 'Date'.
+        """
+        def build(start, end):
+            return concat_bars([ticks_to_bars(t, interval, price=price, volume=volume, anchor=anchor)
+                                for t in self.iter_ticks(instrument, start, end, chunk_size=chunk_size)])
+
+        if bars is not None:
+            needed = int(bars) + (0 if provide_open_bar else 1)
+            end = self._tick_range_end(instrument)
+            span = datetime.timedelta(milliseconds=interval_ms(interval) * needed)
+            parts = []
+            result = concat_bars([])
+            for _ in range(12):
+                start = end - span
+                parts.insert(0, build(start, end))
+                result = concat_bars(parts)
+                if len(result) >= needed:
+                    break
+                # Closed markets leave holes in the range, widen the search backwards
+                end, span = start, span * 2
+            result = result[-needed:]
+        elif date_from is not None:
+            result = build(date_from, date_to)
+        else:
+            raise Exception("Either bars or date_from must be provided!")
+
+        if not provide_open_bar and len(result) > 0:
+            result = result[:-1]
+        if len(result) < 1:
+            raise Exception("Instrument %s has no data!" % instrument)
+        return bars_to_frame(result)
+
+    def place_order(self, order):
         order_dict = {"buy_market": self.mt5.ORDER_TYPE_BUY,
                       "sell_market": self.mt5.ORDER_TYPE_SELL,
                       "buy_limit": self.mt5.ORDER_TYPE_BUY_LIMIT,
@@ -109,20 +406,17 @@ class MetaTraderManager:
             "type_time": self.mt5.ORDER_TIME_SPECIFIED if "expiration" in order else None,
             "type_filling": self.mt5.ORDER_FILLING_IOC,
             "comment": order["comment"] if "comment" in order else None,
-            "expiration": self.mt5.symbol_info_tick(order['instrument']).time + order['expiration'] * 60 if "expiration" in order else None
+            "expiration": self._call(PRIORITY_ORDER, 'symbol_info_tick', order['instrument']).time + order['expiration'] * 60 if "expiration" in order else None
         }
 
         # Drop all None values
         request = {k: v for k, v in request.items() if v is not None}
 
-        self.mt5.initialize()
-        try:
-            result = self.mt5.order_send(request)
-        except Exception as e:
-            print("Order send failed, error code =", self.mt5.last_error())
-            print(e)
-            quit()
-        if result.retcode != self.mt5.TRADE_RETCODE_DONE:
+        # Validation, in-flight key and session errors of the executor reach the caller
+        result = self.orders.send(request, key=order.get('idempotency_key'))
+        if result is None:
+            print("Order send failed, error code =", self._call(PRIORITY_ORDER, 'last_error'))
+        elif result.retcode != self.mt5.TRADE_RETCODE_DONE:
             print("Order send failed, retcode={}".format(result.retcode))
             print(result)
 
@@ -130,27 +424,42 @@ class MetaTraderManager:
 
        
 
-    def close_position(self, ticket):
-        self.mt5.initialize()
+    def close_position(self, ticket, volume=None, idempotency_key=None):
+        """
+        Close a position, or `volume` lots of it.
 
-        pos = self.mt5.positions_get(ticket=ticket)
-        print (pos)
+        Returns:
+        - OrderSendResult, or None if the position does not exist.
+        """
+        pos = self._call(PRIORITY_ORDER, 'positions_get', ticket=ticket)
         if pos is None or len(pos) < 1:
             print("Position not found!")
             return None
+        return self.orders.send(self.orders.close_request(pos[0], volume), key=idempotency_key)
 
-        pos = pos[0]
-        # Prepare the closing order
-        close_request = {
-            "action": self.mt5.TRADE_ACTION_DEAL,
-            "symbol": pos.symbol,
-            "volume": pos.volume,
-            "type": self.mt5.ORDER_TYPE_SELL if pos.type == self.mt5.ORDER_TYPE_BUY else self.mt5.ORDER_TYPE_BUY,
-            "position": pos.ticket,
-            "type_filling": self.mt5.ORDER_FILLING_IOC
-        }
+    def close_positions(self, symbol=None, tickets=None, idempotency_key=None):
+        """
+        Close positions in batch from a single positions snapshot.
 
-        return self.mt5.order_send(close_request)
+        Parameters:
+        - symbol (str, optional): Only close positions of this symbol.
+        - tickets (iterable, optional): Only close these position tickets.
+        - idempotency_key (hashable, optional): Retrying with the same key does not close twice.
+
+        Returns:
+        - dict mapping ticket to its OrderSendResult.
+        """
+        positions = self.get_positions(symbol)
+        if positions is None:
+            return {}
+        if tickets is not None:
+            tickets = set(tickets)
+            positions = [p for p in positions if p.ticket in tickets]
+        return self.orders.close_positions(positions, key=idempotency_key)
+
+    def close_all_positions(self, idempotency_key=None):
+        """Close every open position (see close_positions)."""
+        return self.close_positions(idempotency_key=idempotency_key)
 
     def add_pivot_levels(self, df, num_candles=14, num_levels=5, keep_distance_only=True):
         """
@@ -424,7 +733,7 @@ class MetaTraderManager:
                 for i in ti["args"]:
                     key = key_map.get(i, None)
                     if key is not None:
-                        if library == tulipy:
+                        if library.__name__ == 'tulipy':
                             pos_args.append(rf[key].astype(float).values)
                         else:
                             pos_args.append(rf[key].astype(float))
@@ -482,23 +791,85 @@ class MetaTraderManager:
               pandasta_indicators=[], talib_indicators=[], talib_candle_patterns=False,
               ta_all=False, taf_all=False, tulip_indicators=[], denoise_data={},
               add_meta_dates=False, add_year=False, add_price_summaries=True,
-              add_gap=False, sr_levels=[], sr_fields=["close"], pivot_levels=0,
-              fill_empty_ranges=False, provide_open_bar=True, drop_na=True,
-              drop_columns=[], silent=False):
-
+              add_gap=False, sr_levels=[], sr_fields=["close"], sr_outputs=["level"], pivot_levels=0,
+              fill_empty_ranges=False, provide_open_bar=True, drop_na=True, mtf_timeframes=[], mtf_features=None,
+              drop_columns=[], chunk_size=None, bar_anchor=None, tick_price='bid', warmup='auto', cross_asset=None,
+              profile=None, silent=False):
+        """
+        Download bars for one or several instruments and run the feature pipeline on them.
+
+        Timeframes supported by MT5 (see get_supported_timeframes()) are downloaded as rates.
+        Any other pandas interval ('90s', '7min', ...) is built from ticks, optionally anchored
+        to a session start with bar_anchor ('09:30') and priced with tick_price
+        ('bid', 'ask', 'mid' or 'last'). Information-driven bars are requested as
+        'tick:N', 'volume:N', 'dollar:N' or 'imbalance:N' (see download_info_bars()). The feature options are documented in
+        docs/configuration/data_retrieval.md and applied by build_features().
+
+        With bars=N and drop_na, N bars plus the warm-up the features need before their first
+        complete row are downloaded, so N complete rows are returned. warmup='auto' infers it
+        from the feature options (see mt5gw.warmup.required_warmup), an int sets it and 0
+        downloads N bars as they are.
+
+        For a list of instruments, cross_asset=True (or a dict of options) adds rolling
+        correlations, covariances, betas and spread z-scores between the instruments as one
+        column block (see mt5gw.cross_asset.cross_asset_features).
+
+        With profile=True (or a FetchProfiler), every stage is timed and its memory peak
+        recorded; the profiler is kept in self.last_profile (see mt5gw.profiling).
+        """
+        prof = get_profiler(profile)
+        prof.open(None if isinstance(instrument, list) else instrument)
+        try:
+            return self._fetch(prof, instrument, timeframe, bars=bars, date_from=date_from, date_to=date_to,
+                               mas=mas, lookbacks=lookbacks, native_indicators=native_indicators,
+                               ta_indicators=ta_indicators, pandasta_indicators=pandasta_indicators,
+                               talib_indicators=talib_indicators, talib_candle_patterns=talib_candle_patterns,
+                               ta_all=ta_all, taf_all=taf_all, tulip_indicators=tulip_indicators,
+                               denoise_data=denoise_data, add_meta_dates=add_meta_dates, add_year=add_year,
+                               add_price_summaries=add_price_summaries, add_gap=add_gap, sr_levels=sr_levels,
+                               sr_fields=sr_fields, sr_outputs=sr_outputs, pivot_levels=pivot_levels,
+                               fill_empty_ranges=fill_empty_ranges, provide_open_bar=provide_open_bar,
+                               mtf_timeframes=mtf_timeframes, mtf_features=mtf_features,
+                               drop_na=drop_na, drop_columns=drop_columns, chunk_size=chunk_size,
+                               bar_anchor=bar_anchor, tick_price=tick_price, warmup=warmup, cross_asset=cross_asset,
+                               silent=silent)
+        finally:
+            prof.close()
+            if prof is not NULL_PROFILER:
+                self.last_profile = prof
+
+    def _fetch(self, prof, instrument, timeframe, bars=None, date_from=None, date_to=None,
+               mas=[], lookbacks=[], native_indicators=[], ta_indicators=[],
+               pandasta_indicators=[], talib_indicators=[], talib_candle_patterns=False,
+               ta_all=False, taf_all=False, tulip_indicators=[], denoise_data={},
+               add_meta_dates=False, add_year=False, add_price_summaries=True,
+               add_gap=False, sr_levels=[], sr_fields=["close"], sr_outputs=["level"], pivot_levels=0,
+               fill_empty_ranges=False, provide_open_bar=True, drop_na=True, mtf_timeframes=[], mtf_features=None,
+               drop_columns=[], chunk_size=None, bar_anchor=None, tick_price='bid', warmup='auto', cross_asset=None,
+               silent=False):
         if isinstance(instrument, list):
             dataframes = []
             max_df_len = 0
 
+            cross_options = cross_asset if isinstance(cross_asset, dict) else {}
+            cross_window = cross_options.get('window', 100)
+            # The first complete cross-asset row needs `window` returns, i.e. window + 1 bars
+            cross_warmup = cross_window if cross_asset and bars is not None and warmup != 0 else 0
+
             for i in instrument:
-                tmpdf = self.fetch(i, timeframe, bars=bars, mas=mas, lookbacks=lookbacks,
+                tmpdf = self.fetch(i, timeframe, bars=None if bars is None else bars + cross_warmup,
+                                   mas=mas, lookbacks=lookbacks,
                                    native_indicators=native_indicators, ta_indicators=ta_indicators,
                                    pandasta_indicators=pandasta_indicators, talib_indicators=talib_indicators,
                                    talib_candle_patterns=talib_candle_patterns, ta_all=ta_all, taf_all=taf_all,
                                    tulip_indicators=tulip_indicators, add_meta_dates=False, add_year=False, add_price_summaries=add_price_summaries, add_gap=add_gap,
-                                   sr_levels=sr_levels, sr_fields=sr_fields, pivot_levels=pivot_levels,
+                                   sr_levels=sr_levels, sr_fields=sr_fields, sr_outputs=sr_outputs,
+                                   pivot_levels=pivot_levels,
                                    fill_empty_ranges=True, provide_open_bar=provide_open_bar,
-                                   drop_na=True, drop_columns=drop_columns, date_from=date_from, date_to=date_to, silent=silent, denoise_data=denoise_data)
+                                   mtf_timeframes=mtf_timeframes, mtf_features=mtf_features,
+                                   drop_na=True, drop_columns=drop_columns, date_from=date_from, date_to=date_to,
+                                   chunk_size=chunk_size, bar_anchor=bar_anchor, tick_price=tick_price,
+                                   warmup=warmup, profile=prof, silent=silent, denoise_data=denoise_data)
 
                 tmpdf.columns = ["%s-%s" % (i, col)
                                  for col in tmpdf.columns.values]
@@ -517,9 +888,27 @@ class MetaTraderManager:
 
             for col in data.columns:
                 if col.endswith("-volume"):
-                    data[col].fillna(value=0, inplace=True)
-
-            data.fillna(method='bfill', inplace=True)
+                    data[col] = data[col].fillna(value=0)
+
+            block = None
+            if cross_asset:
+                field = cross_options.get('field', 'close')
+                columns = ["%s-%s" % (i, field) for i in instrument]
+                missing = [c for c in columns if c not in data.columns]
+                if missing:
+                    raise ValueError("Cross-asset features need the columns %s" % ", ".join(missing))
+                # Built before the back-fill below, which would copy later prices into earlier rows:
+                # gaps carry the last price and rows before an instrument's first bar stay NaN
+                closes = data[columns].ffill().to_numpy(dtype=np.float64, na_value=np.nan)
+                block = cross_asset_features(closes, instrument, window=cross_window,
+                                             benchmark=cross_options.get('benchmark'),
+                                             features=cross_options.get('features', CROSS_FEATURES), index=data.index)
+
+            data.bfill(inplace=True)
+
+            if block is not None:
+                data = pd.concat([data, block], axis=1)
+                prof.checkpoint('cross_asset', data)
 
             if add_meta_dates:
                 d = data.index.to_series()
@@ -535,6 +924,9 @@ class MetaTraderManager:
 
             data.replace([np.inf, -np.inf], np.nan, inplace=True)
             data.dropna(inplace=True)
+            if cross_warmup:
+                data = data.iloc[-bars:]
+            prof.checkpoint('merge', data)
 
             if not silent:
                 print("Multi-Instrument Dataframe - [%s/%s] - Providing %s bars" % (
@@ -544,53 +936,327 @@ class MetaTraderManager:
 
             return data
 
-        if not mt5.initialize():
-            raise Exception(
-                "MT5 initialize() failed, error code =", mt5.last_error())
+        options = dict(mas=mas, lookbacks=lookbacks, native_indicators=native_indicators,
+                       ta_indicators=ta_indicators, pandasta_indicators=pandasta_indicators,
+                       talib_indicators=talib_indicators, talib_candle_patterns=talib_candle_patterns,
+                       ta_all=ta_all, taf_all=taf_all, tulip_indicators=tulip_indicators, denoise_data=denoise_data,
+                       add_meta_dates=add_meta_dates, add_year=add_year,
+                       add_price_summaries=add_price_summaries, add_gap=add_gap,
+                       sr_levels=sr_levels, sr_fields=sr_fields, sr_outputs=sr_outputs, pivot_levels=pivot_levels,
+                       fill_empty_ranges=fill_empty_ranges, provide_open_bar=provide_open_bar,
+                       mtf_timeframes=mtf_timeframes, mtf_features=mtf_features,
+                       drop_na=drop_na, drop_columns=drop_columns)
+        requested = bars
+        if bars is not None and drop_na and warmup:
+            if warmup == 'auto':
+                warmup = self._infer_warmup(options, timeframe, silent)
+            bars = bars + int(warmup)
+
+        rf = self.download_bars(instrument, timeframe, bars=bars, date_from=date_from, date_to=date_to,
+                                provide_open_bar=provide_open_bar, chunk_size=chunk_size,
+                                bar_anchor=bar_anchor, tick_price=tick_price, profile=prof)
+
+        rf = self.build_features(rf, instrument=instrument, timeframe=timeframe, profile=prof, silent=silent,
+                                 **options)
+        if bars != requested and len(rf) > requested:
+            rf = rf.iloc[len(rf) - requested:]
+        return rf
+
+    def _infer_warmup(self, options, timeframe, silent=False):
+        """
+        Warm-up bars of a feature configuration (see mt5gw.warmup.required_warmup).
+
+        The probe runs the same build_features() as the download would, so a failure is an
+        error of the configuration and is raised before anything is downloaded.
+        """
+        try:
+            warmup = required_warmup(self, options, timeframe)
+        except Exception as e:
+            raise Exception("Warm-up inference failed: %s: %s (pass warmup=0 to skip it)" %
+                            (type(e).__name__, e)) from e
+        if not silent:
+            print(" -- Downloading %s warm-up bars" % warmup)
+        return warmup
+
+    def fetch_chunked(self, instrument, timeframe, path=None, sink=None, bars=None, date_from=None, date_to=None,
+                      block_size=100000, warmup='auto', provide_open_bar=True, profile=None, **features):
+        """
+        Run the fetch() pipeline block by block and stream the finished blocks out.
+
+        History is downloaded in blocks of `block_size` bars, oldest first. Each block
+        is prefixed with the last `warmup` bars of the previous one, run through
+        build_features() and trimmed of those warm-up bars before it is written, so
+        memory is bounded by one block plus its warm-up whatever the length of the history.
+
+        With the inferred warm-up, window-based features (rolling indicators, mas, lookbacks,
+        sr_levels, pivots, higher timeframes) match a single in-memory run exactly.
+        Recursive ones (EMA-based indicators, cumulative sums such as OBV) depend on all
+        earlier bars and only converge towards it; raise `warmup` to tighten them. Unless
+        silent=True is passed, the columns that do are listed first (see
+        mt5gw.warmup.recursive_features). Denoising transforms each block separately.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - timeframe (str): One of the supported MT5 timeframes.
+        - path (str, optional): Output file; '.parquet' (needs pyarrow) or CSV otherwise.
+        - sink (callable, optional): Called with each finished block (DataFrame).
+        - bars, date_from, date_to: History to process, as in fetch().
+        - block_size (int): Bars per block.
+        - warmup (int or 'auto'): Bars prepended to each block; 'auto' infers them from the
+          feature options (see mt5gw.warmup.required_warmup).
+        - provide_open_bar (bool): Include the currently open bar when paging by bars.
+        - profile (FetchProfiler, optional): Records the stages of every block.
+        - **features: build_features() options (indicators, mas, lookbacks, drop_na, ...).
+
+        Returns:
+        - int: Number of rows written.
+        """
+        if path is None and sink is None:
+            raise ValueError("Either path or sink must be provided!")
+        prof = get_profiler(profile)
+        if warmup == 'auto':
+            warmup = required_warmup(self, features, timeframe)
+        if not features.get('silent', False):
+            recursive = recursive_features(self, features, timeframe)
+            if recursive:
+                print("Warning: %s depend on bars before each block's warm-up and will only approximate a single "
+                      "run; raise warmup to tighten them" % ", ".join(recursive))
+        features.setdefault('silent', True)
+        chunk_size = block_size if bars is not None else to_timedelta(block_size, timeframe)
+        writer = BlockWriter(path) if path is not None else None
+        tail = None
+        rows = 0
+        prof.open(instrument)
+        try:
+            for rates in self.iter_rates(instrument, timeframe, bars=bars, date_from=date_from, date_to=date_to,
+                                         chunk_size=chunk_size, provide_open_bar=provide_open_bar):
+                block = self.rates_to_frame(rates)
+                prof.checkpoint('download', block)
+                frame = concat_blocks(tail, block)
+                rf = self.build_features(frame.copy(), instrument=instrument, timeframe=timeframe,
+                                         provide_open_bar=provide_open_bar, profile=prof, **features)
+                rf = trim_warmup(rf, block.index[0])
+                tail = warmup_tail(frame, warmup)
+                if writer is not None:
+                    writer.write(rf)
+                if sink is not None:
+                    sink(rf)
+                rows += len(rf)
+                prof.checkpoint('write', rf)
+        finally:
+            if writer is not None:
+                writer.close()
+            prof.close()
+            if prof is not NULL_PROFILER:
+                self.last_profile = prof
+        return rows
+
+    def download_bars(self, instrument, timeframe, bars=None, date_from=None, date_to=None,
+                      provide_open_bar=True, chunk_size=None, bar_anchor=None, tick_price='bid', profile=None):
+        """
+        Download the base OHLCV frame used by fetch().
+
+        MT5 timeframes are read with copy_rates_*; any other interval is built from ticks
+        (see download_tick_bars).
+
+        Returns:
+        - pd.DataFrame with open/high/low/close/volume columns indexed by 'Date'.
+        """
+        prof = get_profiler(profile)
+        spec = parse_bar_spec(timeframe)
+        if spec is not None:
+            rf = self.download_info_bars(instrument, spec[0], spec[1], bars=bars, date_from=date_from,
+                                         date_to=date_to, provide_open_bar=provide_open_bar,
+                                         price=tick_price)
+            prof.checkpoint('download', rf)
+            return rf
 
         mt_timeframe = self.get_mt5_timeframe(timeframe)
-        if mt_timeframe is None:
-            raise Exception("Timeframe not supported!")
+        if mt_timeframe is None or bar_anchor is not None:
+            try:
+                check_anchor(interval_ms(timeframe), anchor_ms(bar_anchor))
+            except ValueError as e:
+                raise Exception("Timeframe not supported! %s" % e)
+            rf = self.download_tick_bars(instrument, timeframe, bars=bars, date_from=date_from,
+                                         date_to=date_to, provide_open_bar=provide_open_bar,
+                                         anchor=bar_anchor, price=tick_price)
+            prof.checkpoint('download', rf)
+            return rf
 
         rates = None
-        if bars is not None:
-            rates = mt5.copy_rates_from_pos(
-                instrument, mt_timeframe, 0 if provide_open_bar else 1, bars)
+        if chunk_size is not None and (bars is not None or date_from is not None):
+            rates = self.download_rates(instrument, timeframe, bars=bars, date_from=date_from,
+                                        date_to=date_to, chunk_size=chunk_size,
+                                        provide_open_bar=provide_open_bar)
+        elif bars is not None:
+            rates = self._call(PRIORITY_HISTORY, 'copy_rates_from_pos',
+                               instrument, mt_timeframe, 0 if provide_open_bar else 1, bars)
         elif date_from is not None:
             if not isinstance(date_from, datetime.datetime):
-                date_from = parse(date_from)
+                date_from = dateutil_parser.parse(date_from)
             if not isinstance(date_to, datetime.datetime):
-                date_to = parse(date_to)
+                date_to = dateutil_parser.parse(date_to)
             print("Fetching data from %s to %s" % (date_from, date_to))
-            rates = mt5.copy_rates_range(
-                instrument, mt_timeframe, date_from, date_to)
+            rates = self._call(PRIORITY_HISTORY, 'copy_rates_range',
+                               instrument, mt_timeframe, date_from, date_to)
 
         if rates is None or len(rates) < 1:
             print(rates)
-            print(mt5.last_error())
+            print(self._call(PRIORITY_QUERY, 'last_error'))
+            raise Exception("Instrument %s has no data!" % instrument)
+        prof.checkpoint('download', rates)
+
+        rf = self.rates_to_frame(rates)
+        prof.checkpoint('ingest', rf)
+        return rf
+
+    def download_info_bars(self, instrument, kind, threshold, bars=None, date_from=None, date_to=None,
+                           provide_open_bar=True, price='bid', volume='tick', chunk_size='1D', **kwargs):
+        """
+        Build tick, volume, dollar or tick-imbalance bars from ticks.
+
+        Ticks are fed chunk by chunk into a BarBuilder, so only one chunk is held in
+        memory. With `bars`, the range is extended backwards from the last tick until
+        enough bars are built; bars are always rebuilt from the start of the range, as
+        their edges depend on everything accumulated before them.
+
+        Parameters:
+        - instrument (str): Symbol name.
+        - kind (str): 'tick', 'volume', 'dollar' or 'imbalance'.
+        - threshold (float): Ticks, volume or notional per bar ('imbalance': initial expected ticks per bar).
+        - bars (int, optional): Number of newest bars to build.
+        - date_from, date_to (optional): Range to build when bars is not given.
+        - provide_open_bar (bool): Keep the last, still open, bar.
+        - price (str): Tick price to use ('bid', 'ask', 'mid', 'last').
+        - volume (str): Output volume column: 'tick' counts ticks, 'real' sums traded volume.
+        - chunk_size (str or timedelta): Tick download window.
+        - **kwargs: Forwarded to BarBuilder (alpha, min_ticks, max_ticks).
+
+        Returns:
+        - pd.DataFrame with open/high/low/close/volume columns indexed by the bar open time.
+        """
+        def build(start, end):
+            builder = BarBuilder(kind, threshold, price=price, volume=volume, **kwargs)
+            parts = [builder.update(t) for t in self.iter_ticks(instrument, start, end, chunk_size=chunk_size)]
+            if provide_open_bar:
+                parts.append(builder.flush())
+            return concat_bars(parts)
+
+        if bars is not None:
+            end = self._tick_range_end(instrument)
+            span = to_timedelta(chunk_size, None)
+            for _ in range(12):
+                result = build(end - span, end)
+                if len(result) >= bars:
+                    break
+                span = span * 2
+            result = result[-int(bars):]
+        elif date_from is not None:
+            result = build(date_from, date_to)
+        else:
+            raise Exception("Either bars or date_from must be provided!")
+
+        if len(result) < 1:
             raise Exception("Instrument %s has no data!" % instrument)
+        return bars_to_frame(result)
 
-        rf = pd.DataFrame(rates).drop(['spread', 'real_volume'], axis=1)
-        rf = rf.rename(columns={'tick_volume': 'volume'})
-        rf['Date'] = pd.to_datetime(rf['time'], unit='s')
-        rf = rf.drop(columns='time')
-        rf = rf.set_index(["Date"], drop=True)
+    def add_higher_timeframes(self, rf, bars, timeframe, timeframes, options=None, instrument=None, profile=None,
+                              silent=False):
+        """
+        Add features of higher timeframes, resampled from the base bars, to every base row.
 
-        print(rf.head())  # Add this line
+        Each higher timeframe is aggregated from `bars` (see mt5gw.mtf.resample_bars), run through
+        build_features() with `options` and as-of joined onto `rf`. A row only sees higher-timeframe
+        bars that had completed when the row's own bar closed. Columns are named
+        '<timeframe>-<column>', e.g. '1h-close'.
+
+        Parameters:
+        - rf (DataFrame): Base rows to add the columns to.
+        - bars (DataFrame): Base OHLCV bars the higher timeframes are built from.
+        - timeframe (str): Base timeframe; it must have a fixed duration.
+        - timeframes (list of str): Higher timeframes, e.g. ['1h', '4h'].
+        - options (dict, optional): build_features() keyword arguments for the higher timeframes.
+
+        Returns:
+        - DataFrame: `rf` with the higher-timeframe columns appended (NaN until the first completed bar).
+        """
+        prof = get_profiler(profile)
+        if timeframe is None or parse_bar_spec(timeframe) is not None:
+            raise ValueError("mtf_timeframes needs a base timeframe of fixed duration")
+        base_seconds = timeframe_seconds(timeframe)
+        options = dict(options or {})
+        for key in ('add_meta_dates', 'fill_empty_ranges', 'drop_na', 'mtf_timeframes', 'drop_columns'):
+            options.pop(key, None)
+        joined = []
+        for higher in timeframes:
+            if timeframe_seconds(higher) <= base_seconds:
+                raise ValueError("Timeframe %s is not higher than %s" % (higher, timeframe))
+            higher_bars, end = resample_bars(bars, higher)
+            features = self.build_features(higher_bars.copy(), instrument=instrument, timeframe=higher, drop_na=False,
+                                           profile=prof, silent=True, **options)
+            end = pd.Series(end, index=higher_bars.index).reindex(features.index).to_numpy()
+            features = features.select_dtypes(include=[np.number, 'bool'])
+            joined.append(join_completed(rf, features, end, base_seconds, "%s-" % higher))
+            if not silent:
+                print("Joined %s %s bars built from %s" % (len(higher_bars), higher, timeframe))
+        rf = pd.concat([rf.drop(columns=[c for f in joined for c in f.columns if c in rf.columns])] + joined,
+                       axis=1)
+        prof.checkpoint('mtf', rf)
+        return rf
+
+    def build_features(self, rf, instrument=None, timeframe=None, mas=[], lookbacks=[], native_indicators=[],
+                       ta_indicators=[], pandasta_indicators=[], talib_indicators=[], talib_candle_patterns=False,
+                       ta_all=False, taf_all=False, tulip_indicators=[], denoise_data={},
+                       add_meta_dates=False, add_year=False, add_price_summaries=True,
+                       add_gap=False, sr_levels=[], sr_fields=["close"], sr_outputs=["level"], pivot_levels=0,
+                       fill_empty_ranges=False, provide_open_bar=True, drop_na=True,
+                       mtf_timeframes=[], mtf_features=None, drop_columns=[], profile=None, silent=False):
+        """
+        Run the fetch() feature pipeline on an OHLCV frame.
+
+        Any frame with open/high/low/close/volume columns and a DatetimeIndex can be used,
+        e.g. bars built from ticks. timeframe may be None for bars without a fixed
+        duration; fill_empty_ranges is then skipped. Pass a FetchProfiler as `profile`
+        to record every stage. mtf_timeframes adds features of higher timeframes built from
+        the same bars (see add_higher_timeframes); mtf_features overrides the feature options
+        used for them, which default to the ones of the base timeframe.
+        """
+        prof = get_profiler(profile)
+        bar_seconds = None
+        if timeframe is not None and parse_bar_spec(timeframe) is None:
+            bar_seconds = timeframe_seconds(timeframe)
+
+        if mtf_timeframes:
+            # Higher timeframes are resampled from the base bars as downloaded
+            base_bars = rf[OHLCV].copy()
+            mtf_options = dict(mas=mas, lookbacks=lookbacks, native_indicators=native_indicators,
+                               ta_indicators=ta_indicators, pandasta_indicators=pandasta_indicators,
+                               talib_indicators=talib_indicators, talib_candle_patterns=talib_candle_patterns,
+                               ta_all=ta_all, taf_all=taf_all, tulip_indicators=tulip_indicators,
+                               denoise_data=denoise_data, add_price_summaries=add_price_summaries, add_gap=add_gap,
+                               sr_levels=sr_levels, sr_fields=sr_fields, sr_outputs=sr_outputs,
+                               pivot_levels=pivot_levels)
+            mtf_options.update(mtf_features or {})
 
         if add_gap:
             rf['gap'] = rf['open'] - rf['close'].shift(1)
             rf['gap'] = rf['gap'].fillna(value=0)
+            prof.checkpoint('gap', rf)
       
-        if fill_empty_ranges:
-            idx = pd.period_range(
-                rf.index.min(), rf.index.max(), freq=timeframe).to_timestamp()
+        if fill_empty_ranges and bar_seconds is not None:
+            if timeframe in self.tfs:
+                idx = pd.period_range(
+                    rf.index.min(), rf.index.max(), freq=timeframe).to_timestamp()
+            else:
+                idx = pd.date_range(rf.index.min(), rf.index.max(), freq=pd.Timedelta(timeframe))
             rf = rf.reindex(idx)
             rf['volume'] = rf['volume'].fillna(value=0)
-            rf.fillna(method='ffill', inplace=True)
+            rf.ffill(inplace=True)
+            prof.checkpoint('fill_empty_ranges', rf)
 
         if pivot_levels > 0:
             rf = self.add_pivot_levels(df=rf, num_levels=pivot_levels)
+            prof.checkpoint('pivots', rf)
 
         if denoise_data is not None and type(denoise_data) == dict:
             denoise_func = denoise_data.get('func', None)
@@ -611,52 +1277,63 @@ class MetaTraderManager:
                 ssa_params=ssa_params,
                 emd_params=emd_params
             )
+            prof.checkpoint('denoise', rf)
 
         if add_price_summaries:
             rf['avgPrice'] = rf[['low', 'high']].mean(axis=1)
             rf['ohlcPrice'] = rf[['open', 'high', 'low', 'close']].mean(axis=1)
             rf['range'] = rf['high'] - rf['low']
             rf['momentum'] = rf['open'] - rf['close']
+            prof.checkpoint('price_summaries', rf)
 
-        for field in sr_fields:
-            if field in rf.columns and pd.api.types.is_numeric_dtype(rf[field]):
-                for level in sr_levels:
-                    rf["support_%s_%s" % (str(level), field)] = rf[field].shift(
-                        1).rolling(int(level)).min()
-                    rf["resistance_%s_%s" % (str(level), field)] = rf[field].shift(
-                        1).rolling(int(level)).max()
-            else:
-                print("Field %s does not exist or is not numeric!" % field)
+        if sr_levels:
+            fields = []
+            for field in sr_fields:
+                if field in rf.columns and pd.api.types.is_numeric_dtype(rf[field]):
+                    fields.append(field)
+                else:
+                    print("Field %s does not exist or is not numeric!" % field)
+            sr = support_resistance(rf, fields, sr_levels, outputs=sr_outputs)
+            rf = pd.concat([rf.drop(columns=[c for c in sr.columns if c in rf.columns]), sr], axis=1)
+            prof.checkpoint('sr_levels', rf)
 
         if add_meta_dates:
             d = rf.index.to_series()
-            if mt_timeframe < mt5.TIMEFRAME_H1:
+            if bar_seconds is None or bar_seconds < 3600:
                 rf['minute'] = d.dt.minute
-            if mt_timeframe < mt5.TIMEFRAME_D1:
+            if bar_seconds is None or bar_seconds < 86400:
                 rf['hour'] = d.dt.hour
             rf['day'] = d.dt.day
             rf['month'] = d.dt.month
             rf['weekday'] = d.dt.dayofweek
             if add_year:
                 rf['year'] = d.dt.year
+            prof.checkpoint('meta_dates', rf)
 
         if taf_all:
             rf = TA_Features.get_all_indicators(rf)
+            prof.checkpoint('taf_all', rf)
 
-        rf = self.add_indicators(talib, talib_indicators, rf, silent=silent)
-        rf = self.add_indicators(ta, ta_indicators, rf, silent=silent)
-        rf = self.add_indicators(mtds_ni, native_indicators, rf, silent=silent)
-        rf = self.add_indicators(
-            pandas_ta, pandasta_indicators, rf, silent=silent)
+        for library, indicators in ((talib, talib_indicators), (ta, ta_indicators),
+                                    (mtds_ni, native_indicators), (pandas_ta, pandasta_indicators)):
+            rf = self.add_indicators(library, indicators, rf, silent=silent)
+            if indicators:
+                prof.checkpoint(library.__name__, rf)
 
-        if ta_all:
+        if ta_all == 'ta':
             rf = ta.add_all_ta_features(
                 rf, open="open", high="high", low="low", close="close", volume="volume", fillna=True)
+            prof.checkpoint('ta_all', rf)
+        elif ta_all:
+            # Native engine; a list of column names computes just those
+            rf = ta_native.add_all_ta_features(rf, columns=ta_all if isinstance(ta_all, (list, tuple)) else None)
+            prof.checkpoint('ta_all', rf)
 
         if talib_candle_patterns:
             for p in talib.get_function_groups()['Pattern Recognition']:
                 rf[p] = (getattr(talib, p)(rf['open'].astype(float), rf['high'].astype(
                     float), rf['low'].astype(float), rf['close'].astype(float)) / 100).astype('int')
+            prof.checkpoint('candle_patterns', rf)
 
         for m in mas:
             fields = m.get("fields", None)
@@ -675,6 +1352,8 @@ class MetaTraderManager:
                         print("Method %s is not supported!" % m["method"])
                 else:
                     print("Field %s does not exist or is not numeric!" % field)
+        if mas:
+            prof.checkpoint('mas', rf)
 
         for lb in lookbacks:
             if lb["field"] in rf.columns:
@@ -686,10 +1365,17 @@ class MetaTraderManager:
                     else:
                         rf[f"lb_{period}_{lb['field']}"] = rf[lb["field"]].shift(
                             period)
+        if lookbacks:
+            prof.checkpoint('lookbacks', rf)
+
+        if mtf_timeframes:
+            rf = self.add_higher_timeframes(rf, base_bars, timeframe, mtf_timeframes, mtf_options,
+                                            instrument=instrument, profile=prof, silent=silent)
 
         if drop_na:
             rf.replace([np.inf, -np.inf], np.nan, inplace=True)
             rf.dropna(inplace=True)
+            prof.checkpoint('dropna', rf)
 
         if not silent:
             print("Metatrader 5 - [%s/%s] - Providing %s bars" %
@@ -702,12 +1388,12 @@ class MetaTraderManager:
         if len(drop_columns) > 0:
             rf.drop(columns=drop_columns, inplace=True)
 
-        self.mt5.shutdown()
-
         # Ensure correct data types before returning
         for col in rf.columns:
             if col.startswith('denoised_'):
                 rf[col] = rf[col].astype('float64')
             if col == 'Date' or col.endswith('_time'):
                 rf[col] = pd.to_datetime(rf[col])
-        return rf.copy()
+        rf = rf.copy()
+        prof.checkpoint('copy', rf)
+        return rf
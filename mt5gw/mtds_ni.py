@@ -1,5 +1,6 @@
 import numpy as np
 import talib
+from .ssa import rolling_forecast
 
 def apply_smoothing(series, method='EMA', period=14):
     """
@@ -299,20 +300,94 @@ def ehlers_rpi(high_series, low_series, volume_series, minperiod=8, maxperiod=50
     # Creating the final NumPy array with V1 and V2    
     return v1,v2
 
+def smoothing_stack(series, periods, method='EMA'):
+    """
+    Smooths a series with several periods into one 2-D array.
+
+    Parameters:
+    - series: NumPy array to smooth.
+    - periods: Smoothing periods, one row each.
+    - method: Smoothing method (see apply_smoothing).
+
+    Returns:
+    - NumPy array of shape (len(periods), len(series)).
+    """
+    series = np.asarray(series, dtype=np.float64)
+    stack = np.empty((len(periods), len(series)))
+    for row, period in enumerate(periods):
+        stack[row] = apply_smoothing(series, method=method, period=int(period))
+    return stack
+
+def direction_counts(stack, selection=None):
+    """
+    Counts, per bar, the rows of a 2-D array that rose and that did not rise since the previous bar.
+
+    Parameters:
+    - stack: NumPy array of shape (series, bars).
+    - selection: Optional 0/1 array of shape (groups, series); rows are then counted per group,
+      all groups in one matrix product.
+
+    Returns:
+    - ups: Number of rows with value > previous value (0 on the first bar).
+    - dns: Number of rows with value <= previous value (0 on the first bar).
+    Arrays of shape (groups, bars) with a selection.
+    """
+    grouped = selection is not None
+    if not grouped:
+        selection = np.ones((1, stack.shape[0]))
+    current, previous = stack[:, 1:], stack[:, :-1]
+    selection = np.asarray(selection, dtype=np.float32)
+    ups = np.zeros((len(selection), stack.shape[1]))
+    dns = np.zeros((len(selection), stack.shape[1]))
+    ups[:, 1:] = selection @ (current > previous).astype(np.float32)
+    dns[:, 1:] = selection @ (current <= previous).astype(np.float32)
+    return (ups, dns) if grouped else (ups[0], dns[0])
+
+def _ultra(bases, W_Method, StartLength, Step, StepsTotal, SmoothMethod, SmoothLength):
+    """
+    Bull/bear counts of an oscillator smoothed over StepsTotal + 1 periods.
+
+    Parameters:
+    - bases: List of oscillator arrays, one per oscillator period.
+    - Step: Period change step, or a list of steps.
+    - Other parameters as in ultra_rsi.
+
+    Returns:
+    - Tuple of bulls and bears for every (base, step) pair, bases first.
+    """
+    steps = list(Step) if isinstance(Step, (list, tuple)) else [Step]
+    configs = [[StartLength + sm * step for sm in range(StepsTotal + 1)] for step in steps]
+    # Periods shared by several steps are smoothed and compared only once
+    periods = sorted(set(p for config in configs for p in config))
+    selection = np.zeros((len(configs), len(periods)))
+    for row, config in enumerate(configs):
+        selection[row, [periods.index(p) for p in config]] = 1
+    result = ()
+    for base in bases:
+        ups, dns = direction_counts(smoothing_stack(base, periods, method=W_Method), selection)
+        for row in range(len(configs)):
+            result += (apply_smoothing(ups[row], method=SmoothMethod, period=SmoothLength),
+                       apply_smoothing(dns[row], method=SmoothMethod, period=SmoothLength))
+    return result
+
 def ultra_wpr(high_series, low_series, close_series, WPR_Period=13, W_Method='EMA', StartLength=3, WPhase=100, Step=5, StepsTotal=10,
               SmoothMethod='EMA', SmoothLength=3, SmoothPhase=100):
     """
     Ultra WPR indicator implementation using TA-Lib and apply_smoothing.
 
+    WPR is smoothed with StepsTotal + 1 periods into one 2-D array, whose rising and
+    falling rows are counted in a single comparison. WPR_Period and Step also take lists,
+    which computes every (WPR_Period, Step) combination in one call.
+
     Parameters:
     - high_series: NumPy array of high prices.
     - low_series: NumPy array of low prices.
     - close_series: NumPy array of close prices.
-    - WPR_Period: Period for WPR calculation.
+    - WPR_Period: Period for WPR calculation (int or list).
     - W_Method: Smoothing method for WPR.
     - StartLength: Initial smoothing period.
     - WPhase: Smoothing parameter (not used in this implementation).
-    - Step: Period change step.
+    - Step: Period change step (int or list).
     - StepsTotal: Number of period changes.
     - SmoothMethod: Smoothing method for the counts.
     - SmoothLength: Smoothing depth.
@@ -321,40 +396,14 @@ def ultra_wpr(high_series, low_series, close_series, WPR_Period=13, W_Method='EM
     Returns:
     - bulls: Smoothed counts of increasing smoothed WPR values.
     - bears: Smoothed counts of decreasing smoothed WPR values.
+    With lists, bulls and bears of each combination in turn (WPR_Period outer, Step inner).
     """
-
-    # Compute WPR using TA-Lib
-    wpr = talib.WILLR(high_series, low_series, close_series, timeperiod=WPR_Period)
-
-    # Initialize periods
-    periods = [StartLength + sm * Step for sm in range(StepsTotal + 1)]
-
-    # Initialize lists to store smoothed WPRs
-    xwpr0 = []
-
-    # Compute smoothed WPRs for each period
-    for period in periods:
-        smoothed_wpr = apply_smoothing(wpr, method=W_Method, period=period)
-        xwpr0.append(smoothed_wpr)
-
-    # Initialize ups and dns arrays
-    ups = np.zeros_like(wpr)
-    dns = np.zeros_like(wpr)
-
-    # For each smoothed WPR, compare current value with previous value
-    for smoothed_series in xwpr0:
-        xwpr_current = smoothed_series
-        xwpr_previous = np.roll(xwpr_current, 1)
-        xwpr_previous[0] = np.nan  # Handle first element
-
-        ups += (xwpr_current > xwpr_previous).astype(int)
-        dns += (xwpr_current <= xwpr_previous).astype(int)
-
-    # Smooth the ups and dns counts using apply_smoothing
-    bulls = apply_smoothing(ups, method=SmoothMethod, period=SmoothLength)
-    bears = apply_smoothing(dns, method=SmoothMethod, period=SmoothLength)
-
-    return bulls, bears
+    high_series = np.asarray(high_series, dtype=np.float64)
+    low_series = np.asarray(low_series, dtype=np.float64)
+    close_series = np.asarray(close_series, dtype=np.float64)
+    wpr_periods = WPR_Period if isinstance(WPR_Period, (list, tuple)) else [WPR_Period]
+    bases = [talib.WILLR(high_series, low_series, close_series, timeperiod=p) for p in wpr_periods]
+    return _ultra(bases, W_Method, StartLength, Step, StepsTotal, SmoothMethod, SmoothLength)
 
 
 def ultra_rsi(price_series, RSI_Period=13, W_Method='EMA', StartLength=3, WPhase=100, Step=5, StepsTotal=10,
@@ -362,13 +411,17 @@ def ultra_rsi(price_series, RSI_Period=13, W_Method='EMA', StartLength=3, WPhase
     """
     Ultra RSI indicator implementation using TA-Lib and apply_smoothing.
 
+    RSI is smoothed with StepsTotal + 1 periods into one 2-D array, whose rising and
+    falling rows are counted in a single comparison. RSI_Period and Step also take lists,
+    which computes every (RSI_Period, Step) combination in one call.
+
     Parameters:
     - price_series: NumPy array of prices (e.g., close prices).
-    - RSI_Period: Period for RSI calculation.
+    - RSI_Period: Period for RSI calculation (int or list).
     - W_Method: Smoothing method for RSI ('EMA', 'SMA', 'WMA', 'DEMA', 'T3', 'KAMA', 'TRIMA').
     - StartLength: Initial smoothing period.
     - WPhase: Smoothing parameter (not used in this implementation).
-    - Step: Period change step.
+    - Step: Period change step (int or list).
     - StepsTotal: Number of period changes.
     - SmoothMethod: Smoothing method for the counts.
     - SmoothLength: Smoothing depth.
@@ -377,37 +430,37 @@ def ultra_rsi(price_series, RSI_Period=13, W_Method='EMA', StartLength=3, WPhase
     Returns:
     - bulls: Smoothed counts of increasing smoothed RSI values.
     - bears: Smoothed counts of decreasing smoothed RSI values.
+    With lists, bulls and bears of each combination in turn (RSI_Period outer, Step inner).
     """
-    # Compute RSI using TA-Lib
-    rsi = talib.RSI(price_series, timeperiod=RSI_Period)
-
-    # Initialize periods
-    periods = [StartLength + sm * Step for sm in range(StepsTotal + 1)]
-
-    # Initialize lists to store smoothed RSIs
-    xrsis = []
+    price_series = np.asarray(price_series, dtype=np.float64)
+    rsi_periods = RSI_Period if isinstance(RSI_Period, (list, tuple)) else [RSI_Period]
+    bases = [talib.RSI(price_series, timeperiod=p) for p in rsi_periods]
+    return _ultra(bases, W_Method, StartLength, Step, StepsTotal, SmoothMethod, SmoothLength)
 
-    # Compute smoothed RSI for each period
-    for period in periods:
-        smoothed_rsi = apply_smoothing(rsi, method=W_Method, period=period)
-        xrsis.append(smoothed_rsi)
 
-    # Initialize ups and dns arrays
-    ups = np.zeros_like(rsi)
-    dns = np.zeros_like(rsi)
-
-    # For each smoothed RSI, compare current value with previous value
-    for smoothed_series in xrsis:
-        xrsi_current = smoothed_series
-        xrsi_previous = np.roll(xrsi_current, 1)
-        xrsi_previous[0] = np.nan  # Handle first element
+def ssa_forecast(price_series, window=250, embedding_dimension=20, n_components=2, steps_ahead=1, ratio=True):
+    """
+    Rolling SSA (Singular Spectrum Analysis) forecast using mt5gw.ssa.
 
-        # Increment 'ups' and 'dns' counts
-        ups += (xrsi_current > xrsi_previous).astype(int)
-        dns += (xrsi_current <= xrsi_previous).astype(int)
+    At every bar, SSA is fitted on the last `window` prices and the series is extended
+    with its linear recurrence (as mySSA.forecast_recurrent); all windows are fitted in
+    batches.
 
-    # Smooth the ups and dns counts using apply_smoothing
-    bulls = apply_smoothing(ups, method=SmoothMethod, period=SmoothLength)
-    bears = apply_smoothing(dns, method=SmoothMethod, period=SmoothLength)
+    Parameters:
+    - price_series: NumPy array of prices (e.g., close prices).
+    - window: Bars per SSA fit.
+    - embedding_dimension: SSA window length (< window).
+    - n_components: Leading components used for the forecast.
+    - steps_ahead: Forecast horizon in bars.
+    - ratio: If True, returns the percentage difference between the forecast and the price.
 
-    return bulls, bears
\ No newline at end of file
+    Returns:
+    - forecast or forecast_pct_diff: Forecast made at each bar, or its percentage difference
+      from the price (NaN for the first window - 1 bars).
+    """
+    price_series = np.asarray(price_series, dtype=np.float64)
+    forecast = rolling_forecast(price_series, window=window, embedding_dimension=embedding_dimension,
+                                n_components=n_components, steps_ahead=steps_ahead)
+    if ratio:
+        return ((forecast - price_series) / price_series) * 100
+    return forecast
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from .history import timeframe_seconds
+
+# MT5 weeks start on Sunday; the epoch (1970-01-01) was a Thursday
+WEEK_OFFSET = 4 * 86400
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _seconds(index):
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+
+def bucket_bounds(times, timeframe):
+    """
+    Higher-timeframe bucket of each timestamp.
+
+    Parameters:
+    - times (numpy array): Bar open times in Unix seconds, ascending.
+    - timeframe (str): Timeframe name ('1h', '4h', '1d', '1w', '1m', ...) or pandas offset alias.
+
+    Returns:
+    - (keys, start, end): bucket id of every time, and the open and close time (Unix seconds)
+      of every bucket id as functions of the ids (arrays aligned with `keys`).
+    """
+    if timeframe == '1m':
+        months = times.astype('datetime64[s]').astype('datetime64[M]')
+        keys = months.astype(np.int64)
+        start = months.astype('datetime64[s]').astype(np.int64)
+        end = (months + 1).astype('datetime64[s]').astype(np.int64)
+        return keys, start, end
+    seconds = timeframe_seconds(timeframe)
+    offset = WEEK_OFFSET if timeframe == '1w' else 0
+    keys = (times + offset) // seconds
+    start = keys * seconds - offset
+    return keys, start, start + seconds
+
+
+def resample_bars(frame, timeframe, drop_partial=True):
+    """
+    Aggregate OHLCV bars into a higher timeframe with reduceat over bucket boundaries.
+
+    Buckets are aligned like MT5 bars: to the epoch for intraday and daily timeframes,
+    to Sunday for '1w' and to calendar months for '1m'.
+
+    Parameters:
+    - frame (DataFrame): OHLCV bars indexed by open time, ascending.
+    - timeframe (str): Higher timeframe.
+    - drop_partial (bool): Drop the first bucket when `frame` starts after its open time,
+      as the bars before the start of the download are missing from it.
+
+    Returns:
+    - (bars, end): the higher-timeframe OHLCV frame indexed by bucket open time, and the
+      close time (Unix seconds) of each of its bars.
+    """
+    times = _seconds(frame.index)
+    if len(times) == 0:
+        return frame[OHLCV].iloc[:0], np.empty(0, dtype=np.int64)
+    keys, start, end = bucket_bounds(times, timeframe)
+    firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lasts = np.r_[firsts[1:] - 1, len(times) - 1]
+    values = {c: frame[c].to_numpy() for c in OHLCV}
+    bars = pd.DataFrame({
+        'open': values['open'][firsts],
+        'high': np.maximum.reduceat(values['high'], firsts),
+        'low': np.minimum.reduceat(values['low'], firsts),
+        'close': values['close'][lasts],
+        'volume': np.add.reduceat(values['volume'], firsts),
+    }, index=pd.DatetimeIndex(start[firsts].astype('datetime64[s]'), name=frame.index.name))
+    end = end[firsts]
+    if drop_partial and times[0] > start[0]:
+        bars, end = bars.iloc[1:], end[1:]
+    return bars, end
+
+
+def join_completed(frame, features, end, base_seconds, prefix):
+    """
+    As-of join of higher-timeframe rows onto `frame`, showing only completed bars.
+
+    A higher-timeframe bar becomes visible on the base bar that closes with it, i.e. the
+    base bar opening at end - base_seconds, and stays until the next one completes, so
+    no row sees a bar that was still forming when the row itself closed.
+
+    Parameters:
+    - frame (DataFrame): Base rows indexed by open time.
+    - features (DataFrame): Higher-timeframe rows, ascending.
+    - end (numpy array): Close time (Unix seconds) of each row of `features`.
+    - base_seconds (int): Base bar length in seconds.
+    - prefix (str): Prefix of the joined column names.
+
+    Returns:
+    - DataFrame with the index of `frame` and the prefixed columns of `features`
+      (NaN before the first completed bar).
+    """
+    visible = np.asarray(end, dtype=np.int64) - int(base_seconds)
+    rows = np.searchsorted(visible, _seconds(frame.index), side='right') - 1
+    values = features.to_numpy(dtype=np.float64, na_value=np.nan)
+    block = np.empty((len(frame), values.shape[1]), order='F')
+    block[:] = values[np.maximum(rows, 0)] if len(values) else np.nan
+    block[rows < 0] = np.nan
+    return pd.DataFrame(block, index=frame.index, columns=[prefix + str(c) for c in features.columns],
+                        copy=False)
@@ -3,6 +3,7 @@ import pandas as pd
 from numpy import matrix as m
 from pandas import DataFrame as df
 from scipy import linalg
+from .ssa import recurrence_coefficients, recurrent_forecast
 try:
     import seaborn
 except:
@@ -55,21 +56,11 @@ class mySSA(object):
     def diagonal_averaging(hankel_matrix):
         '''Performs anti-diagonal averaging from given hankel matrix
         Returns: Pandas DataFrame object containing the reconstructed series'''
-        mat = m(hankel_matrix)
+        mat = np.asarray(hankel_matrix, dtype=np.float64)
         L, K = mat.shape
-        L_star, K_star = min(L,K), max(L,K)
-        new = np.zeros((L,K))
-        if L > K:
-            mat = mat.T
-        ret = []
-        
-        #Diagonal Averaging
-        for k in range(1-K_star, L_star):
-            mask = np.eye(K_star, k=k, dtype='bool')[::-1][:L_star,:]
-            mask_n = sum(sum(mask))
-            ma = np.ma.masked_array(mat.A, mask=1-mask)
-            ret+=[ma.sum()/mask_n]
-        
+        # Element (i, j) belongs to anti-diagonal i + j; one weighted bincount sums them all
+        diagonals = np.add.outer(np.arange(L), np.arange(K)).ravel()
+        ret = np.bincount(diagonals, weights=mat.ravel()) / np.bincount(diagonals)
         return df(ret).rename(columns={0:'Reconstruction'})
         
     def view_time_series(self):
@@ -177,8 +168,6 @@ class mySSA(object):
             return hankel_full
     
     def _forecast_prep(self, singular_values=None):
-        self.X_com_hat = np.zeros(self.complete_dimensions)
-        self.verticality_coefficient = 0
         self.forecast_orthonormal_base = {}
         if singular_values:
             try:
@@ -191,34 +180,20 @@ class mySSA(object):
                     raise('Please pass in a list/array of singular value indices to use for forecast')
         else:
             self.forecast_orthonormal_base = self.orthonormal_base
-        self.R = np.zeros(self.forecast_orthonormal_base[0].shape)[:-1]
-        for Pi in self.forecast_orthonormal_base.values():
-            self.X_com_hat += Pi*Pi.T*self.X_com
-            pi = np.ravel(Pi)[-1]
-            self.verticality_coefficient += pi**2
-            self.R += pi*Pi[:-1]
-        self.R = m(self.R/(1-self.verticality_coefficient))
+        P = np.hstack(list(self.forecast_orthonormal_base.values()))
+        # Projection of the trajectory matrix onto the selected eigenvectors, P (P' X)
+        self.X_com_hat = np.asarray(P*(P.T*self.X_com))
+        self.verticality_coefficient = float((np.ravel(P[-1])**2).sum())
+        self.R = m(recurrence_coefficients(np.asarray(P))).T
         self.X_com_tilde = self.diagonal_averaging(self.X_com_hat)
         
     def forecast_recurrent(self, steps_ahead=12, singular_values=None, plot=False, return_df=False, **plotargs):
         '''Forecast from last point of original time series up to steps_ahead using recurrent methodology
         This method also fills any missing data from the original time series.'''
-        try:
-            self.X_com_hat
-        except(AttributeError):
+        if not hasattr(self, 'X_com_hat'):
             self._forecast_prep(singular_values)
-        self.ts_forecast = np.array(self.ts_v[0])
-        for i in range(1, self.ts_N+steps_ahead):
-            try:
-                if np.isnan(self.ts_v[i]):
-                    x = self.R.T*m(self.ts_forecast[max(0,i-self.R.shape[0]): i]).T
-                    self.ts_forecast = np.append(self.ts_forecast,x[0])
-                else:
-                    self.ts_forecast = np.append(self.ts_forecast,self.ts_v[i])
-            except(IndexError):
-                x = self.R.T*m(self.ts_forecast[i-self.R.shape[0]: i]).T
-                self.ts_forecast = np.append(self.ts_forecast, x[0])
-        self.forecast_N = i+1
+        self.ts_forecast = recurrent_forecast(np.ravel(self.ts_v), np.ravel(self.R), steps_ahead)
+        self.forecast_N = len(self.ts_forecast)
         new_index = pd.date_range(start=self.ts.index.min(),periods=self.forecast_N, freq=self.freq)
         forecast_df = df(self.ts_forecast, columns=['Forecast'], index=new_index)
         forecast_df['Original'] = np.append(self.ts_v, [np.nan]*steps_ahead)
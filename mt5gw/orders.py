@@ -0,0 +1,259 @@
+import bisect
+import threading
+import time
+import numpy as np
+from .broker import PRIORITY_ORDER
+
+# Histogram bucket upper bounds in milliseconds (log-spaced, 50 us .. 30 s)
+LATENCY_BOUNDS_MS = tuple(float(b) for b in np.geomspace(0.05, 30000.0, 80))
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Recording is O(log buckets) with no allocation, so it can sit on the order
+    path; percentiles are read from the cumulative bucket counts and are exact
+    to within one bucket (about 18% with the default bounds).
+
+    Parameters:
+    - bounds_ms (sequence of float): Increasing bucket upper bounds in milliseconds.
+    """
+
+    def __init__(self, bounds_ms=LATENCY_BOUNDS_MS):
+        self.bounds = [float(b) for b in bounds_ms]
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        ms = seconds * 1000.0
+        i = bisect.bisect_left(self.bounds, ms)
+        with self.lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += ms
+            self.min = ms if self.min is None else min(self.min, ms)
+            self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, q):
+        """Upper bound (ms) of the bucket holding the q-th percentile, or None if empty."""
+        with self.lock:
+            if self.count == 0:
+                return None
+            rank = np.searchsorted(np.cumsum(self.counts), q / 100.0 * self.count)
+        if rank >= len(self.bounds):
+            return self.max
+        return min(self.bounds[rank], self.max)
+
+    def summary(self):
+        """Count, mean, min, max and p50/p90/p99 latency in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else None,
+            'min_ms': self.min,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+        }
+
+    def reset(self):
+        with self.lock:
+            self.counts[:] = 0
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+
+
+class OrderExecutor:
+    """
+    Order path of MetaTraderManager: validation, idempotency and latency tracking.
+
+    Requests are checked against the cached symbol catalog (trade mode, volume
+    limits and step, price digits) before anything is sent, so invalid orders
+    fail locally without a terminal round-trip. Every order_send is timed on the
+    broker thread (`latency`) and from the caller including queueing
+    (`round_trip`).
+
+    A request sent with an idempotency key is sent at most once while the key is
+    remembered: retries with the same key return the first result, and a retry
+    racing an in-flight send waits for it (up to `wait_timeout` seconds) instead of
+    sending again. On the broker thread the retry cannot wait, as the send it would
+    wait for needs that thread, so it raises a RuntimeError at once.
+
+    Parameters:
+    - manager (MetaTraderManager): Manager whose broker and symbol catalog are used.
+    - key_ttl (float): Seconds an idempotency key is remembered.
+    - wait_timeout (float): Seconds a retry waits for the in-flight send of its key
+      before raising a TimeoutError.
+    """
+
+    def __init__(self, manager, key_ttl=300.0, wait_timeout=60.0):
+        self.manager = manager
+        self.mt5 = manager.mt5
+        self.key_ttl = key_ttl
+        self.wait_timeout = wait_timeout
+        self.latency = LatencyHistogram()
+        self.round_trip = LatencyHistogram()
+        self.lock = threading.Lock()
+        self.sent = {}
+        self.in_flight = {}
+
+    def validate(self, request):
+        """
+        Check and normalize an order_send request against the symbol catalog.
+
+        Volume is snapped to the symbol's volume step and prices are rounded to its
+        digits. Symbols missing from the catalog (e.g. added since its last refresh) are
+        looked up in the terminal before being rejected. Raises ValueError for unknown or
+        non-tradable symbols and invalid volumes.
+
+        Returns:
+        - dict: Normalized copy of the request.
+        """
+        symbol = request.get('symbol')
+        info = self.manager.symbols.row(symbol)
+        if info is None and symbol is not None:
+            record = self.manager.get_symbol_info(symbol, live=True)
+            if record is not None:
+                info = {f: getattr(record, f, None) for f in self.manager.symbols.fields}
+        if info is None:
+            raise ValueError("Unknown symbol: %s" % symbol)
+
+        mt5 = self.mt5
+        mode = info.get('trade_mode')
+        opening = 'position' not in request and request.get('action') in (mt5.TRADE_ACTION_DEAL,
+                                                                           mt5.TRADE_ACTION_PENDING)
+        is_buy = request.get('type') in (mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_BUY_LIMIT, mt5.ORDER_TYPE_BUY_STOP)
+        if mode == mt5.SYMBOL_TRADE_MODE_DISABLED:
+            raise ValueError("Trading is disabled for %s" % symbol)
+        if opening and mode == mt5.SYMBOL_TRADE_MODE_CLOSEONLY:
+            raise ValueError("%s only accepts closing orders" % symbol)
+        if opening and mode == mt5.SYMBOL_TRADE_MODE_LONGONLY and not is_buy:
+            raise ValueError("%s only accepts long positions" % symbol)
+        if opening and mode == mt5.SYMBOL_TRADE_MODE_SHORTONLY and is_buy:
+            raise ValueError("%s only accepts short positions" % symbol)
+
+        request = dict(request)
+        if 'volume' in request:
+            volume, step = float(request['volume']), info.get('volume_step')
+            if step:
+                steps = round(volume / step)
+                if abs(steps * step - volume) > step * 1e-6:
+                    raise ValueError("Volume %s is not a multiple of %s for %s" % (volume, step, symbol))
+                volume = round(steps * step, 8)
+            if info.get('volume_min') and volume < info['volume_min'] - 1e-12:
+                raise ValueError("Volume %s is below the minimum %s for %s" % (volume, info['volume_min'], symbol))
+            if info.get('volume_max') and volume > info['volume_max'] + 1e-12:
+                raise ValueError("Volume %s is above the maximum %s for %s" % (volume, info['volume_max'], symbol))
+            request['volume'] = volume
+
+        digits = info.get('digits')
+        if digits is not None:
+            for field in ('price', 'sl', 'tp', 'stoplimit'):
+                if field in request:
+                    request[field] = round(float(request[field]), int(digits))
+        return request
+
+    def _order_send(self, request):
+        self.manager.session.ensure()
+        start = time.perf_counter()
+        try:
+            return self.mt5.order_send(request)
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+    def _forget_expired(self, now):
+        expired = [k for k, (at, _) in self.sent.items() if now - at >= self.key_ttl]
+        for k in expired:
+            del self.sent[k]
+
+    def send(self, request, key=None, validate=True):
+        """
+        Send one order_send request.
+
+        Parameters:
+        - request (dict): order_send request.
+        - key (hashable, optional): Idempotency key; a retry with the same key does not send again.
+        - validate (bool): Check the request against the symbol catalog first.
+
+        Returns:
+        - OrderSendResult as returned by the terminal (None if the terminal rejected the call).
+        """
+        if validate:
+            request = self.validate(request)
+        if key is None:
+            return self._submit(request)
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._forget_expired(now)
+                if key in self.sent:
+                    return self.sent[key][1]
+                waiting = self.in_flight.get(key)
+                if waiting is None:
+                    self.in_flight[key] = threading.Event()
+                    break
+            if self.manager.broker.in_worker():
+                # The in-flight send is queued behind this thread, waiting would hang both
+                raise RuntimeError("Order with key %r is already being sent" % (key,))
+            if not waiting.wait(self.wait_timeout):
+                raise TimeoutError("Order with key %r still in flight after %s s" % (key, self.wait_timeout))
+
+        result = None
+        try:
+            result = self._submit(request)
+        finally:
+            with self.lock:
+                # Only a result from the terminal is final; a failed call can be retried
+                if result is not None:
+                    self.sent[key] = (time.monotonic(), result)
+                self.in_flight.pop(key).set()
+        return result
+
+    def _submit(self, request):
+        start = time.perf_counter()
+        try:
+            return self.manager.broker.call(PRIORITY_ORDER, self._order_send, request)
+        finally:
+            self.round_trip.record(time.perf_counter() - start)
+
+    def close_request(self, position, volume=None):
+        """order_send request closing `position` (or `volume` lots of it)."""
+        mt5 = self.mt5
+        return {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": position.symbol,
+            "volume": position.volume if volume is None else float(volume),
+            "type": mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY,
+            "position": position.ticket,
+            "type_filling": mt5.ORDER_FILLING_IOC
+        }
+
+    def close_positions(self, positions, key=None):
+        """
+        Close every position of a snapshot.
+
+        Parameters:
+        - positions (sequence): TradePosition records, e.g. one positions_get() call.
+        - key (hashable, optional): Idempotency key of the batch; each close uses (key, ticket).
+
+        Returns:
+        - dict mapping ticket to its OrderSendResult (None where the terminal rejected the call).
+        """
+        results = {}
+        for pos in positions:
+            close_key = None if key is None else (key, pos.ticket)
+            results[pos.ticket] = self.send(self.close_request(pos), key=close_key)
+        return results
+
+    def metrics(self):
+        """Latency summaries of order_send calls (`latency`) and of caller round-trips (`round_trip`)."""
+        return {'latency': self.latency.summary(), 'round_trip': self.round_trip.summary(),
+                'idempotency_keys': len(self.sent)}
@@ -0,0 +1,167 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+import pandas as pd
+
+
+class FetchProfiler:
+    """
+    Per-stage timing and memory profile of fetch().
+
+    The pipeline calls checkpoint() after each stage; the profiler records the
+    wall time since the previous checkpoint, the shape of the frame produced and,
+    with memory=True, the tracemalloc peak reached during the stage (on Python
+    < 3.9 the peak is cumulative, as tracemalloc cannot reset it there).
+
+    Parameters:
+    - memory (bool): Trace allocation peaks with tracemalloc (slows the pipeline down).
+    - cprofile (bool): Run every stage under cProfile and keep the statistics of the slowest one.
+    - sink (callable, optional): Called with each stage record as soon as it is complete,
+      e.g. to forward it to a metrics system.
+
+    Each record is a dict with 'stage', 'instrument', 'seconds', 'rows', 'columns'
+    and 'peak_bytes' (None without memory tracing).
+    """
+
+    def __init__(self, memory=True, cprofile=False, sink=None):
+        self.memory = memory
+        self.cprofile = cprofile
+        self.sink = sink
+        self.stages = []
+        self.instrument = None
+        self.started = None
+        self.finished = None
+        self.depth = 0
+        self.outer = []
+        self.last = None
+        self.tracing = False
+        self.profile = None
+        self.slowest_profile = None
+        self.slowest_seconds = -1.0
+
+    def open(self, instrument=None):
+        """Start (or, when already open, re-enter) a profiled fetch."""
+        self.outer.append(self.instrument)
+        if self.depth == 0:
+            self.stages = []
+            self.started = time.perf_counter()
+            self.finished = None
+            self.slowest_profile = None
+            self.slowest_seconds = -1.0
+            if self.memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+        self.depth += 1
+        self.begin(instrument)
+
+    def begin(self, instrument=None):
+        """Reset the stage clock; following stages are tagged with `instrument`."""
+        self.instrument = instrument
+        self._restart()
+
+    def _restart(self):
+        if self.memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        if self.cprofile:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.last = time.perf_counter()
+
+    def checkpoint(self, stage, frame=None):
+        """Close the current stage, named `stage`, that produced `frame`."""
+        now = time.perf_counter()
+        if self.profile is not None:
+            self.profile.disable()
+        seconds = now - self.last
+        record = {
+            'stage': stage,
+            'instrument': self.instrument,
+            'seconds': seconds,
+            'rows': None if frame is None else frame.shape[0],
+            'columns': None if frame is None or frame.ndim < 2 else frame.shape[1],
+            'peak_bytes': tracemalloc.get_traced_memory()[1] if self.memory and tracemalloc.is_tracing() else None,
+        }
+        self.stages.append(record)
+        if self.profile is not None and seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_profile = self.profile
+        if self.sink is not None:
+            self.sink(record)
+        self._restart()
+        return record
+
+    def close(self):
+        """Leave a profiled fetch; the outermost close stops tracing."""
+        self.depth = max(self.depth - 1, 0)
+        self.instrument = self.outer.pop() if self.outer else None
+        if self.depth > 0:
+            return
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile = None
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        self.finished = time.perf_counter()
+
+    def slowest(self):
+        """Record of the slowest stage, or None."""
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda s: s['seconds'])
+
+    def cprofile_stats(self, sort='cumulative', limit=25):
+        """cProfile report of the slowest stage as text (cprofile=True only)."""
+        if self.slowest_profile is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self.slowest_profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def report(self):
+        """
+        Returns:
+        - dict with 'stages' (list of records), 'total_seconds' and 'slowest' (stage name).
+        """
+        end = self.finished if self.finished is not None else time.perf_counter()
+        slowest = self.slowest()
+        return {
+            'stages': list(self.stages),
+            'total_seconds': None if self.started is None else end - self.started,
+            'slowest': None if slowest is None else slowest['stage'],
+        }
+
+    def to_frame(self):
+        """Stage records as a DataFrame, one row per stage."""
+        return pd.DataFrame(self.stages, columns=['stage', 'instrument', 'seconds', 'rows', 'columns',
+                                                  'peak_bytes'])
+
+
+class NullProfiler:
+    """Stand-in used when fetch() is not profiled; every call is a no-op."""
+
+    def open(self, instrument=None):
+        pass
+
+    def begin(self, instrument=None):
+        pass
+
+    def checkpoint(self, stage, frame=None):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def get_profiler(profile):
+    """Profiler for a fetch() `profile` argument: a FetchProfiler, True (new one) or None/False."""
+    if profile is True:
+        return FetchProfiler()
+    if not profile:
+        return NULL_PROFILER
+    return profile
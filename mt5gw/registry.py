@@ -0,0 +1,152 @@
+import importlib
+import threading
+import time
+
+# Modules behind each registry name; names are what the pipeline and
+# required_libraries() refer to, values what gets imported on first use
+LIBRARIES = {
+    'MetaTrader5': 'MetaTrader5',
+    'talib': 'talib',
+    'ta': 'ta',
+    'pandas_ta': 'pandas_ta',
+    'tulipy': 'tulipy',
+    'pywt': 'pywt',
+    'dateutil': 'dateutil.parser',
+    'mtds_ni': 'mt5gw.mtds_ni',
+    'mySSA': 'mt5gw.mySSA',
+    'pykalman': 'pykalman',
+    'PyEMD': 'PyEMD',
+}
+
+# Libraries needed by each denoise_data method
+DENOISERS = {'wavelet': ('pywt',), 'ssa': ('mySSA',), 'kalman': ('pykalman',), 'emd': ('PyEMD',)}
+
+_lock = threading.RLock()
+_import_seconds = {}
+
+
+class LazyModule:
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    `__name__` is answered without importing, so proxies can be listed and logged
+    for free; any other attribute triggers the import (once, thread-safe) and is
+    then read from the real module.
+
+    Parameters:
+    - name (str): Registry name (see LIBRARIES).
+    """
+
+    def __init__(self, name):
+        self.__dict__['__name__'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = self.__dict__['_module'] = load(self.__dict__['__name__'])
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return "<lazy module %r (%s)>" % (self.__dict__['__name__'], state)
+
+
+def load(name):
+    """Import the module registered as `name` (any importable module name works too)."""
+    module_name = LIBRARIES.get(name, name)
+    with _lock:
+        if name in _import_seconds:
+            return importlib.import_module(module_name)
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _import_seconds[name] = time.perf_counter() - start
+        return module
+
+
+def lazy(name):
+    """LazyModule proxy for the module registered as `name`."""
+    return LazyModule(name)
+
+
+def available(name):
+    """True if the module registered as `name` can be imported."""
+    try:
+        load(name)
+        return True
+    except ImportError:
+        return False
+
+
+def loaded():
+    """
+    Returns:
+    - dict of the registry names imported so far and the seconds their first import took.
+    """
+    with _lock:
+        return dict(_import_seconds)
+
+
+def required_libraries(config):
+    """
+    Libraries a fetch()/build_features() configuration will use.
+
+    Parameters:
+    - config (dict): fetch() keyword arguments, e.g. a retrieval config loaded from JSON.
+
+    Returns:
+    - list of registry names.
+    """
+    names = []
+
+    def need(*libraries):
+        for library in libraries:
+            if library not in names:
+                names.append(library)
+
+    if config.get('talib_indicators') or config.get('talib_candle_patterns') or config.get('mas'):
+        need('talib')
+    if config.get('ta_indicators') or config.get('ta_all') == 'ta':
+        need('ta')
+    if config.get('pandasta_indicators'):
+        need('pandas_ta')
+    if config.get('tulip_indicators'):
+        need('tulipy')
+    if config.get('native_indicators'):
+        need('mtds_ni', 'talib')
+    denoise = config.get('denoise_data')
+    if isinstance(denoise, dict) and denoise.get('func') is None:
+        need(*DENOISERS.get(denoise.get('method', 'wavelet'), ()))
+    date_from = config.get('date_from')
+    if isinstance(date_from, str) or (date_from is not None and isinstance(config.get('date_to'), str)):
+        need('dateutil')
+    return names
+
+
+def preload(config=None, names=()):
+    """
+    Import the libraries a configuration needs ahead of the first fetch().
+
+    Long-running services can call this at startup so the first request does not pay
+    the import cost; short-lived workers can skip it and import on first use.
+
+    Parameters:
+    - config (dict, optional): fetch() keyword arguments (see required_libraries).
+    - names (list of str): Additional registry names to import.
+
+    Returns:
+    - list of the registry names imported.
+    """
+    wanted = list(names) + (required_libraries(config) if config else [])
+    for name in wanted:
+        load(name)
+    return wanted
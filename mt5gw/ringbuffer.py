@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size ring buffer of numpy rows with zero-copy windows.
+
+    Every row is written twice, at position i and i + capacity of a buffer of
+    twice the capacity (a mirrored ring), so the newest n rows are always one
+    contiguous slice: view() never copies or reorders, however often the ring
+    has wrapped.
+
+    Parameters:
+    - capacity (int): Number of rows kept.
+    - dtype (numpy.dtype): Row dtype (structured dtypes are fine).
+    - shape (tuple): Shape of each row for plain dtypes (e.g. (levels, 2)).
+    """
+
+    def __init__(self, capacity, dtype, shape=()):
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.data = np.zeros((2 * self.capacity,) + tuple(shape), dtype=dtype)
+        self.next = 0
+        self.size = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, row):
+        i = self.next
+        self.data[i] = row
+        self.data[i + self.capacity] = row
+        self.next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, rows):
+        """Append many rows with at most four slice copies."""
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self.capacity:
+            rows = rows[n - self.capacity:]
+        cap, i, m = self.capacity, self.next, len(rows)
+        first = min(m, cap - i)
+        self.data[i:i + first] = rows[:first]
+        self.data[i + cap:i + cap + first] = rows[:first]
+        rest = m - first
+        if rest:
+            self.data[:rest] = rows[first:]
+            self.data[cap:cap + rest] = rows[first:]
+        self.next = (i + m) % cap
+        self.size = min(self.size + m, cap)
+        self.total += n
+
+    def view(self, n=None):
+        """Newest n rows (all rows by default), oldest first, as a view into the buffer."""
+        n = self.size if n is None else min(int(n), self.size)
+        end = self.next + self.capacity
+        return self.data[end - n:end]
+
+    def last(self):
+        """Newest row, or None if the buffer is empty."""
+        if self.size == 0:
+            return None
+        return self.data[self.next + self.capacity - 1]
+
+    def clear(self):
+        self.next = 0
+        self.size = 0
@@ -0,0 +1,138 @@
+import threading
+import time
+
+
+class MT5Session:
+    """
+    Long-lived connection to the MetaTrader 5 terminal.
+
+    The terminal is attached once and reused by every call. The connection is
+    health-checked with terminal_info()/last_error() at most every
+    `health_interval` seconds and re-established with exponential backoff
+    when it is lost.
+
+    Parameters:
+    - mt5: The MetaTrader5 module.
+    - path, login, password, server, timeout: Forwarded to mt5.initialize() when set.
+    - max_retries (int): Connection attempts before giving up.
+    - backoff (float): Delay in seconds before the first retry; doubled after each failure.
+    - max_backoff (float): Upper bound for the retry delay.
+    - health_interval (float): Minimum seconds between two health checks.
+    """
+
+    def __init__(self, mt5, path=None, login=None, password=None, server=None, timeout=None,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, health_interval=1.0):
+        self.mt5 = mt5
+        self.path = path
+        self.init_kwargs = {k: v for k, v in {'login': login, 'password': password,
+                                              'server': server, 'timeout': timeout}.items() if v is not None}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.health_interval = health_interval
+        self.connected = False
+        self.last_check = 0.0
+        self.lock = threading.RLock()
+        self.stats = {'connects': 0,
+                      'reconnects': 0,
+                      'failed_attempts': 0,
+                      'health_checks': 0,
+                      'last_connect_latency': None,
+                      'total_connect_latency': 0.0,
+                      'last_error': None}
+
+    def _initialize(self):
+        if self.path is not None:
+            return self.mt5.initialize(self.path, **self.init_kwargs)
+        return self.mt5.initialize(**self.init_kwargs)
+
+    def connect(self):
+        """
+        Attach to the terminal, retrying with exponential backoff.
+
+        The lock is only held during each attempt, not while waiting for the next one, so
+        ensure() and health checks in other threads are not stalled by the retries.
+        """
+        delay = self.backoff
+        for attempt in range(self.max_retries):
+            with self.lock:
+                if attempt > 0 and self.connected:
+                    # Another thread reconnected while this one was waiting
+                    return True
+                start = time.perf_counter()
+                error = None
+                try:
+                    ok = self._initialize()
+                except Exception as e:
+                    ok = False
+                    error = str(e)
+                latency = time.perf_counter() - start
+                if ok:
+                    self.connected = True
+                    self.last_check = time.monotonic()
+                    self.stats['connects'] += 1
+                    self.stats['last_connect_latency'] = latency
+                    self.stats['total_connect_latency'] += latency
+                    return True
+                self.stats['failed_attempts'] += 1
+                self.stats['last_error'] = error if error is not None else self.mt5.last_error()
+            if attempt < self.max_retries - 1:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        with self.lock:
+            self.connected = False
+            raise ConnectionError("MT5 initialize() failed after %s attempts, error code = %s" % (
+                self.max_retries, self.stats['last_error']))
+
+    def is_healthy(self):
+        """Return True if the terminal answers over IPC."""
+        self.stats['health_checks'] += 1
+        try:
+            info = self.mt5.terminal_info()
+        except Exception as e:
+            self.stats['last_error'] = str(e)
+            return False
+        if info is None:
+            self.stats['last_error'] = self.mt5.last_error()
+            return False
+        return True
+
+    def ensure(self):
+        """Make sure the session is usable, reconnecting if the health check fails."""
+        with self.lock:
+            if self.connected:
+                now = time.monotonic()
+                if now - self.last_check < self.health_interval:
+                    return True
+                self.last_check = now
+                if self.is_healthy():
+                    return True
+                self.stats['reconnects'] += 1
+                self.shutdown()
+        # Outside the lock, so the backoff between attempts does not block other threads
+        return self.connect()
+
+    def shutdown(self):
+        with self.lock:
+            if self.connected:
+                try:
+                    self.mt5.shutdown()
+                finally:
+                    self.connected = False
+
+    def metrics(self):
+        """Connection statistics, including the attach latency in seconds."""
+        with self.lock:
+            metrics = dict(self.stats)
+            metrics['connected'] = self.connected
+            metrics['avg_connect_latency'] = (metrics['total_connect_latency'] / metrics['connects']
+                                              if metrics['connects'] else None)
+            return metrics
+
+    def __enter__(self):
+        self.ensure()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+
+def feature_matrix(frame, columns=None, dtype=np.float32, path=None):
+    """
+    Copy a feature frame once into a contiguous row-major matrix.
+
+    Rows of a C-ordered matrix are contiguous, so any window of consecutive rows is a
+    view; WalkForward.split() slices this matrix without further copies.
+
+    Parameters:
+    - frame (DataFrame): Feature frame, e.g. fetch() output.
+    - columns (list of str, optional): Columns to keep (all by default), in this order.
+    - dtype: Matrix dtype; float32 halves the memory of float64 features.
+    - path (str, optional): Write the matrix to this .npy file and return it memory-mapped,
+      so it can be reopened later with np.load(path, mmap_mode='r').
+
+    Returns:
+    - numpy array (or memmap) of shape (rows, columns).
+    """
+    if columns is not None:
+        frame = frame[list(columns)]
+    shape = frame.shape
+    if path is None:
+        matrix = np.empty(shape, dtype=dtype)
+    else:
+        matrix = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    # Column by column, so no float64 copy of the whole frame is made on the way
+    for i in range(shape[1]):
+        matrix[:, i] = frame.iloc[:, i].to_numpy(dtype=np.float64, na_value=np.nan)
+    if path is not None:
+        matrix.flush()
+    return matrix
+
+
+class WalkForward:
+    """
+    Rolling (or anchored) walk-forward train/test windows over time-ordered rows.
+
+    Windows advance by `step` rows. Between the end of a training window and the
+    start of its test window `embargo + lookback` rows are left out:
+    - embargo covers the horizon of the labels, so no training label is computed
+      from test bars;
+    - lookback is the longest feature lookback, so the first test row's features
+      do not read any training bar and training and test rows share no bars at all.
+
+    Parameters:
+    - train_size (int): Rows per training window (the minimum when anchored).
+    - test_size (int): Rows per test window.
+    - step (int, optional): Rows between consecutive windows; defaults to test_size.
+    - embargo (int): Rows dropped after each training window for the label horizon.
+    - lookback (int or dict): Longest feature lookback in rows, or a dict of column ->
+      lookback whose maximum is used.
+    - anchored (bool): Keep every training window starting at row 0 (expanding window).
+    """
+
+    def __init__(self, train_size, test_size, step=None, embargo=0, lookback=0, anchored=False):
+        if isinstance(lookback, dict):
+            lookback = max(lookback.values()) if lookback else 0
+        if train_size < 1 or test_size < 1:
+            raise ValueError("train_size and test_size must be positive")
+        if embargo < 0 or lookback < 0:
+            raise ValueError("embargo and lookback must not be negative")
+        self.train_size = int(train_size)
+        self.test_size = int(test_size)
+        self.step = int(step) if step else self.test_size
+        self.embargo = int(embargo)
+        self.lookback = int(lookback)
+        self.anchored = anchored
+
+    @property
+    def gap(self):
+        """Rows left out between each training and test window."""
+        return self.embargo + self.lookback
+
+    def ranges(self, n):
+        """
+        Row ranges of every window over n rows.
+
+        Returns:
+        - list of (train, test) slice pairs.
+        """
+        result = []
+        start = 0
+        while True:
+            train_end = start + self.train_size
+            test_start = train_end + self.gap
+            test_end = test_start + self.test_size
+            if test_end > n:
+                break
+            result.append((slice(0 if self.anchored else start, train_end), slice(test_start, test_end)))
+            start += self.step
+        return result
+
+    def split(self, data, target=None):
+        """
+        Yield the windows of `data` as views.
+
+        Parameters:
+        - data (numpy array, memmap or DataFrame): Feature matrix; DataFrames are converted
+          once with feature_matrix().
+        - target (array-like, optional): Labels aligned with the rows of `data`.
+
+        Yields:
+        - (train, test) row views of `data`, or (train, y_train, test, y_test) with a target.
+        """
+        if isinstance(data, pd.DataFrame):
+            data = feature_matrix(data)
+        if target is not None:
+            target = np.asarray(target)
+            if len(target) != len(data):
+                raise ValueError("target has %s rows, data has %s" % (len(target), len(data)))
+        for train, test in self.ranges(len(data)):
+            if target is None:
+                yield data[train], data[test]
+            else:
+                yield data[train], target[train], data[test], target[test]
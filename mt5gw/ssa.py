@@ -0,0 +1,142 @@
+import numpy as np
+
+# Lag-covariance matrices are built for this many elements (windows x L x L) at a time
+_CHUNK = 1 << 22
+
+
+def recurrent_forecast(values, coefficients, steps_ahead=0):
+    """
+    Fill missing values and extend series with a linear recurrence, in one pass.
+
+    Every missing value and every new step is the dot product of the coefficients with
+    the L - 1 values before it (fewer at the start of the series, with the last
+    coefficients). The output is allocated once; only the positions to forecast are
+    visited, and for a batch of series each position is computed for all series at once.
+
+    Parameters:
+    - values (numpy array): Series of shape (N,), or a batch of series of shape (S, N).
+    - coefficients (numpy array): Recurrence coefficients of shape (L - 1,), oldest value
+      first, shared by all series, or one row per series of shape (S, L - 1).
+    - steps_ahead (int): Values appended after the last one.
+
+    Returns:
+    - numpy array of shape (..., N + steps_ahead).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    n = values.shape[-1]
+    order = coefficients.shape[-1]
+    out = np.empty(values.shape[:-1] + (n + steps_ahead,))
+    out[..., :n] = values
+    missing = np.isnan(values)
+    if values.ndim > 1:
+        missing_columns = np.flatnonzero(missing.any(axis=tuple(range(values.ndim - 1))))
+    else:
+        missing_columns = np.flatnonzero(missing)
+    for i in missing_columns.tolist() + list(range(n, n + steps_ahead)):
+        start = max(0, i - order)
+        window = out[..., start:i]
+        weights = coefficients[..., order - (i - start):]
+        forecast = np.einsum('...j,...j->...', window, weights) if values.ndim > 1 else np.dot(window, weights)
+        if i < n:
+            out[..., i] = np.where(missing[..., i], forecast, out[..., i])
+        else:
+            out[..., i] = forecast
+    return out
+
+
+def recurrence_coefficients(vectors):
+    """
+    Linear recurrence coefficients of SSA eigenvectors.
+
+    Parameters:
+    - vectors (numpy array): Eigenvectors (columns) of shape (L, r), or a batch of shape (S, L, r).
+
+    Returns:
+    - numpy array of shape (L - 1,) or (S, L - 1); NaN where the last coordinates of the
+      vectors make the recurrence undefined (verticality coefficient of 1).
+    """
+    last = vectors[..., -1, :]
+    verticality = np.einsum('...j,...j->...', last, last)
+    coefficients = np.einsum('...ij,...j->...i', vectors[..., :-1, :], last)
+    scale = 1 - verticality
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coefficients = coefficients / np.where(scale > 1e-12, scale, np.nan)[..., None]
+    return coefficients
+
+
+def lag_covariances(series, window, embedding_dimension):
+    """
+    Lag-covariance matrices X X' of the trajectory matrices of consecutive windows.
+
+    Window s covers series[s:s + window]; its trajectory matrix X has the
+    embedding_dimension lagged copies of the window as rows. Element (a, a + d) of X X'
+    is a sum of products series[i] * series[i + d] over window - embedding_dimension + 1
+    positions, so it is read from one cumulative sum per lag d for all windows.
+
+    Parameters:
+    - series (numpy array): Values of shape (N,).
+    - window (int): Window length.
+    - embedding_dimension (int): L.
+
+    Returns:
+    - numpy array of shape (N - window + 1, L, L).
+    """
+    x = np.asarray(series, dtype=np.float64)
+    n, L = len(x), embedding_dimension
+    k = window - L + 1
+    count = n - window + 1
+    result = np.empty((count, L, L))
+    for d in range(L):
+        sums = np.zeros(n - d + 1)
+        np.cumsum(x[:n - d] * x[d:], out=sums[1:])
+        for a in range(L - d):
+            values = sums[a + k:a + k + count] - sums[a:a + count]
+            result[:, a, a + d] = values
+            result[:, a + d, a] = values
+    return result
+
+
+def rolling_forecast(series, window=250, embedding_dimension=20, n_components=2, steps_ahead=1):
+    """
+    SSA recurrent forecast of every window of a series, all windows batched.
+
+    For each bar, SSA is fitted on the `window` bars ending with it: the leading
+    n_components eigenvectors of the lag-covariance matrix give the recurrence
+    coefficients (as mySSA.forecast_recurrent), which extend the window by steps_ahead
+    bars. Eigendecompositions run on stacks of windows, and the recurrence advances all
+    windows one step at a time.
+
+    Parameters:
+    - series (numpy array): Values of shape (N,).
+    - window (int): Bars per fit.
+    - embedding_dimension (int): SSA window L (< window).
+    - n_components (int): Leading components used for the forecast.
+    - steps_ahead (int): Forecast horizon in bars.
+
+    Returns:
+    - numpy array of shape (N,): forecast made at each bar for steps_ahead bars later
+      (NaN for the first window - 1 bars).
+    """
+    x = np.asarray(series, dtype=np.float64)
+    L = embedding_dimension
+    if not 1 < L < window:
+        raise ValueError("embedding_dimension must be between 2 and window - 1")
+    if not 0 < n_components < L:
+        raise ValueError("n_components must be between 1 and embedding_dimension - 1")
+    n = len(x)
+    result = np.full(n, np.nan)
+    windows = n - window + 1
+    if windows <= 0:
+        return result
+    # Last L - 1 values of each window, as views
+    tails = np.lib.stride_tricks.sliding_window_view(x, L - 1)[window - L + 1:]
+    chunk = max(1, _CHUNK // (L * L))
+    for start in range(0, windows, chunk):
+        stop = min(start + chunk, windows)
+        # Each chunk only reads its own bars, so the cumulative sums stay short (and accurate)
+        _, vectors = np.linalg.eigh(lag_covariances(x[start:stop + window - 1], window, L))
+        coefficients = recurrence_coefficients(vectors[..., -n_components:])
+        forecast = recurrent_forecast(tails[start:stop], coefficients, steps_ahead)
+        result[window - 1 + start:window - 1 + stop] = forecast[:, -1]
+    return result
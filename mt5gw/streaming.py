@@ -0,0 +1,612 @@
+import math
+from collections import deque
+import numpy as np
+
+NAN = float('nan')
+# TA_IS_ZERO of TA-Lib
+EPSILON = 1e-14
+
+
+def _div(a, b):
+    """a / b with NumPy semantics: inf or NaN instead of ZeroDivisionError."""
+    if b == 0:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class StreamingIndicator:
+    """
+    Base of the streaming indicators.
+
+    update() takes the values of one bar, in the argument order of the batch function
+    in mtds_ni, and returns the indicator value for that bar (NaN until enough bars
+    were seen, as the batch function). Only the running state is kept, so a bar costs
+    the same whatever the length of the history.
+    """
+
+    __slots__ = ()
+    fields = ()
+
+    def update_bar(self, bar):
+        """update() with the `fields` of a bar (dict, pandas row or structured array row)."""
+        return self.update(*(bar[f] for f in self.fields))
+
+    def replay(self, *series):
+        """
+        Feed whole arrays bar by bar, e.g. to warm the state up from history.
+
+        Returns:
+        - NumPy array of the outputs, or a tuple of arrays for indicators with several outputs.
+        """
+        result = np.array([self.update(*values) for values in zip(*series)], dtype=np.float64)
+        return tuple(result.T) if result.ndim == 2 else result
+
+
+# Moving averages, as computed by TA-Lib (leading NaN inputs are skipped like TA-Lib does)
+
+class SMA(StreamingIndicator):
+    __slots__ = ('period', 'window', 'total')
+    fields = ('close',)
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, value):
+        if value != value and not self.window:
+            return NAN
+        self.window.append(value)
+        self.total += value
+        if len(self.window) < self.period:
+            return NAN
+        result = self.total / self.period
+        self.total -= self.window.popleft()
+        return result
+
+
+class EMA(StreamingIndicator):
+    """TA-Lib EMA: seeded with the average of the first `period` values."""
+
+    __slots__ = ('period', 'k', 'count', 'value')
+    fields = ('close',)
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, value):
+        if value != value and self.count == 0:
+            return NAN
+        self.count += 1
+        if self.count < self.period:
+            self.value += value
+            return NAN
+        if self.count == self.period:
+            self.value = (self.value + value) / self.period
+        else:
+            self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class WMA(StreamingIndicator):
+    __slots__ = ('period', 'divider', 'window', 'count', 'period_sub', 'period_sum', 'trailing')
+    fields = ('close',)
+
+    def __init__(self, period):
+        self.period = period
+        self.divider = (period * (period + 1)) >> 1
+        self.window = deque()
+        self.count = 0
+        self.period_sub = 0.0
+        self.period_sum = 0.0
+        self.trailing = 0.0
+
+    def update(self, value):
+        if value != value and self.count == 0:
+            return NAN
+        self.count += 1
+        self.window.append(value)
+        if self.count < self.period:
+            self.period_sub += value
+            self.period_sum += value * self.count
+            return NAN
+        self.period_sub += value
+        self.period_sub -= self.trailing
+        self.period_sum += value * self.period
+        self.trailing = self.window.popleft()
+        result = self.period_sum / self.divider
+        self.period_sum -= self.period_sub
+        return result
+
+
+class DEMA(StreamingIndicator):
+    __slots__ = ('first', 'second')
+    fields = ('close',)
+
+    def __init__(self, period):
+        self.first = EMA(period)
+        self.second = EMA(period)
+
+    def update(self, value):
+        first = self.first.update(value)
+        second = self.second.update(first)
+        return NAN if second != second else (2.0 * first) - second
+
+
+class _T3Stage:
+    __slots__ = ('period', 'k', 'one_minus_k', 'count', 'value')
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1.0)
+        self.one_minus_k = 1.0 - self.k
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, value):
+        self.count += 1
+        if self.count < self.period:
+            self.value += value
+            return NAN
+        if self.count == self.period:
+            self.value = (self.value + value) / self.period
+        else:
+            self.value = (self.k * value) + (self.one_minus_k * self.value)
+        return self.value
+
+
+class T3(StreamingIndicator):
+    """TA-Lib T3: six chained EMA stages, each seeded with the average of its first `period` inputs."""
+
+    __slots__ = ('stages', 'c1', 'c2', 'c3', 'c4')
+    fields = ('close',)
+
+    def __init__(self, period, vfactor=0.7):
+        self.stages = [_T3Stage(period) for _ in range(6)]
+        square = vfactor * vfactor
+        self.c1 = -(square * vfactor)
+        self.c2 = 3.0 * (square - self.c1)
+        self.c3 = -6.0 * square - 3.0 * (vfactor - self.c1)
+        self.c4 = 1.0 + 3.0 * vfactor - self.c1 + 3.0 * square
+
+    def update(self, value):
+        if value != value and self.stages[0].count == 0:
+            return NAN
+        e = []
+        for stage in self.stages:
+            value = stage.update(value)
+            if value != value:
+                return NAN
+            e.append(value)
+        return self.c1 * e[5] + self.c2 * e[4] + self.c3 * e[3] + self.c4 * e[2]
+
+
+class KAMA(StreamingIndicator):
+    """TA-Lib KAMA (fast period 2, slow period 30)."""
+
+    __slots__ = ('period', 'window', 'sum_roc', 'trailing', 'value')
+    fields = ('close',)
+    FAST = 2.0 / (2 + 1)
+    SLOW = 2.0 / (30 + 1)
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.sum_roc = 0.0
+        self.trailing = 0.0
+        self.value = None
+
+    def update(self, value):
+        window = self.window
+        if value != value and not window:
+            return NAN
+        window.append(value)
+        if len(window) <= self.period:
+            if len(window) > 1:
+                self.sum_roc += abs(window[-2] - value)
+            return NAN
+        oldest = window.popleft()
+        if self.value is None:
+            # Seeded with the previous value; the first window has no trailing value yet
+            self.value = window[-2]
+            self.sum_roc += abs(window[-2] - value)
+        else:
+            self.sum_roc -= abs(self.trailing - oldest)
+            self.sum_roc += abs(value - window[-2])
+        period_roc = value - oldest
+        self.trailing = oldest
+        if self.sum_roc <= period_roc or -EPSILON < self.sum_roc < EPSILON:
+            ratio = 1.0
+        else:
+            ratio = abs(period_roc / self.sum_roc)
+        constant = ratio * (self.FAST - self.SLOW) + self.SLOW
+        constant *= constant
+        self.value = ((value - self.value) * constant) + self.value
+        return self.value
+
+
+class TRIMA(StreamingIndicator):
+    """Triangular moving average, as the SMA of an SMA."""
+
+    __slots__ = ('first', 'second')
+    fields = ('close',)
+
+    def __init__(self, period):
+        half = (period + 1) // 2 if period % 2 else period // 2 + 1
+        self.first = SMA(half)
+        self.second = SMA(period + 1 - half)
+
+    def update(self, value):
+        return self.second.update(self.first.update(value))
+
+
+SMOOTHERS = {'EMA': EMA, 'SMA': SMA, 'WMA': WMA, 'DEMA': DEMA, 'T3': T3, 'KAMA': KAMA, 'TRIMA': TRIMA}
+
+
+def smoother(method='EMA', period=14):
+    """Streaming counterpart of mtds_ni.apply_smoothing()."""
+    method = method.upper()
+    if method not in SMOOTHERS:
+        raise ValueError(f"Unsupported smoothing method: {method}")
+    return SMOOTHERS[method](period)
+
+
+# Oscillators
+
+class RSI(StreamingIndicator):
+    """TA-Lib RSI (Wilder smoothing)."""
+
+    __slots__ = ('period', 'inverse', 'count', 'previous', 'gain', 'loss')
+    fields = ('close',)
+
+    def __init__(self, period=14):
+        self.period = period
+        # TA-Lib multiplies by 1 / period rather than dividing, which rounds differently
+        self.inverse = 1.0 / period
+        self.count = 0
+        self.previous = 0.0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, value):
+        if value != value and self.count == 0:
+            return NAN
+        self.count += 1
+        if self.count == 1:
+            self.previous = value
+            return NAN
+        diff = value - self.previous
+        self.previous = value
+        if self.count <= self.period + 1:
+            if diff < 0:
+                self.loss -= diff
+            else:
+                self.gain += diff
+            if self.count <= self.period:
+                return NAN
+        else:
+            self.loss *= self.period - 1
+            self.gain *= self.period - 1
+            if diff < 0:
+                self.loss -= diff
+            else:
+                self.gain += diff
+        self.loss *= self.inverse
+        self.gain *= self.inverse
+        total = self.gain + self.loss
+        return 0.0 if -EPSILON < total < EPSILON else 100.0 * (self.gain / total)
+
+
+class _Extreme:
+    """Running maximum (or minimum) of the last `period` values, with a monotonic deque."""
+
+    __slots__ = ('period', 'lower', 'values', 'count')
+
+    def __init__(self, period, lower):
+        self.period = period
+        self.lower = lower
+        self.values = deque()
+        self.count = 0
+
+    def update(self, value):
+        values = self.values
+        if self.lower:
+            while values and values[-1][1] >= value:
+                values.pop()
+        else:
+            while values and values[-1][1] <= value:
+                values.pop()
+        values.append((self.count, value))
+        self.count += 1
+        if values[0][0] <= self.count - 1 - self.period:
+            values.popleft()
+        return values[0][1]
+
+
+class WILLR(StreamingIndicator):
+    """TA-Lib Williams %R."""
+
+    __slots__ = ('period', 'highest', 'lowest', 'count')
+    fields = ('high', 'low', 'close')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.highest = _Extreme(period, lower=False)
+        self.lowest = _Extreme(period, lower=True)
+        self.count = 0
+
+    def update(self, high, low, close):
+        highest = self.highest.update(high)
+        lowest = self.lowest.update(low)
+        self.count += 1
+        if self.count < self.period:
+            return NAN
+        diff = highest - lowest
+        return (highest - close) / diff * -100.0 if diff != 0.0 else 0.0
+
+
+class ATR(StreamingIndicator):
+    """TA-Lib ATR: the average true range of the first `period` bars, then Wilder smoothing."""
+
+    __slots__ = ('period', 'count', 'previous', 'value')
+    fields = ('high', 'low', 'close')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.previous = NAN
+        self.value = 0.0
+
+    def update(self, high, low, close):
+        self.count += 1
+        previous, self.previous = self.previous, close
+        if self.count == 1:
+            return NAN
+        true_range = high - low
+        if abs(previous - high) > true_range:
+            true_range = abs(previous - high)
+        if abs(low - previous) > true_range:
+            true_range = abs(low - previous)
+        if self.count <= self.period:
+            self.value += true_range
+            return NAN
+        if self.count == self.period + 1:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value *= self.period - 1
+            self.value += true_range
+            self.value /= self.period
+        return self.value
+
+
+# mtds_ni indicators
+
+class RVI(StreamingIndicator):
+    """Streaming mtds_ni.rvi(); update() returns (rvi, signal)."""
+
+    __slots__ = ('numerator', 'denominator', 'signal')
+    fields = ('open', 'high', 'low', 'close')
+
+    def __init__(self, lookback=10, smoothing_method='SMA', smoothing_period=4):
+        self.numerator = SMA(lookback)
+        self.denominator = SMA(lookback)
+        self.signal = smoother(smoothing_method, smoothing_period)
+
+    def update(self, open, high, low, close):
+        value = _div(self.numerator.update(close - open), self.denominator.update(high - low))
+        return value, self.signal.update(value)
+
+
+class SuperTrend(StreamingIndicator):
+    """Streaming mtds_ni.supertrend(): percentage difference between the SuperTrend and the close."""
+
+    __slots__ = ('multiplier', 'atr', 'upper', 'lower', 'close', 'count')
+    fields = ('high', 'low', 'close')
+
+    def __init__(self, multiplier=3, lookback=14):
+        self.multiplier = multiplier
+        self.atr = ATR(lookback)
+        self.upper = NAN
+        self.lower = NAN
+        self.close = NAN
+        self.count = 0
+
+    def update(self, high, low, close):
+        atr = self.atr.update(high, low, close)
+        middle = (high + low) / 2
+        upper = middle + self.multiplier * atr
+        lower = middle - self.multiplier * atr
+        self.count += 1
+        if self.count > 1:
+            # Same comparisons (and NaN handling of min/max) as the batch loop
+            if not self.close > self.upper:
+                upper = min(upper, self.upper)
+            if not self.close < self.lower:
+                lower = max(lower, self.lower)
+        self.upper, self.lower, self.close = upper, lower, close
+        if self.count == 1:
+            return 0.0
+        trend = upper if close <= upper else lower
+        return ((trend - close) / close) * 100
+
+
+class TWAP(StreamingIndicator):
+    """Streaming mtds_ni.twap(): running mean of the average price (or its % difference to the close)."""
+
+    __slots__ = ('ratio', 'total', 'count')
+    fields = ('open', 'high', 'low', 'close')
+
+    def __init__(self, ratio=True):
+        self.ratio = ratio
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, open, high, low, close):
+        self.total += (high + low + close + open) / 4
+        self.count += 1
+        twap = self.total / self.count
+        return ((twap - close) / close) * 100 if self.ratio else twap
+
+
+class POV(StreamingIndicator):
+    """Streaming mtds_ni.pov() (stateless)."""
+
+    __slots__ = ('pov_rate',)
+    fields = ('close', 'volume')
+
+    def __init__(self, pov_rate=0.2):
+        self.pov_rate = pov_rate
+
+    def update(self, close, volume):
+        return ((volume * self.pov_rate) / close) * 100
+
+
+class RSL(StreamingIndicator):
+    """Streaming mtds_ni.rsl(): close over its moving average."""
+
+    __slots__ = ('ma',)
+    fields = ('close',)
+
+    def __init__(self, period=15, ma_method='SMA'):
+        self.ma = smoother(ma_method, period)
+
+    def update(self, close):
+        return close / self.ma.update(close)
+
+
+class EhlersRPI(StreamingIndicator):
+    """
+    Streaming mtds_ni.ehlers_rpi(); update() returns (v1, v2).
+
+    The filter bank keeps two bars of I, Q, Real and Imag per cycle period as registers,
+    plus the last medianPeriod + 1 dominant cycles and minperiod v1 values.
+    """
+
+    __slots__ = ('minperiod', 'median_period', 'decibel_period', 'a1', 'a2', 'periods', 'beta', 'hp',
+                 'smooth', 'old_i', 'older_i', 'old_q', 'older_q', 'old_real', 'older_real', 'old_imag',
+                 'older_imag', 'db', 'dc', 'v1', 'previous', 'shift')
+    fields = ('high', 'low', 'volume')
+
+    def __init__(self, minperiod=8, maxperiod=50, hpPeriod=40, medianPeriod=10, decibelPeriod=20):
+        self.minperiod = minperiod
+        self.median_period = medianPeriod
+        self.decibel_period = decibelPeriod
+        self.a1 = (1 - np.sin(2 * np.pi / hpPeriod)) / np.cos(2 * np.pi / hpPeriod)
+        self.a2 = 0.5 * (1 + self.a1)
+        self.periods = np.arange(minperiod, maxperiod + 1, dtype=np.float64)
+        self.beta = np.cos(2 * np.pi / self.periods)
+        self.hp = deque([0.0] * 6, maxlen=6)
+        self.smooth = 0.0
+        zeros = lambda: np.zeros(len(self.periods))
+        self.old_i, self.older_i, self.old_q, self.older_q = zeros(), zeros(), zeros(), zeros()
+        self.old_real, self.older_real, self.old_imag, self.older_imag = zeros(), zeros(), zeros(), zeros()
+        self.db = zeros()
+        self.dc = deque([0.0], maxlen=medianPeriod + 1)
+        self.v1 = deque([0.0], maxlen=minperiod)
+        self.previous = None
+        self.shift = 0
+
+    def update(self, high, low, volume):
+        price = (high + low) / 2
+        if self.previous is None:
+            self.previous = price
+            return 0.0, 0.0
+        self.shift += 1
+        shift = self.shift
+        hp = self.hp
+        hp.append(self.a2 * (price - self.previous) + self.a1 * hp[-1])
+        self.previous = price
+        smooth = self.smooth
+        if shift >= 5:
+            smooth = (hp[5] + 2 * hp[4] + 3 * hp[3] + 3 * hp[2] + 2 * hp[1] + hp[0]) / 12
+        s1 = smooth - self.smooth
+        self.smooth = smooth
+
+        delta = max(-0.015 * shift + 0.5, 0.15)
+        n = self.periods
+        gamma = 1 / np.cos(4 * np.pi * delta / n)
+        alpha = gamma - np.sqrt(gamma ** 2 - 1)
+        q = (n / (2 * np.pi)) * s1
+        real = 0.5 * (1 - alpha) * (smooth - self.older_i) + self.beta * (1 + alpha) * self.old_real \
+            - alpha * self.older_real
+        imag = 0.5 * (1 - alpha) * (q - self.older_q) + self.beta * (1 + alpha) * self.old_imag \
+            - alpha * self.older_imag
+        ampl = real ** 2 + imag ** 2
+        self.older_i, self.old_i = self.old_i, np.full(len(n), smooth)
+        self.older_q, self.old_q = self.old_q, q
+        self.older_real, self.old_real = self.old_real, real
+        self.older_imag, self.old_imag = self.old_imag, imag
+
+        max_ampl = max(0.0, ampl.max())
+        db = self.db
+        if max_ampl != 0:
+            t = 1 - 0.99 * ampl / max_ampl
+            valid = t != 0
+            db[valid] = -self.median_period * np.log(0.01 / t[valid]) / np.log(10)
+        np.minimum(db, self.decibel_period, out=db)
+        weight = np.where(db <= 3, self.decibel_period - db, 0.0)
+        denom = weight.sum()
+        self.dc.append((n * weight).sum() / denom if denom != 0 else 0.0)
+
+        dom_cycle = np.median(self.dc)
+        if dom_cycle < self.minperiod:
+            dom_cycle = self.decibel_period
+        v1 = volume * (2 * np.pi / dom_cycle) ** 2
+        self.v1.append(v1)
+        v2 = np.sum(self.v1) / self.minperiod if shift >= self.minperiod else np.mean(self.v1)
+        return float(v1), float(v2)
+
+
+class _Ultra(StreamingIndicator):
+    __slots__ = ('base', 'smoothers', 'previous', 'bulls', 'bears')
+
+    def __init__(self, base, W_Method, StartLength, Step, StepsTotal, SmoothMethod, SmoothLength):
+        self.base = base
+        self.smoothers = [smoother(W_Method, StartLength + sm * Step) for sm in range(StepsTotal + 1)]
+        self.previous = [NAN] * len(self.smoothers)
+        self.bulls = smoother(SmoothMethod, SmoothLength)
+        self.bears = smoother(SmoothMethod, SmoothLength)
+
+    def _count(self, value):
+        ups = dns = 0
+        previous = self.previous
+        for i, s in enumerate(self.smoothers):
+            current = s.update(value)
+            if current > previous[i]:
+                ups += 1
+            elif current <= previous[i]:
+                dns += 1
+            previous[i] = current
+        return self.bulls.update(float(ups)), self.bears.update(float(dns))
+
+
+class UltraRSI(_Ultra):
+    """Streaming mtds_ni.ultra_rsi() for one (RSI_Period, Step) configuration; update() returns (bulls, bears)."""
+
+    __slots__ = ()
+    fields = ('close',)
+
+    def __init__(self, RSI_Period=13, W_Method='EMA', StartLength=3, WPhase=100, Step=5, StepsTotal=10,
+                 SmoothMethod='EMA', SmoothLength=3, SmoothPhase=100):
+        _Ultra.__init__(self, RSI(RSI_Period), W_Method, StartLength, Step, StepsTotal, SmoothMethod, SmoothLength)
+
+    def update(self, price):
+        return self._count(self.base.update(price))
+
+
+class UltraWPR(_Ultra):
+    """Streaming mtds_ni.ultra_wpr() for one (WPR_Period, Step) configuration; update() returns (bulls, bears)."""
+
+    __slots__ = ()
+    fields = ('high', 'low', 'close')
+
+    def __init__(self, WPR_Period=13, W_Method='EMA', StartLength=3, WPhase=100, Step=5, StepsTotal=10,
+                 SmoothMethod='EMA', SmoothLength=3, SmoothPhase=100):
+        _Ultra.__init__(self, WILLR(WPR_Period), W_Method, StartLength, Step, StepsTotal, SmoothMethod,
+                        SmoothLength)
+
+    def update(self, high, low, close):
+        return self._count(self.base.update(high, low, close))
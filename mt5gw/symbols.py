@@ -0,0 +1,134 @@
+import bisect
+import threading
+import time
+import numpy as np
+
+# Symbol properties kept as columns of the catalog table
+CATALOG_FIELDS = ('digits', 'point', 'trade_contract_size', 'trade_mode', 'trade_stops_level',
+                  'volume_min', 'volume_max', 'volume_step', 'trade_tick_size', 'trade_tick_value',
+                  'currency_base', 'currency_profit', 'currency_margin', 'path', 'description')
+
+
+class SymbolCatalog:
+    """
+    In-process index over symbols_get(), refreshed on a TTL.
+
+    The symbol list is loaded once into a compact columnar table (one numpy
+    array per property) with a hash index by name and sorted name/path indexes
+    for prefix lookups, so lookups cost O(1) (O(log N) for prefixes) without
+    any IPC until the TTL expires.
+
+    Parameters:
+    - loader (callable): Returns the tuple of SymbolInfo records (e.g. mt5.symbols_get).
+    - ttl (float): Seconds before the catalog is reloaded on the next access.
+    - fields (tuple): Symbol properties to keep as columns.
+
+    Notes:
+    - Quote fields of the cached records (bid, ask, spread, ...) are as of the last
+      refresh; use MetaTraderManager.get_last_tick for live prices.
+    """
+
+    def __init__(self, loader, ttl=300.0, fields=CATALOG_FIELDS):
+        self.loader = loader
+        self.ttl = ttl
+        self.fields = fields
+        self.lock = threading.Lock()
+        self.loaded_at = None
+        self.loading = False
+        self.records = ()
+        self.index = {}
+        self.columns = {}
+        self.sorted_names = []
+        self.sorted_paths = []
+
+    def _expired(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.ttl
+
+    def refresh(self, force=False):
+        """
+        Reload the catalog if the TTL has expired (or unconditionally with force=True).
+
+        The records are loaded and indexed without holding the lock, which only guards
+        the swap: the loader goes through the broker worker, and a call running on that
+        worker may itself reach refresh(), so waiting for the loader under the lock could
+        deadlock. While one thread reloads, others keep reading the previous catalog.
+        """
+        if not force and not self._expired():
+            return
+        with self.lock:
+            if not force and (not self._expired() or (self.loading and self.loaded_at is not None)):
+                return
+            self.loading = True
+        try:
+            records = tuple(self.loader() or ())
+            names = [r.name for r in records]
+            columns = {'name': np.array(names, dtype=object)}
+            for f in self.fields:
+                values = [getattr(r, f, None) for r in records]
+                columns[f] = np.array(values, dtype=object if values and isinstance(values[0], str) else None)
+            index = {name: i for i, name in enumerate(names)}
+            sorted_names = sorted(names)
+            sorted_paths = sorted((getattr(r, 'path', ''), r.name) for r in records)
+            # Swap everything in at once so readers never see a half-built catalog
+            with self.lock:
+                self.records = records
+                self.index = index
+                self.columns = columns
+                self.sorted_names = sorted_names
+                self.sorted_paths = sorted_paths
+                self.loaded_at = time.monotonic()
+        finally:
+            with self.lock:
+                self.loading = False
+
+    def __len__(self):
+        self.refresh()
+        return len(self.records)
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self.index
+
+    def all(self):
+        """All SymbolInfo records, as returned by symbols_get()."""
+        self.refresh()
+        return self.records
+
+    def names(self):
+        self.refresh()
+        return list(self.columns.get('name', []))
+
+    def get(self, name):
+        """SymbolInfo record for `name`, or None if the symbol is unknown."""
+        self.refresh()
+        i = self.index.get(name)
+        return None if i is None else self.records[i]
+
+    def row(self, name):
+        """Catalog columns for `name` as a dict, or None if the symbol is unknown."""
+        self.refresh()
+        i = self.index.get(name)
+        if i is None:
+            return None
+        return {f: col[i] for f, col in self.columns.items()}
+
+    def column(self, field):
+        """Whole catalog column (numpy array aligned with names())."""
+        self.refresh()
+        return self.columns[field]
+
+    def with_prefix(self, prefix):
+        """Names starting with `prefix` (e.g. 'EUR')."""
+        self.refresh()
+        names = self.sorted_names
+        lo = bisect.bisect_left(names, prefix)
+        hi = bisect.bisect_left(names, prefix + '\uffff')
+        return names[lo:hi]
+
+    def in_path(self, path_prefix):
+        """Names whose terminal path starts with `path_prefix` (e.g. 'Forex')."""
+        self.refresh()
+        paths = self.sorted_paths
+        lo = bisect.bisect_left(paths, (path_prefix,))
+        hi = bisect.bisect_left(paths, (path_prefix + '\uffff',))
+        return [name for _, name in paths[lo:hi]]
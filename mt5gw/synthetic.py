@@ -0,0 +1,250 @@
+import datetime
+import types
+import numpy as np
+from .history import rates_to_frame
+
+# Layouts of the arrays returned by copy_rates_* and copy_ticks_*
+RATES_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                        ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+TICKS_DTYPE = np.dtype([('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+                        ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')])
+
+# MetaTrader5 constants used by the gateway, with the values of the real package
+TIMEFRAMES = {'M1': 1, 'M2': 2, 'M3': 3, 'M4': 4, 'M5': 5, 'M6': 6, 'M10': 10, 'M12': 12, 'M15': 15,
+              'M20': 20, 'M30': 30, 'H1': 16385, 'H2': 16386, 'H3': 16387, 'H4': 16388, 'H6': 16390,
+              'H8': 16392, 'H12': 16396, 'D1': 16408, 'W1': 32769, 'MN1': 49153}
+TIMEFRAME_SECONDS = {1: 60, 2: 120, 3: 180, 4: 240, 5: 300, 6: 360, 10: 600, 12: 720, 15: 900, 20: 1200,
+                     30: 1800, 16385: 3600, 16386: 7200, 16387: 10800, 16388: 14400, 16390: 21600,
+                     16392: 28800, 16396: 43200, 16408: 86400, 32769: 604800, 49153: 2592000}
+CONSTANTS = {'COPY_TICKS_ALL': -1, 'COPY_TICKS_INFO': 1, 'COPY_TICKS_TRADE': 2,
+             'TICK_FLAG_BID': 2, 'TICK_FLAG_ASK': 4,
+             'ORDER_TYPE_BUY': 0, 'ORDER_TYPE_SELL': 1, 'ORDER_TYPE_BUY_LIMIT': 2, 'ORDER_TYPE_SELL_LIMIT': 3,
+             'ORDER_TYPE_BUY_STOP': 4, 'ORDER_TYPE_SELL_STOP': 5,
+             'TRADE_ACTION_DEAL': 1, 'TRADE_ACTION_PENDING': 5, 'ORDER_TIME_GTC': 0, 'ORDER_TIME_SPECIFIED': 2,
+             'ORDER_FILLING_FOK': 0, 'ORDER_FILLING_IOC': 1, 'TRADE_RETCODE_DONE': 10009,
+             'SYMBOL_TRADE_MODE_DISABLED': 0, 'SYMBOL_TRADE_MODE_LONGONLY': 1, 'SYMBOL_TRADE_MODE_SHORTONLY': 2,
+             'SYMBOL_TRADE_MODE_CLOSEONLY': 3, 'SYMBOL_TRADE_MODE_FULL': 4,
+             'BOOK_TYPE_SELL': 1, 'BOOK_TYPE_BUY': 2, 'BOOK_TYPE_SELL_MARKET': 3, 'BOOK_TYPE_BUY_MARKET': 4}
+
+# 2020-01-01 00:00 UTC
+DEFAULT_START = 1577836800
+
+
+def synthetic_rates(n, seed=0, start=DEFAULT_START, step=60, price=1.1, volatility=1e-4, spread=10):
+    """
+    Seeded random-walk OHLCV bars in the copy_rates_* layout.
+
+    Closes follow a geometric random walk; each bar opens at the previous close and its
+    high/low extend past the body by a random wick, so every bar is a valid candle.
+
+    Parameters:
+    - n (int): Number of bars.
+    - seed (int): Random seed; the same seed always gives the same bars.
+    - start (int): Open time of the first bar (Unix seconds).
+    - step (int): Bar length in seconds.
+    - price (float): First open price.
+    - volatility (float): Standard deviation of the log return per bar.
+    - spread (int): Mean spread in points.
+
+    Returns:
+    - numpy structured array with RATES_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    if n == 0:
+        return rates
+    close = price * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+    open_ = np.empty(n)
+    open_[0] = price
+    open_[1:] = close[:-1]
+    wick = price * volatility * 0.5
+    rates['time'] = start + np.arange(n, dtype=np.int64) * step
+    rates['open'] = open_
+    rates['close'] = close
+    rates['high'] = np.maximum(open_, close) + np.abs(rng.normal(0.0, wick, n))
+    rates['low'] = np.minimum(open_, close) - np.abs(rng.normal(0.0, wick, n))
+    rates['tick_volume'] = rng.integers(1, 500, n)
+    rates['spread'] = rng.poisson(spread, n)
+    return rates
+
+
+def synthetic_ticks(n, seed=0, start=DEFAULT_START, rate=10.0, price=1.1, volatility=1e-5, spread=2e-5):
+    """
+    Seeded random-walk ticks in the copy_ticks_* layout.
+
+    Arrival times are a Poisson process of `rate` ticks per second; bid follows a
+    geometric random walk and ask stays `spread` (plus noise) above it.
+
+    Parameters:
+    - n (int): Number of ticks.
+    - seed (int): Random seed.
+    - start (int): Time of the first tick (Unix seconds).
+    - rate (float): Mean ticks per second.
+    - price (float): First bid price.
+    - volatility (float): Standard deviation of the log return per tick.
+    - spread (float): Mean spread in price units.
+
+    Returns:
+    - numpy structured array with TICKS_DTYPE, sorted by time_msc.
+    """
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=TICKS_DTYPE)
+    if n == 0:
+        return ticks
+    time_msc = start * 1000 + np.cumsum(rng.exponential(1000.0 / rate, n)).astype(np.int64)
+    bid = price * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+    ticks['time_msc'] = time_msc
+    ticks['time'] = time_msc // 1000
+    ticks['bid'] = bid
+    ticks['ask'] = bid + spread * (1.0 + np.abs(rng.normal(0.0, 0.25, n)))
+    ticks['last'] = (ticks['bid'] + ticks['ask']) * 0.5
+    ticks['volume'] = rng.integers(1, 10, n)
+    ticks['volume_real'] = ticks['volume']
+    ticks['flags'] = CONSTANTS['TICK_FLAG_BID'] | CONSTANTS['TICK_FLAG_ASK']
+    return ticks
+
+
+def synthetic_frame(n, seed=0, step=60, **kwargs):
+    """Seeded OHLCV DataFrame in the fetch() layout (see synthetic_rates for the parameters)."""
+    return rates_to_frame(synthetic_rates(n, seed=seed, step=step, **kwargs))
+
+
+def _seconds(value):
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+class SyntheticTerminal:
+    """
+    Offline stand-in for the MetaTrader5 module, serving seeded synthetic history.
+
+    Pass it as MetaTraderManager(terminal=SyntheticTerminal()) to run fetch() and the
+    feature pipeline without a terminal, e.g. for benchmarks. Every symbol gets its own
+    deterministic series (seeded from the symbol name and `seed`); bars of every
+    timeframe end at `end` and the newest tick falls inside the newest bar.
+    Naive datetimes are read as UTC.
+
+    Only market data calls are implemented: the copy_rates_*/copy_ticks_* family,
+    symbol_info_tick, symbols_get/symbols_total and the session calls. Trading calls
+    raise AttributeError like an unknown function of the real module.
+
+    Parameters:
+    - bars (int): Bars available per symbol and timeframe.
+    - ticks (int): Ticks available per symbol.
+    - seed (int): Base random seed.
+    - end (int): Open time of the newest bar (Unix seconds); defaults to DEFAULT_START plus
+      `bars` minutes.
+    - symbols (list of str): Symbols listed by symbols_get().
+    """
+
+    def __init__(self, bars=1000000, ticks=1000000, seed=0, end=None, symbols=('EURUSD', 'GBPUSD', 'USDJPY')):
+        for name, value in CONSTANTS.items():
+            setattr(self, name, value)
+        for name, value in TIMEFRAMES.items():
+            setattr(self, 'TIMEFRAME_' + name, value)
+        self.bars = int(bars)
+        self.ticks = int(ticks)
+        self.seed = seed
+        self.end = DEFAULT_START + 60 * self.bars if end is None else int(end)
+        self.symbol_names = list(symbols)
+        self.rates = {}
+        self.tick_data = {}
+        self.error = (1, 'Success')
+
+    def _seed(self, symbol):
+        return self.seed * 1000003 + sum(ord(c) * (i + 1) for i, c in enumerate(symbol))
+
+    def _rates(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        rates = self.rates.get(key)
+        if rates is None:
+            step = TIMEFRAME_SECONDS.get(timeframe)
+            if step is None:
+                self.error = (-2, 'Invalid params')
+                return None
+            start = self.end - (self.bars - 1) * step
+            rates = self.rates[key] = synthetic_rates(self.bars, seed=self._seed(symbol), start=start, step=step)
+        return rates
+
+    def _ticks(self, symbol):
+        ticks = self.tick_data.get(symbol)
+        if ticks is None:
+            ticks = synthetic_ticks(self.ticks, seed=self._seed(symbol))
+            # Shift so the last tick falls in the newest bar
+            ticks['time_msc'] += (self.end + 60) * 1000 - 1 - ticks['time_msc'][-1]
+            ticks['time'] = ticks['time_msc'] // 1000
+            self.tick_data[symbol] = ticks
+        return ticks
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        return True
+
+    def terminal_info(self):
+        return types.SimpleNamespace(connected=True, name='SyntheticTerminal', build=0)
+
+    def version(self):
+        return (500, 0, '')
+
+    def last_error(self):
+        return self.error
+
+    def symbols_total(self):
+        return len(self.symbol_names)
+
+    def symbols_get(self, group=None):
+        return tuple(types.SimpleNamespace(name=s, digits=5, point=1e-5, volume_min=0.01, volume_max=100.0,
+                                           volume_step=0.01, trade_mode=CONSTANTS['SYMBOL_TRADE_MODE_FULL'],
+                                           visible=True)
+                     for s in self.symbol_names)
+
+    def symbol_info(self, symbol):
+        for info in self.symbols_get():
+            if info.name == symbol:
+                return info
+        return None
+
+    def symbol_select(self, symbol, enable=True):
+        return symbol in self.symbol_names
+
+    def symbol_info_tick(self, symbol):
+        tick = self._ticks(symbol)[-1]
+        return types.SimpleNamespace(**{name: tick[name].item() for name in TICKS_DTYPE.names})
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        rates = self._rates(symbol, timeframe)
+        if rates is None:
+            return None
+        end = len(rates) - int(start_pos)
+        return rates[max(end - int(count), 0):max(end, 0)]
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        rates = self._rates(symbol, timeframe)
+        if rates is None:
+            return None
+        end = np.searchsorted(rates['time'], _seconds(date_from), side='right')
+        return rates[max(end - int(count), 0):end]
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        rates = self._rates(symbol, timeframe)
+        if rates is None:
+            return None
+        times = rates['time']
+        return rates[np.searchsorted(times, _seconds(date_from)):np.searchsorted(times, _seconds(date_to),
+                                                                                 side='right')]
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        ticks = self._ticks(symbol)
+        start = np.searchsorted(ticks['time_msc'], _seconds(date_from) * 1000)
+        return ticks[start:start + int(count)]
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags):
+        ticks = self._ticks(symbol)
+        times = ticks['time_msc']
+        return ticks[np.searchsorted(times, _seconds(date_from) * 1000):
+                     np.searchsorted(times, _seconds(date_to) * 1000, side='right')]
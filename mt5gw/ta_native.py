@@ -0,0 +1,690 @@
+import numpy as np
+import pandas as pd
+
+# Rows per slice of the sliding-window reductions, bounding their temporaries
+_CHUNK = 65536
+
+
+class _Inputs:
+    """
+    OHLCV columns as float Series plus a cache of the intermediates shared by several
+    indicators (true range, typical price, rolling extremes, EMAs), so each is computed once.
+    """
+
+    def __init__(self, df, high, low, close, volume):
+        self.index = df.index
+        self.high = df[high].astype(np.float64)
+        self.low = df[low].astype(np.float64)
+        self.close = df[close].astype(np.float64)
+        # ta keeps integer volume as is and OBV wraps around on -volume; floats give the signed sum
+        self.volume = df[volume].astype(np.float64)
+        self.cache = {}
+
+    def get(self, key, func):
+        value = self.cache.get(key)
+        if value is None:
+            value = self.cache[key] = func()
+        return value
+
+    def series(self, name):
+        return getattr(self, name) if name in ('high', 'low', 'close', 'volume') else self.cache[name]
+
+    def rolling(self, name, window, how, min_periods=0):
+        return self.get(('rolling', name, window, how, min_periods),
+                        lambda: getattr(self.series(name).rolling(window, min_periods=min_periods), how)())
+
+    def ema(self, name, span):
+        return self.get(('ema', name, span), lambda: _ema(self.series(name), span))
+
+    def prev_close(self):
+        return self.get('prev_close', lambda: self.close.shift(1))
+
+    def true_range(self):
+        """max(high, previous close) - min(low, previous close); the first bar is high - low."""
+        def compute():
+            prev = self.prev_close().values
+            high, low = self.high.values, self.low.values
+            return pd.Series(np.fmax(high, prev) - np.fmin(low, prev), index=self.index)
+        return self.get('tr', compute)
+
+    def typical_price(self):
+        return self.get('tp', lambda: (self.high + self.low + self.close) / 3.0)
+
+    def clv(self):
+        def compute():
+            clv = ((self.close - self.low) - (self.high - self.close)) / (self.high - self.low)
+            return clv.fillna(0.0)
+        return self.get('clv', compute)
+
+
+def _ema(series, span):
+    return series.ewm(span=span, min_periods=0, adjust=False).mean()
+
+
+def _wilder(first, rest, window, index=None):
+    """Wilder smoothing y[i] = y[i-1] * (1 - 1/window) + rest[i] / window, seeded with `first`."""
+    values = np.empty(len(rest) + 1)
+    values[0] = first
+    values[1:] = rest
+    return pd.Series(values, index=index).ewm(alpha=1.0 / window, adjust=False).mean().values
+
+
+def _fill(values, value=0.0):
+    """
+    ta's fillna=True post-processing: infinities become NaN, NaNs are forward filled and
+    the leading NaNs left are set to `value` (None backfills them from the first valid value).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    invalid = ~np.isfinite(values)
+    if not invalid.any():
+        return values
+    positions = np.where(invalid, 0, np.arange(len(values)))
+    np.maximum.accumulate(positions, out=positions)
+    values = np.where(invalid, np.nan, values)[positions]
+    leading = np.isnan(values)
+    if leading.any():
+        if value is None:
+            valid = np.flatnonzero(~leading)
+            if len(valid):
+                values[leading] = values[valid[0]]
+        else:
+            values[leading] = value
+    return values
+
+
+def _shift_mean(series, periods):
+    """series.shift(periods) with the gap filled with the series mean, as ta does."""
+    return series.shift(periods, fill_value=series.mean())
+
+
+def _windows(values, window, reduce):
+    """reduce() of every full window of `values`, in chunks so memory stays bounded."""
+    n = len(values) - window + 1
+    out = np.empty(max(n, 0))
+    view = np.lib.stride_tricks.sliding_window_view(values, window) if n > 0 else None
+    for start in range(0, max(n, 0), _CHUNK):
+        out[start:start + _CHUNK] = reduce(view[start:start + _CHUNK])
+    return out
+
+
+def _mean_abs_deviation(values, window):
+    """Rolling mean absolute deviation around the window mean (partial windows at the start)."""
+    out = np.empty(len(values))
+    head = min(window - 1, len(values))
+    for i in range(head):
+        x = values[:i + 1]
+        out[i] = np.mean(np.abs(x - np.mean(x)))
+
+    def reduce(x):
+        return np.abs(x - x.mean(axis=1)[:, None]).mean(axis=1)
+    out[head:] = _windows(values, window, reduce)
+    return out
+
+
+def _window_arg(values, window, func):
+    """Offset of the argmax/argmin inside each rolling window (partial windows at the start)."""
+    out = np.empty(len(values))
+    head = min(window - 1, len(values))
+    for i in range(head):
+        out[i] = func(values[:i + 1])
+    out[head:] = _windows(values, window, lambda x: func(x, axis=1))
+    return out
+
+
+def _psar_loop(high, low, close, step, max_step):
+    n = len(close)
+    psar = close.copy()
+    up = np.full(n, np.nan)
+    down = np.full(n, np.nan)
+    if n == 0:
+        return psar, up, down
+    up_trend = True
+    af = step
+    up_trend_high = high[0]
+    down_trend_low = low[0]
+    for i in range(2, n):
+        reversal = False
+        if up_trend:
+            psar[i] = psar[i - 1] + af * (up_trend_high - psar[i - 1])
+            if low[i] < psar[i]:
+                reversal = True
+                psar[i] = up_trend_high
+                down_trend_low = low[i]
+                af = step
+            else:
+                if high[i] > up_trend_high:
+                    up_trend_high = high[i]
+                    af = min(af + step, max_step)
+                if low[i - 2] < psar[i]:
+                    psar[i] = low[i - 2]
+                elif low[i - 1] < psar[i]:
+                    psar[i] = low[i - 1]
+        else:
+            psar[i] = psar[i - 1] - af * (psar[i - 1] - down_trend_low)
+            if high[i] > psar[i]:
+                reversal = True
+                psar[i] = down_trend_low
+                up_trend_high = high[i]
+                af = step
+            else:
+                if low[i] < down_trend_low:
+                    down_trend_low = low[i]
+                    af = min(af + step, max_step)
+                if high[i - 2] > psar[i]:
+                    psar[i] = high[i - 2]
+                elif high[i - 1] > psar[i]:
+                    psar[i] = high[i - 1]
+        up_trend = up_trend != reversal
+        if up_trend:
+            up[i] = psar[i]
+        else:
+            down[i] = psar[i]
+    return psar, up, down
+
+
+def _kama_loop(close, sc):
+    n = len(close)
+    kama = np.zeros(n)
+    first = True
+    for i in range(n):
+        if np.isnan(sc[i]):
+            kama[i] = np.nan
+        elif first:
+            kama[i] = close[i]
+            first = False
+        else:
+            kama[i] = kama[i - 1] + sc[i] * (close[i] - kama[i - 1])
+    return kama
+
+
+_kernels = {}
+
+# Below this many rows the plain Python loops finish before numba would have compiled them
+COMPILE_ROWS = 500000
+
+
+def kernel(name, rows=0):
+    """
+    The sequential PSAR ('psar') or KAMA ('kama') loop. It is compiled with numba (imported
+    on first use) once a frame of COMPILE_ROWS rows comes along, and stays compiled after.
+    """
+    func = _kernels.get(name)
+    if func is not None:
+        return func
+    func = {'psar': _psar_loop, 'kama': _kama_loop}[name]
+    if rows < COMPILE_ROWS:
+        return func
+    try:
+        from numba import njit
+        func = njit(cache=False, nogil=True)(func)
+    except ImportError:
+        pass
+    _kernels[name] = func
+    return func
+
+
+# Volume
+
+def _adi(x):
+    return (_fill(np.cumsum(x.clv().values * x.volume.values)),)
+
+
+def _obv(x):
+    volume = x.volume.values
+    signed = np.where(x.close.values < x.prev_close().values, -volume, volume)
+    return (_fill(np.cumsum(signed)),)
+
+
+def _cmf(x):
+    x.cache['mfv'] = x.clv() * x.volume
+    return (_fill(x.rolling('mfv', 20, 'sum').values / x.rolling('volume', 20, 'sum').values),)
+
+
+def _fi(x):
+    x.cache['force'] = (x.close - x.prev_close()) * x.volume
+    return (_fill(x.ema('force', 13).values),)
+
+
+def _em(x):
+    x.cache['emv'] = (x.high.diff(1) + x.low.diff(1)) * (x.high - x.low) / (2 * x.volume) * 100000000
+    return _fill(x.cache['emv'].values), _fill(x.rolling('emv', 14, 'mean').values)
+
+
+def _vpt(x):
+    change = x.close.values / x.prev_close().values - 1.0
+    return (_fill(pd.Series(change * x.volume.values).cumsum().values),)
+
+
+def _vwap(x):
+    x.cache['tp_volume'] = x.typical_price() * x.volume
+    return (_fill(x.rolling('tp_volume', 14, 'sum').values / x.rolling('volume', 14, 'sum').values),)
+
+
+def _mfi(x):
+    tp = x.typical_price().values
+    prev = np.empty_like(tp)
+    prev[0] = np.nan
+    prev[1:] = tp[:-1]
+    direction = np.where(tp > prev, 1, np.where(tp < prev, -1, 0))
+    flow = tp * x.volume.values * direction
+    positive = pd.Series(np.where(flow >= 0, flow, 0.0)).rolling(14, min_periods=0).sum().values
+    negative = pd.Series(np.where(flow < 0, -flow, 0.0)).rolling(14, min_periods=0).sum().values
+    return (_fill(100 - 100 / (1 + positive / negative), 50),)
+
+
+def _nvi(x):
+    close, prev = x.close.values, x.prev_close().values
+    volume = x.volume.values
+    prev_volume = x.volume.shift(1).values
+    growth = np.where(volume < prev_volume, close / prev, 1.0)
+    growth[0] = 1.0
+    return (_fill(1000 * np.cumprod(growth), 1000),)
+
+
+# Volatility
+
+def _bollinger(x):
+    mavg = x.rolling('close', 20, 'mean').values
+    mstd = x.close.rolling(20, min_periods=0).std(ddof=0).values
+    close = x.close.values
+    hband, lband = mavg + 2 * mstd, mavg - 2 * mstd
+    return (_fill(mavg, None), _fill(hband, None), _fill(lband, None),
+            _fill((hband - lband) / mavg * 100), _fill((close - lband) / (hband - lband)),
+            np.where(close > hband, 1.0, 0.0), np.where(close < lband, 1.0, 0.0))
+
+
+def _keltner(x):
+    close = x.close.values
+    mavg = x.rolling('tp', 10, 'mean', 1).values
+    x.cache['tp_high'] = (4 * x.high - 2 * x.low + x.close) / 3.0
+    x.cache['tp_low'] = (-2 * x.high + 4 * x.low + x.close) / 3.0
+    hband = x.rolling('tp_high', 10, 'mean').values
+    lband = x.rolling('tp_low', 10, 'mean').values
+    return (_fill(mavg, None), _fill(hband, None), _fill(lband, None),
+            _fill((hband - lband) / mavg * 100), _fill((close - lband) / (hband - lband)),
+            np.where(close > hband, 1.0, 0.0), np.where(close < lband, 1.0, 0.0))
+
+
+def _donchian(x):
+    hband = x.rolling('high', 20, 'max', 1).values
+    lband = x.rolling('low', 20, 'min', 1).values
+    mavg = x.rolling('close', 20, 'mean', 1).values
+    return (_fill(lband, None), _fill(hband, None), _fill((hband - lband) / 2.0 + lband, None),
+            _fill((hband - lband) / mavg * 100), _fill((x.close.values - lband) / (hband - lband)))
+
+
+def _atr(x):
+    window = 10
+    tr = x.true_range().values
+    atr = np.zeros(len(tr))
+    if len(tr) >= window:
+        atr[window - 1:] = _wilder(tr[:window].mean(), tr[window:], window)
+    return (_fill(atr),)
+
+
+def _ulcer(x):
+    peak = x.rolling('close', 14, 'max', 1)
+    x.cache['ui_sq'] = (100 * (x.close - peak) / peak) ** 2 / 14
+    total = x.rolling('ui_sq', 14, 'sum', 14).values
+    return (_fill(np.sqrt(np.maximum(total, 0.0))),)
+
+
+# Trend
+
+def _macd(x):
+    x.cache['macd'] = x.ema('close', 12) - x.ema('close', 26)
+    signal = x.ema('macd', 9)
+    return _fill(x.cache['macd'].values), _fill(signal.values), _fill((x.cache['macd'] - signal).values)
+
+
+def _sma(x):
+    return x.rolling('close', 12, 'mean').values, x.rolling('close', 26, 'mean').values
+
+
+def _ema_close(x):
+    return x.ema('close', 12).values, x.ema('close', 26).values
+
+
+def _vortex(x):
+    window = 14
+    close_shift = _shift_mean(x.close, 1).values
+    high, low = x.high.values, x.low.values
+    tr = np.fmax(np.fmax(high - low, np.abs(high - close_shift)), np.abs(low - close_shift))
+    trn = pd.Series(tr).rolling(window, min_periods=0).sum().values
+    vmp = pd.Series(np.abs(high - x.low.shift(1).values)).rolling(window, min_periods=0).sum().values
+    vmm = pd.Series(np.abs(low - x.high.shift(1).values)).rolling(window, min_periods=0).sum().values
+    pos, neg = vmp / trn, vmm / trn
+    return _fill(pos, 1), _fill(neg, 1), _fill(pos - neg)
+
+
+def _trix(x):
+    x.cache['trix_ema1'] = x.ema('close', 15)
+    x.cache['trix_ema2'] = x.ema('trix_ema1', 15)
+    ema3 = x.ema('trix_ema2', 15)
+    prev = _shift_mean(ema3, 1)
+    return (_fill(((ema3 - prev) / prev * 100).values),)
+
+
+def _mass_index(x):
+    x.cache['amplitude'] = x.high - x.low
+    x.cache['mass_ema1'] = x.ema('amplitude', 9)
+    x.cache['mass_ratio'] = x.cache['mass_ema1'] / x.ema('mass_ema1', 9)
+    return (_fill(x.rolling('mass_ratio', 25, 'sum').values),)
+
+
+def _dpo(x):
+    return (_fill((_shift_mean(x.close, 11) - x.rolling('close', 20, 'mean')).values),)
+
+
+def _kst(x):
+    total = 0
+    for weight, (roc, window) in enumerate(((10, 10), (15, 10), (20, 10), (30, 15)), 1):
+        shifted = _shift_mean(x.close, roc)
+        x.cache[('kst_roc', roc)] = (x.close - shifted) / shifted
+        total = total + weight * x.rolling(('kst_roc', roc), window, 'mean')
+    x.cache['kst'] = 100 * total
+    signal = x.rolling('kst', 9, 'mean')
+    return _fill(x.cache['kst'].values), _fill(signal.values), _fill((x.cache['kst'] - signal).values)
+
+
+def _ichimoku_lines(x):
+    def compute():
+        conv = 0.5 * (x.rolling('high', 9, 'max') + x.rolling('low', 9, 'min'))
+        base = 0.5 * (x.rolling('high', 26, 'max') + x.rolling('low', 26, 'min'))
+        span_b = 0.5 * (x.rolling('high', 52, 'max') + x.rolling('low', 52, 'min'))
+        return conv, base, 0.5 * (conv + base), span_b
+    return x.get('ichimoku', compute)
+
+
+def _ichimoku(x):
+    return tuple(_fill(line.values, None) for line in _ichimoku_lines(x))
+
+
+def _stc(x):
+    x.cache['stc_macd'] = x.ema('close', 23) - x.ema('close', 50)
+    low, high = x.rolling('stc_macd', 10, 'min', None), x.rolling('stc_macd', 10, 'max', None)
+    x.cache['stc_k'] = 100 * (x.cache['stc_macd'] - low) / (high - low)
+    x.cache['stc_d'] = x.ema('stc_k', 3)
+    low, high = x.rolling('stc_d', 10, 'min', None), x.rolling('stc_d', 10, 'max', None)
+    x.cache['stc_kd'] = 100 * (x.cache['stc_d'] - low) / (high - low)
+    return (_fill(x.ema('stc_kd', 3).values),)
+
+
+def _adx(x):
+    window = 14
+    n = len(x.close)
+    size = n - (window - 1)
+    zeros = np.zeros(n)
+    if size < 2:
+        return zeros, zeros, zeros
+    high, low = x.high.values, x.low.values
+    tr = x.true_range().values
+    up = np.empty(n)
+    down = np.empty(n)
+    up[0] = down[0] = np.nan
+    up[1:] = high[1:] - high[:-1]
+    down[1:] = low[:-1] - low[1:]
+    pos = np.where((up > down) & (up > 0), up, 0.0)
+    neg = np.where((down > up) & (down > 0), down, 0.0)
+
+    def smoothed(values):
+        # ta seeds with the sum of the first `window` values, runs the recursion over
+        # indices 1..size-2 and leaves the last element at zero
+        out = np.zeros(size)
+        out[:size - 1] = _wilder(values[1:window + 1].sum(), window * values[window + 1:n], window)
+        return out
+    trs, dip, din = smoothed(tr), smoothed(pos), smoothed(neg)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dip_ratio = np.where(trs != 0, 100 * dip / trs, 0.0)
+        din_ratio = np.where(trs != 0, 100 * din / trs, 0.0)
+        total = dip_ratio + din_ratio
+        dx = np.where(total != 0, 100 * np.abs(dip_ratio - din_ratio) / total, 0.0)
+    adx = np.zeros(n)
+    if size > window:
+        # ta seeds at index `window` of the smoothed arrays, which sit after window - 1 leading zeros
+        adx[2 * window - 1:] = _wilder(dx[:window].mean(), dx[window:size - 1], window)
+    adx_pos, adx_neg = np.zeros(n), np.zeros(n)
+    inner = trs[1:size - 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        adx_pos[window + 1:] = np.where(inner != 0, 100 * (dip[1:size - 1] / inner), 0.0)
+        adx_neg[window + 1:] = np.where(inner != 0, 100 * (din[1:size - 1] / inner), 0.0)
+    return _fill(adx, 20), _fill(adx_pos, 20), _fill(adx_neg, 20)
+
+
+def _cci(x):
+    tp = x.typical_price()
+    mad = _mean_abs_deviation(tp.values, 20)
+    return (_fill((tp.values - x.rolling('tp', 20, 'mean').values) / (0.015 * mad)),)
+
+
+def _visual_ichimoku(x):
+    conv, base, span_a, span_b = _ichimoku_lines(x)
+    return _fill(_shift_mean(span_a, 26).values, None), _fill(_shift_mean(span_b, 26).values, None)
+
+
+def _aroon(x):
+    window = 25
+    up = _window_arg(x.high.values, window + 1, np.argmax) / window * 100
+    down = _window_arg(x.low.values, window + 1, np.argmin) / window * 100
+    return _fill(up), _fill(down), _fill(up - down)
+
+
+def _psar(x):
+    loop = kernel('psar', len(x.index))
+    psar, up, down = loop(x.high.values.copy(), x.low.values.copy(), x.close.values.copy(), 0.02, 0.2)
+    return _fill(up, None), _fill(down, None), _psar_flags(up), _psar_flags(down)
+
+
+def _psar_flags(values):
+    # 1 on the bar a trend starts: the value is set and the previous one is not
+    flags = np.zeros(len(values))
+    if len(values) > 1:
+        flags[1:] = np.where(~np.isnan(values[1:]) & np.isnan(values[:-1]), 1.0, 0.0)
+    return flags
+
+
+# Momentum
+
+def _rsi_raw(x):
+    def compute():
+        diff = x.close.diff(1)
+        up = diff.where(diff > 0, 0.0)
+        down = -diff.where(diff < 0, 0.0)
+        ema_up = up.ewm(alpha=1 / 14, min_periods=0, adjust=False).mean()
+        ema_down = down.ewm(alpha=1 / 14, min_periods=0, adjust=False).mean()
+        rsi = np.where(ema_down == 0, 100, 100 - 100 / (1 + ema_up / ema_down))
+        return pd.Series(rsi, index=x.index)
+    return x.get('rsi', compute)
+
+
+def _rsi(x):
+    return (_fill(_rsi_raw(x).values, 50),)
+
+
+def _stoch_rsi(x):
+    x.cache['rsi_filled'] = pd.Series(_fill(_rsi_raw(x).values, 50))
+    low, high = x.rolling('rsi_filled', 14, 'min', None), x.rolling('rsi_filled', 14, 'max', None)
+    x.cache['stoch_rsi'] = (x.cache['rsi_filled'] - low) / (high - low)
+    x.cache['stoch_rsi_k'] = x.rolling('stoch_rsi', 3, 'mean', None)
+    d = x.rolling('stoch_rsi_k', 3, 'mean', None)
+    return _fill(x.cache['stoch_rsi'].values), _fill(x.cache['stoch_rsi_k'].values), _fill(d.values)
+
+
+def _tsi(x):
+    x.cache['close_diff'] = x.close - x.prev_close()
+    x.cache['close_diff_abs'] = x.cache['close_diff'].abs()
+    x.cache['tsi_s'] = x.ema('close_diff', 25)
+    x.cache['tsi_a'] = x.ema('close_diff_abs', 25)
+    return (_fill((100 * x.ema('tsi_s', 13) / x.ema('tsi_a', 13)).values),)
+
+
+def _uo(x):
+    x.true_range()
+    x.cache['uo_bp'] = pd.Series(x.close.values - np.minimum(x.low.values, x.prev_close().values), index=x.index)
+    averages = [x.rolling('uo_bp', w, 'sum').values / x.rolling('tr', w, 'sum').values for w in (7, 14, 28)]
+    return (_fill(100.0 * (4.0 * averages[0] + 2.0 * averages[1] + averages[2]) / 7.0, 50),)
+
+
+def _stoch(x):
+    low, high = x.rolling('low', 14, 'min'), x.rolling('high', 14, 'max')
+    x.cache['stoch_k'] = 100 * (x.close - low) / (high - low)
+    return _fill(x.cache['stoch_k'].values, 50), _fill(x.rolling('stoch_k', 3, 'mean').values, 50)
+
+
+def _williams_r(x):
+    high, low = x.rolling('high', 14, 'max').values, x.rolling('low', 14, 'min').values
+    return (_fill(-100 * (high - x.close.values) / (high - low), -50),)
+
+
+def _awesome(x):
+    x.cache['median_price'] = 0.5 * (x.high + x.low)
+    return (_fill((x.rolling('median_price', 5, 'mean') - x.rolling('median_price', 34, 'mean')).values),)
+
+
+def _roc(x):
+    prev = x.close.shift(12).values
+    return (_fill((x.close.values - prev) / prev * 100),)
+
+
+def _percentage_oscillator(x, name):
+    fast, slow = x.ema(name, 12), x.ema(name, 26)
+    key = name + '_ppo'
+    x.cache[key] = (fast - slow) / slow * 100
+    signal = x.ema(key, 9)
+    return _fill(x.cache[key].values), _fill(signal.values), _fill((x.cache[key] - signal).values)
+
+
+def _ppo(x):
+    return _percentage_oscillator(x, 'close')
+
+
+def _pvo(x):
+    return _percentage_oscillator(x, 'volume')
+
+
+def _kama(x):
+    window = 10
+    close = x.close.values
+    volatility = pd.Series(np.abs(close - np.roll(close, 1)))
+    change = np.abs(close - np.roll(close, window))
+    total = volatility.rolling(window, min_periods=0).sum().values
+    ratio = np.divide(change, total, out=np.zeros_like(change), where=total != 0)
+    sc = (ratio * (2.0 / 3 - 2.0 / 31.0) + 2 / 31.0) ** 2.0
+    return (_fill(kernel('kama', len(close))(close.copy(), sc), None),)
+
+
+# Others
+
+def _returns(x):
+    close, prev = x.close.values, x.prev_close().values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_close = np.log(close)
+    dlr = np.empty_like(close)
+    dlr[:1] = np.nan
+    dlr[1:] = np.diff(log_close) * 100
+    cr = (close / close[0] - 1) * 100 if len(close) else close
+    return _fill((close / prev - 1) * 100), _fill(dlr), _fill(cr, None)
+
+
+# Columns of ta.add_all_ta_features, in its order, and the function computing each group
+TA_GROUPS = (
+    (('volume_adi',), _adi),
+    (('volume_obv',), _obv),
+    (('volume_cmf',), _cmf),
+    (('volume_fi',), _fi),
+    (('volume_em', 'volume_sma_em'), _em),
+    (('volume_vpt',), _vpt),
+    (('volume_vwap',), _vwap),
+    (('volume_mfi',), _mfi),
+    (('volume_nvi',), _nvi),
+    (('volatility_bbm', 'volatility_bbh', 'volatility_bbl', 'volatility_bbw', 'volatility_bbp',
+      'volatility_bbhi', 'volatility_bbli'), _bollinger),
+    (('volatility_kcc', 'volatility_kch', 'volatility_kcl', 'volatility_kcw', 'volatility_kcp',
+      'volatility_kchi', 'volatility_kcli'), _keltner),
+    (('volatility_dcl', 'volatility_dch', 'volatility_dcm', 'volatility_dcw', 'volatility_dcp'), _donchian),
+    (('volatility_atr',), _atr),
+    (('volatility_ui',), _ulcer),
+    (('trend_macd', 'trend_macd_signal', 'trend_macd_diff'), _macd),
+    (('trend_sma_fast', 'trend_sma_slow'), _sma),
+    (('trend_ema_fast', 'trend_ema_slow'), _ema_close),
+    (('trend_vortex_ind_pos', 'trend_vortex_ind_neg', 'trend_vortex_ind_diff'), _vortex),
+    (('trend_trix',), _trix),
+    (('trend_mass_index',), _mass_index),
+    (('trend_dpo',), _dpo),
+    (('trend_kst', 'trend_kst_sig', 'trend_kst_diff'), _kst),
+    (('trend_ichimoku_conv', 'trend_ichimoku_base', 'trend_ichimoku_a', 'trend_ichimoku_b'), _ichimoku),
+    (('trend_stc',), _stc),
+    (('trend_adx', 'trend_adx_pos', 'trend_adx_neg'), _adx),
+    (('trend_cci',), _cci),
+    (('trend_visual_ichimoku_a', 'trend_visual_ichimoku_b'), _visual_ichimoku),
+    (('trend_aroon_up', 'trend_aroon_down', 'trend_aroon_ind'), _aroon),
+    (('trend_psar_up', 'trend_psar_down', 'trend_psar_up_indicator', 'trend_psar_down_indicator'), _psar),
+    (('momentum_rsi',), _rsi),
+    (('momentum_stoch_rsi', 'momentum_stoch_rsi_k', 'momentum_stoch_rsi_d'), _stoch_rsi),
+    (('momentum_tsi',), _tsi),
+    (('momentum_uo',), _uo),
+    (('momentum_stoch', 'momentum_stoch_signal'), _stoch),
+    (('momentum_wr',), _williams_r),
+    (('momentum_ao',), _awesome),
+    (('momentum_roc',), _roc),
+    (('momentum_ppo', 'momentum_ppo_signal', 'momentum_ppo_hist'), _ppo),
+    (('momentum_pvo', 'momentum_pvo_signal', 'momentum_pvo_hist'), _pvo),
+    (('momentum_kama',), _kama),
+    (('others_dr', 'others_dlr', 'others_cr'), _returns),
+)
+
+TA_COLUMNS = tuple(column for columns, _ in TA_GROUPS for column in columns)
+
+
+def ta_features(df, high='high', low='low', close='close', volume='volume', colprefix='', columns=None):
+    """
+    The indicators of ta.add_all_ta_features(fillna=True), computed natively.
+
+    Intermediates shared by several indicators (true range, typical price, rolling
+    highs/lows, EMAs of the close) are computed once, the per-window Python loops of
+    ta (CCI, Aroon, ADX) are vectorized and the sequential PSAR/KAMA loops run compiled
+    with numba when it is installed. Results are written into one preallocated float64
+    block. Volume is read as float, so OBV is the signed sum even for unsigned volumes
+    (ta wraps -volume around on uint64 columns).
+
+    Parameters:
+    - df (DataFrame): OHLCV frame.
+    - high, low, close, volume (str): Column names.
+    - colprefix (str): Prefix of the output column names.
+    - columns (list of str, optional): Subset of TA_COLUMNS to compute; groups whose
+      columns are all left out are skipped entirely.
+
+    Returns:
+    - DataFrame with the requested columns (in TA_COLUMNS order) and the index of `df`.
+    """
+    wanted = TA_COLUMNS if columns is None else set(columns)
+    unknown = [c for c in wanted if c not in TA_COLUMNS]
+    if unknown:
+        raise ValueError("Unknown ta columns: %s" % ", ".join(sorted(unknown)))
+    selected = [c for c in TA_COLUMNS if c in wanted]
+    position = {c: i for i, c in enumerate(selected)}
+    # Column-major, so each indicator is one contiguous write and the frame wraps the block as is
+    block = np.empty((len(df), len(selected)), dtype=np.float64, order='F')
+    inputs = _Inputs(df, high, low, close, volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for group, func in TA_GROUPS if len(df) else ():
+            if not any(c in position for c in group):
+                continue
+            for column, values in zip(group, func(inputs)):
+                if column in position:
+                    block[:, position[column]] = values
+    return pd.DataFrame(block, index=df.index, columns=[colprefix + c for c in selected], copy=False)
+
+
+def add_all_ta_features(df, open='open', high='high', low='low', close='close', volume='volume', colprefix='',
+                        columns=None):
+    """
+    Native drop-in for ta.add_all_ta_features(df, ..., fillna=True): `df` with the
+    ta_features() columns appended (existing columns of the same name are replaced).
+    `open` is accepted for signature compatibility; no ta indicator reads it.
+    """
+    features = ta_features(df, high=high, low=low, close=close, volume=volume, colprefix=colprefix,
+                           columns=columns)
+    df = df.drop(columns=[c for c in features.columns if c in df.columns])
+    return pd.concat([df, features], axis=1)
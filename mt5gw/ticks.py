@@ -0,0 +1,272 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from .broker import PRIORITY_QUERY
+from .ringbuffer import RingBuffer
+
+# Row layout of the per-symbol tick rings; spread and ret2 (squared log return
+# of the mid price) are derived on append so window statistics can be updated
+# from the rows leaving the window without recomputing it
+TICK_DTYPE = np.dtype([('time_msc', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'),
+                       ('volume', '<f8'), ('flags', '<u4'), ('spread', '<f8'), ('ret2', '<f8')])
+
+
+class TickStats:
+    """
+    Rolling statistics over the last `window` ticks of a symbol, updated incrementally.
+
+    Sums are adjusted with the rows entering and leaving the window, so an update
+    costs O(new ticks) regardless of the window length; they are recomputed from
+    the window every `capacity` ticks to keep floating-point drift bounded.
+    """
+
+    __slots__ = ('window', 'count', 'spread_sum', 'spread_sq', 'ret2_sum', 'since_exact')
+
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.spread_sum = 0.0
+        self.spread_sq = 0.0
+        self.ret2_sum = 0.0
+        self.since_exact = 0
+
+    def _add(self, rows, sign):
+        spread = rows['spread']
+        self.spread_sum += sign * spread.sum()
+        self.spread_sq += sign * np.dot(spread, spread)
+        self.ret2_sum += sign * rows['ret2'].sum()
+
+    def push(self, ring, spread, ret2):
+        """Account for one row just appended to `ring` (scalar fast path of update())."""
+        self.since_exact += 1
+        if self.since_exact >= ring.capacity:
+            self.recompute(ring)
+            return
+        self.spread_sum += spread
+        self.spread_sq += spread * spread
+        self.ret2_sum += ret2
+        if ring.total > self.window:
+            leaving = ring.view(self.window + 1)[0]
+            old = float(leaving['spread'])
+            self.spread_sum -= old
+            self.spread_sq -= old * old
+            self.ret2_sum -= float(leaving['ret2'])
+        self.count = min(ring.total, self.window)
+
+    def recompute(self, ring):
+        rows = ring.view(self.window)
+        self.count = len(rows)
+        self.spread_sum = self.spread_sq = self.ret2_sum = 0.0
+        self._add(rows, 1.0)
+        self.since_exact = 0
+
+    def update(self, ring, added):
+        """Account for the `added` rows just appended to `ring`."""
+        total, size, w = ring.total, len(ring), self.window
+        before = total - added
+        self.since_exact += added
+        # Global index ranges of rows entering and leaving the window
+        enter_lo = max(before, total - w)
+        leave_lo, leave_hi = max(before - w, 0), min(before, total - w)
+        if self.since_exact >= ring.capacity or (leave_hi > leave_lo and total - leave_lo > size):
+            self.recompute(ring)
+            return
+        self._add(ring.view(total - enter_lo), 1.0)
+        if leave_hi > leave_lo:
+            self._add(ring.view(total - leave_lo)[:leave_hi - leave_lo], -1.0)
+        self.count = min(total, w)
+
+
+class TickSeries:
+    """Tick ring buffer and rolling statistics of one symbol."""
+
+    __slots__ = ('symbol', 'ring', 'stats', 'last_msc', 'last_count', 'last_mid')
+
+    def __init__(self, symbol, capacity, window):
+        self.symbol = symbol
+        self.ring = RingBuffer(capacity, TICK_DTYPE)
+        self.stats = TickStats(window)
+        self.last_msc = None
+        # Ticks stored at last_msc, several ticks can share a millisecond
+        self.last_count = 0
+        self.last_mid = None
+
+    def append(self, ticks):
+        """
+        Append an MT5 ticks array (sorted by time_msc); returns the number of rows stored.
+
+        Ticks up to the last stored millisecond are skipped, except those of that millisecond
+        beyond the ones already stored, so a batch cut inside a millisecond, or a tick added
+        to it between polls, is not lost.
+        """
+        if self.last_msc is not None:
+            times = ticks['time_msc']
+            first, end = np.searchsorted(times, [self.last_msc, self.last_msc + 1])
+            ticks = ticks[first + min(self.last_count, end - first):]
+        n = len(ticks)
+        if n == 0:
+            return 0
+        rows = np.empty(n, dtype=TICK_DTYPE)
+        for field in ('time_msc', 'bid', 'ask', 'last', 'flags'):
+            rows[field] = ticks[field]
+        rows['volume'] = ticks['volume_real'] if 'volume_real' in ticks.dtype.names else ticks['volume']
+        rows['spread'] = rows['ask'] - rows['bid']
+        mid = (rows['bid'] + rows['ask']) * 0.5
+        prev = np.empty(n)
+        prev[0] = mid[0] if self.last_mid is None else self.last_mid
+        prev[1:] = mid[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = np.log(mid / prev)
+        rows['ret2'] = np.where(np.isfinite(ret), ret * ret, 0.0)
+        self.ring.extend(rows)
+        self.stats.update(self.ring, n)
+        last = int(rows['time_msc'][-1])
+        count = n - int(np.searchsorted(rows['time_msc'], last))
+        self.last_count = self.last_count + count if last == self.last_msc else count
+        self.last_msc = last
+        self.last_mid = float(mid[-1])
+        return n
+
+    def append_tick(self, tick):
+        """Append one Tick record (e.g. from symbol_info_tick); returns 1 if stored, 0 if already seen."""
+        if self.last_msc is not None and tick.time_msc <= self.last_msc:
+            return 0
+        bid, ask = tick.bid, tick.ask
+        spread, mid = ask - bid, (bid + ask) * 0.5
+        ret2 = 0.0
+        if self.last_mid is not None and mid > 0 and self.last_mid > 0:
+            ret2 = math.log(mid / self.last_mid) ** 2
+        self.ring.append((tick.time_msc, bid, ask, tick.last, getattr(tick, 'volume_real', tick.volume),
+                          tick.flags, spread, ret2))
+        self.stats.push(self.ring, spread, ret2)
+        self.last_msc = tick.time_msc
+        self.last_count = 1
+        self.last_mid = mid
+        return 1
+
+    def features(self):
+        stats, count = self.stats, self.stats.count
+        result = {'ticks': count, 'spread_mean': np.nan, 'spread_std': np.nan,
+                  'tick_rate': np.nan, 'realized_variance': np.nan, 'realized_vol': np.nan}
+        if count == 0:
+            return result
+        mean = stats.spread_sum / count
+        result['spread_mean'] = mean
+        result['spread_std'] = np.sqrt(max(stats.spread_sq / count - mean * mean, 0.0))
+        times = self.ring.view(count)['time_msc']
+        span = (times[-1] - times[0]) / 1000.0
+        if span > 0:
+            result['tick_rate'] = (count - 1) / span
+        result['realized_variance'] = stats.ret2_sum
+        result['realized_vol'] = np.sqrt(max(stats.ret2_sum, 0.0))
+        return result
+
+
+class TickRecorder(threading.Thread):
+    """
+    Keeps the recent tick history of many symbols in fixed memory.
+
+    Each symbol gets a preallocated RingBuffer of TICK_DTYPE rows: appending is
+    O(1) per tick, windows are zero-copy views and memory is fixed at
+    2 * capacity * 60 bytes per symbol (about 490 KB with the default capacity).
+    Spread mean/std, tick rate and realized variance over the last `window`
+    ticks are maintained incrementally as ticks arrive.
+
+    When run as a thread, every symbol is polled with copy_ticks_from from its
+    last recorded tick, so no ticks between polls are lost. Ticks can also be
+    fed directly with record().
+
+    Parameters:
+    - manager (MetaTraderManager): Gateway to poll.
+    - symbols (list of str): Symbols to record.
+    - capacity (int): Ticks kept per symbol.
+    - window (int): Ticks covered by the rolling features.
+    - interval (float): Seconds between polls when run as a thread.
+    - batch (int): Maximum ticks requested per symbol and poll.
+    """
+
+    def __init__(self, manager, symbols, capacity=4096, window=512, interval=0.1, batch=10000):
+        super().__init__(name="mt5gw-tick-recorder", daemon=True)
+        if window >= capacity:
+            raise ValueError("window must be smaller than capacity")
+        self.manager = manager
+        self.capacity = capacity
+        self.window = window
+        self.interval = interval
+        self.batch = batch
+        self.series = {s: TickSeries(s, capacity, window) for s in symbols}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print("Tick recorder failed: %s" % e)
+            self.stopped.wait(self.interval)
+
+    def poll(self):
+        """Fetch the ticks of every symbol since its last recorded tick; returns the number stored."""
+        mt5 = self.manager.mt5
+        stored = 0
+        # record() may add symbols from other threads while the terminal is queried
+        with self.lock:
+            series_items = list(self.series.items())
+        for symbol, series in series_items:
+            if series.last_msc is None:
+                tick = self.manager.get_last_tick(symbol)
+                if tick is None:
+                    continue
+                start = int(tick.time)
+            else:
+                start = series.last_msc // 1000
+            ticks = self.manager._call(PRIORITY_QUERY, 'copy_ticks_from', symbol, start, self.batch,
+                                       mt5.COPY_TICKS_ALL)
+            if ticks is not None and len(ticks):
+                stored += self.record(symbol, ticks)
+        return stored
+
+    def record(self, symbol, ticks):
+        """Append an MT5 ticks array to `symbol` (added if not recorded yet); returns the rows stored."""
+        with self.lock:
+            series = self.series.get(symbol)
+            if series is None:
+                series = self.series[symbol] = TickSeries(symbol, self.capacity, self.window)
+            return series.append(ticks)
+
+    def record_tick(self, symbol, tick):
+        """Append one Tick record to `symbol` (added if not recorded yet); returns 1 if stored."""
+        with self.lock:
+            series = self.series.get(symbol)
+            if series is None:
+                series = self.series[symbol] = TickSeries(symbol, self.capacity, self.window)
+            return series.append_tick(tick)
+
+    def ticks(self, symbol, n=None):
+        """Newest n ticks of `symbol` (all by default) as a copy of the ring."""
+        with self.lock:
+            return self.series[symbol].ring.view(n).copy()
+
+    def features(self, symbol=None):
+        """
+        Rolling microstructure features.
+
+        Returns:
+        - dict for one symbol, or a DataFrame with one row per symbol when symbol is None:
+          ticks, spread_mean, spread_std, tick_rate (ticks/s), realized_variance and
+          realized_vol (sum of squared mid log returns over the window and its square root).
+        """
+        with self.lock:
+            if symbol is not None:
+                return self.series[symbol].features()
+            rows = {s: series.features() for s, series in self.series.items()}
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def memory_bytes(self):
+        """Total bytes preallocated by the tick rings."""
+        return sum(series.ring.data.nbytes for series in self.series.values())
@@ -0,0 +1,181 @@
+import inspect
+import json
+import threading
+import numpy as np
+from .bars import parse_bar_spec
+from .history import timeframe_seconds
+from .mtf import bucket_bounds
+from .synthetic import DEFAULT_START, synthetic_frame
+
+# build_features() options forced for the probe run
+PROBE_OPTIONS = {'denoise_data': None, 'drop_na': False, 'fill_empty_ranges': False, 'drop_columns': [],
+                 'silent': True, 'profile': None}
+
+# Longest bucket of the higher timeframes whose length varies (see mt5gw.mtf.bucket_bounds)
+LONGEST_BUCKET = {'1m': 31 * 86400}
+
+# Relative difference above which a column counts as depending on bars before its lookback
+RECURSION_TOLERANCE = 1e-6
+
+_cache = {}
+_recursive_cache = {}
+_lock = threading.Lock()
+
+
+def feature_lookbacks(manager, config, timeframe='1min', probe=1024, max_probe=1 << 20):
+    """
+    Leading bars without a value of every column a feature configuration produces.
+
+    The lookback of each feature is measured rather than looked up, so every library
+    (TA-Lib, tulipy, pandas_ta, ta, mtds_ni) and chained features such as lookbacks of
+    indicator columns or higher timeframes are covered alike: build_features() runs on
+    a synthetic probe frame, doubled until every column has a value, and the bars
+    before the first finite value of each column are counted. Columns of mtf_timeframes
+    are raised to the worst block start (see aligned_lookbacks). Results are cached per
+    configuration and timeframe.
+
+    Denoising is not probed, as it transforms the whole series at once.
+
+    Parameters:
+    - manager (MetaTraderManager): Runs build_features().
+    - config (dict): fetch() keyword arguments; options build_features() does not take are ignored.
+    - timeframe (str): Base timeframe.
+    - probe (int): Initial probe length in bars.
+    - max_probe (int): Longest probe; columns still empty then raise a ValueError.
+
+    Returns:
+    - dict of column -> bars.
+    """
+    options, key = probe_options(manager, config, timeframe)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    step = probe_step(timeframe)
+    size = int(probe)
+    while True:
+        rf = manager.build_features(probe_frame(size, step), timeframe=timeframe, **options)
+        lookbacks = first_values(rf)
+        empty = [c for c, bars in lookbacks.items() if bars is None]
+        if not empty:
+            break
+        if size >= max_probe:
+            raise ValueError("Columns without any value after %s bars: %s" % (size, ", ".join(empty)))
+        size *= 2
+    lookbacks = aligned_lookbacks(lookbacks, options.get('mtf_timeframes') or [], DEFAULT_START + step, step)
+    with _lock:
+        _cache[key] = lookbacks
+    return dict(lookbacks)
+
+
+def aligned_lookbacks(lookbacks, timeframes, start, step):
+    """
+    Lookbacks of higher-timeframe columns for a block starting anywhere.
+
+    A block that starts one bar after a higher-timeframe bucket opened drops that whole
+    bucket (see mt5gw.mtf.resample_bars), and calendar buckets ('1m') differ in length, so
+    the probe, which starts at one point of each bucket cycle, can undercount. The complete
+    buckets each column needed in the probe are counted instead, and its lookback becomes
+    the bars up to the last of them after a partial first bucket, every bucket at its longest.
+
+    Parameters:
+    - lookbacks (dict): Column -> bars, measured on a probe starting at `start`.
+    - timeframes (list of str): mtf_timeframes; their columns are prefixed '<timeframe>-'.
+    - start (int): Open time of the first probe bar (Unix seconds).
+    - step (int): Base bar length in seconds.
+
+    Returns:
+    - dict of column -> bars, never below the measured ones.
+    """
+    result = dict(lookbacks)
+    for higher in timeframes:
+        prefix = "%s-" % higher
+        longest = -(-LONGEST_BUCKET.get(higher, timeframe_seconds(higher)) // step)
+        for column, bars in lookbacks.items():
+            if column.startswith(prefix):
+                keys = bucket_bounds(np.array([start, start + bars * step], dtype=np.int64), higher)[0]
+                complete = int(keys[1] - keys[0])
+                result[column] = max(bars, (complete + 1) * longest - 2)
+    return result
+
+
+def recursive_features(manager, config, timeframe='1min', probe=1024):
+    """
+    Columns of a feature configuration whose values depend on bars before their lookback.
+
+    Recursive indicators (EMA family, Wilder smoothing) and cumulative ones (OBV, ADI)
+    only converge towards a run over a longer history, so a run started later (a
+    fetch_chunked block, a shorter download) differs from it after its warm-up. The
+    configuration is run on a probe and on the same probe without its leading bars, and
+    the columns that differ (beyond RECURSION_TOLERANCE) once both have values are returned.
+    Results are cached per configuration and timeframe.
+
+    Parameters: as feature_lookbacks().
+
+    Returns:
+    - sorted list of column names.
+    """
+    options, key = probe_options(manager, config, timeframe)
+    with _lock:
+        cached = _recursive_cache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    step = probe_step(timeframe)
+    cut = max(feature_lookbacks(manager, config, timeframe, probe=probe).values(), default=0) + 1
+    frame = probe_frame(max(int(probe), 4 * cut), step)
+    full = manager.build_features(frame.copy(), timeframe=timeframe, **options)
+    later = manager.build_features(frame.iloc[cut:].copy(), timeframe=timeframe, **options)
+    recursive = []
+    for column, first in first_values(later).items():
+        if first is None or column not in full.columns:
+            continue
+        values = later[column].to_numpy(dtype=np.float64, na_value=np.nan)[first:]
+        reference = full[column].reindex(later.index).to_numpy(dtype=np.float64, na_value=np.nan)[first:]
+        scale = np.nanmax(np.abs(reference), initial=0.0)
+        if not np.allclose(values, reference, rtol=RECURSION_TOLERANCE, atol=RECURSION_TOLERANCE * scale,
+                           equal_nan=True):
+            recursive.append(column)
+    recursive.sort()
+    with _lock:
+        _recursive_cache[key] = recursive
+    return list(recursive)
+
+
+def probe_options(manager, config, timeframe):
+    """build_features() options of a configuration for a probe run, and their cache key."""
+    params = inspect.signature(manager.build_features).parameters
+    options = {k: v for k, v in config.items() if k in params and k not in ('rf', 'instrument', 'timeframe')}
+    options.update(PROBE_OPTIONS)
+    return options, (json.dumps(options, sort_keys=True, default=repr), timeframe)
+
+
+def probe_step(timeframe):
+    """Probe bar length in seconds: the timeframe's, or a minute for bars of no fixed duration."""
+    if timeframe is not None and parse_bar_spec(timeframe) is None:
+        return timeframe_seconds(timeframe)
+    return 60
+
+
+def probe_frame(size, step):
+    """Synthetic probe bars, starting one bar after a day boundary."""
+    return synthetic_frame(size, start=DEFAULT_START + step, step=step)
+
+
+def first_values(rf):
+    """Row of the first finite value of every numeric column of `rf` (None when it has none)."""
+    firsts = {}
+    for column in rf.columns:
+        try:
+            values = rf[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            continue
+        finite = np.isfinite(values)
+        firsts[column] = int(np.argmax(finite)) if finite.any() else None
+    return firsts
+
+
+def required_warmup(manager, config, timeframe='1min', **kwargs):
+    """Bars a configuration needs before its first complete row (see feature_lookbacks)."""
+    return max(feature_lookbacks(manager, config, timeframe, **kwargs).values(), default=0)
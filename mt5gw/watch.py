@@ -0,0 +1,168 @@
+import asyncio
+import threading
+from operator import attrgetter
+import numpy as np
+
+# Fields compared to detect a modified position or order; quote-driven fields
+# (price_current, profit, swap) are left out so ticks alone do not emit events
+POSITION_FIELDS = ('type', 'volume', 'price_open', 'sl', 'tp')
+ORDER_FIELDS = ('type', 'state', 'volume_current', 'price_open', 'price_stoplimit', 'sl', 'tp')
+
+
+class Snapshot:
+    """
+    Positions or orders as a structured array sorted by ticket.
+
+    Parameters:
+    - records (sequence): TradePosition or TradeOrder records from the terminal.
+    - fields (tuple): Fields kept for comparison.
+    """
+
+    def __init__(self, records, fields):
+        records = tuple(records)
+        self.fields = fields
+        dtype = [('ticket', '<i8')] + [(f, '<f8') for f in fields]
+        getter = attrgetter('ticket', *fields)
+        rows = np.array([getter(r) for r in records], dtype=dtype) if records else np.empty(0, dtype=dtype)
+        self.order = np.argsort(rows['ticket'], kind='stable')
+        self.rows = rows[self.order]
+        self.records = records
+
+    def __len__(self):
+        return len(self.rows)
+
+    def record(self, i):
+        """Terminal record of sorted row i."""
+        return self.records[self.order[i]]
+
+    def diff(self, newer):
+        """
+        Compare with a newer snapshot.
+
+        Tickets are matched with one intersect1d call and each compared field is a
+        single vectorized comparison over the matched rows.
+
+        Returns:
+        - (opened, closed, modified, previous): Row indexes of opened entries in newer, of
+          closed entries in self, and of modified entries in newer and in self.
+        """
+        if len(self.rows) == len(newer.rows) and np.array_equal(self.rows, newer.rows):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        _, old_idx, new_idx = np.intersect1d(self.rows['ticket'], newer.rows['ticket'],
+                                             assume_unique=True, return_indices=True)
+        opened = np.setdiff1d(np.arange(len(newer.rows)), new_idx, assume_unique=True)
+        closed = np.setdiff1d(np.arange(len(self.rows)), old_idx, assume_unique=True)
+        changed = np.zeros(len(new_idx), dtype=bool)
+        for f in self.fields:
+            changed |= self.rows[f][old_idx] != newer.rows[f][new_idx]
+        return opened, closed, new_idx[changed], old_idx[changed]
+
+
+class TradeWatcher(threading.Thread):
+    """
+    Change detection for open positions and pending orders.
+
+    Polls positions_get/orders_get, keeps the previous result as a compact
+    array keyed by ticket and emits only 'opened', 'closed' and 'modified'
+    events, so consumers do no work while nothing changes.
+
+    Events are dicts with 'event', 'kind' ('position' or 'order'), 'ticket' and
+    'record' (the terminal record; for 'closed', the last one seen). 'modified'
+    events also carry 'previous' and 'changes' ({field: (old, new)}).
+
+    Parameters:
+    - manager (MetaTraderManager): Gateway to poll.
+    - interval (float): Seconds between polls when run as a thread.
+    - symbol (str, optional): Only watch this symbol.
+    - position_fields, order_fields (tuple): Fields whose change emits 'modified'.
+    """
+
+    def __init__(self, manager, interval=0.1, symbol=None, position_fields=POSITION_FIELDS,
+                 order_fields=ORDER_FIELDS):
+        super().__init__(name="mt5gw-trade-watcher", daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self.symbol = symbol
+        self.fields = {'position': position_fields, 'order': order_fields}
+        self.snapshots = {'position': None, 'order': None}
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def on_change(self, callback):
+        """Call callback(event) for every change event; returns the callback."""
+        with self.lock:
+            self.callbacks.append(callback)
+        return callback
+
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def queue(self, loop=None, maxsize=0):
+        """
+        asyncio.Queue receiving every change event, for use from an event loop.
+
+        Must be called from the loop's thread unless `loop` is given.
+        """
+        loop = loop or asyncio.get_event_loop()
+        events = asyncio.Queue(maxsize=maxsize)
+
+        def forward(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+        self.on_change(forward)
+        return events
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print("Trade watcher failed: %s" % e)
+            self.stopped.wait(self.interval)
+
+    def poll(self):
+        """Take one snapshot of positions and orders, emit and return the change events."""
+        events = self._update('position', self.manager.get_positions(self.symbol))
+        events += self._update('order', self.manager.get_orders(self.symbol))
+        if events:
+            with self.lock:
+                callbacks = list(self.callbacks)
+            for event in events:
+                for callback in callbacks:
+                    callback(event)
+        return events
+
+    def _update(self, kind, records):
+        if records is None:
+            # The terminal returns None on an IPC error, not an empty book: keep the
+            # previous snapshot so a failed poll emits no 'closed' or 'opened' events
+            return []
+        fields = self.fields[kind]
+        newer = Snapshot(records, fields)
+        older = self.snapshots[kind]
+        self.snapshots[kind] = newer
+        if older is None:
+            # First poll establishes the baseline
+            return []
+        opened, closed, modified, previous = older.diff(newer)
+        events = []
+        for i in opened:
+            events.append({'event': 'opened', 'kind': kind, 'ticket': int(newer.rows['ticket'][i]),
+                           'record': newer.record(i)})
+        for i in closed:
+            events.append({'event': 'closed', 'kind': kind, 'ticket': int(older.rows['ticket'][i]),
+                           'record': older.record(i)})
+        for i, j in zip(modified, previous):
+            new_row, old_row = newer.rows[i], older.rows[j]
+            record, previous_record = newer.record(i), older.record(j)
+            changes = {f: (getattr(previous_record, f), getattr(record, f))
+                       for f in fields if old_row[f] != new_row[f]}
+            events.append({'event': 'modified', 'kind': kind, 'ticket': int(new_row['ticket']),
+                           'record': record, 'previous': previous_record, 'changes': changes})
+        return events
@@ -1,9 +1,31 @@
-from flask import Flask, render_template, request, jsonify
+import json
+import queue
+import threading
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from mt5gw import MetaTraderManager  # Your class file
+from mt5gw.live import LiveFeed
 import pandas as pd
 
 app = Flask(__name__)
-manager = MetaTraderManager()
+_state = {}
+_state_lock = threading.Lock()
+
+
+def get_manager():
+    # Created on the first request so importing the app does not attach the terminal
+    with _state_lock:
+        if 'manager' not in _state:
+            _state['manager'] = MetaTraderManager()
+        return _state['manager']
+
+
+def get_feed():
+    manager = get_manager()
+    with _state_lock:
+        if 'feed' not in _state:
+            _state['feed'] = LiveFeed(manager)
+        return _state['feed']
+
 
 @app.route('/')
 def index():
@@ -11,7 +33,7 @@ def index():
 
 @app.route('/symbols')
 def get_symbols():
-    symbols = manager.get_all_symbols_list()
+    symbols = get_manager().get_all_symbols_list()
     return jsonify(symbols)
 
 @app.route('/fetch_data', methods=['POST'])
@@ -74,7 +96,7 @@ def fetch_data():
                 }
 
                 print(f"Method params: {method_params}")
-                df_denoised = manager.fetch(**method_params)
+                df_denoised = get_manager().fetch(**method_params)
 
                 # Store the denoised column with method name for identification
                 for col in df_denoised.columns:
@@ -90,7 +112,7 @@ def fetch_data():
     # Fetch data from MetaTraderManager (without denoising)
     try:
         print("Fetching base data (without denoising)...")
-        df = manager.fetch(**fetch_params)
+        df = get_manager().fetch(**fetch_params)
         print("Columns in dataframe:", df.columns.tolist())
 
         # Convert DataFrame to JSON-compatible format
@@ -115,5 +137,32 @@ def fetch_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/stream')
+def stream():
+    # Server-Sent Events channel for one (instrument, timeframe) pair
+    instrument = request.args.get('instrument')
+    timeframe = request.args.get('timeframe')
+    denoise_methods = request.args.getlist('denoise')
+    try:
+        sub = get_feed().subscribe(instrument, timeframe, denoise_methods=denoise_methods)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def events():
+        try:
+            while True:
+                try:
+                    event = sub.get(timeout=15)
+                except queue.Empty:
+                    # Keep idle connections (closed market) from being dropped by proxies
+                    yield ": keepalive\n\n"
+                    continue
+                yield "event: %s\ndata: %s\n\n" % (event['type'], json.dumps(event))
+        finally:
+            sub.close()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    app.run(debug=True, port=5001, threaded=True)
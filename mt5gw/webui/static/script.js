@@ -102,6 +102,63 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 let ohlcChart, volumeChart;
+let liveSource = null;
+
+// Close the live stream, if any
+function stopLiveUpdates() {
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    }
+}
+
+// Upsert a point into a time-based dataset (replace the last point or append a new one)
+function upsertPoint(dataset, x, y) {
+    const points = dataset.data;
+    const last = points.length > 0 ? points[points.length - 1] : null;
+    if (last && last.x.getTime() === x.getTime()) {
+        last.y = y;
+    } else if (!last || last.x.getTime() < x.getTime()) {
+        points.push({ x: x, y: y });
+    }
+}
+
+// Subscribe to incremental bar updates pushed by the server
+function startLiveUpdates(instrument, timeframe, denoiseMethods) {
+    stopLiveUpdates();
+    const params = new URLSearchParams({ instrument: instrument, timeframe: timeframe });
+    denoiseMethods.forEach(method => params.append('denoise', method));
+    liveSource = new EventSource('/stream?' + params.toString());
+
+    liveSource.addEventListener('bar', function(event) {
+        const payload = JSON.parse(event.data);
+        if (!ohlcChart || !volumeChart) return;
+        payload.bars.forEach(bar => {
+            const x = new Date(bar.time);
+            ohlcChart.data.datasets.forEach(dataset => {
+                switch (dataset.label) {
+                    case 'Close': upsertPoint(dataset, x, bar.close); break;
+                    case 'Open': upsertPoint(dataset, x, bar.open); break;
+                    case 'High': upsertPoint(dataset, x, bar.high); break;
+                    case 'Low': upsertPoint(dataset, x, bar.low); break;
+                    default: {
+                        const method = dataset.label.toLowerCase();
+                        if (bar.denoised && bar.denoised[method] !== undefined) {
+                            upsertPoint(dataset, x, bar.denoised[method]);
+                        }
+                    }
+                }
+            });
+            upsertPoint(volumeChart.data.datasets[0], x, bar.volume);
+        });
+        ohlcChart.update('none');
+        volumeChart.update('none');
+    });
+
+    liveSource.onerror = function(error) {
+        console.error('Live stream error:', error);
+    };
+}
 
 // Function to update denoising settings visibility
 function updateDenoiseSettings() {
@@ -132,6 +189,8 @@ function updateDenoiseSettings() {
 }
 
 function fetchAndPlot() {
+    stopLiveUpdates();
+
     // Destroy existing charts if they exist and have a destroy method
     if (ohlcChart && typeof ohlcChart.destroy === 'function') ohlcChart.destroy();
     if (volumeChart && typeof volumeChart.destroy === 'function') volumeChart.destroy();
@@ -411,6 +470,10 @@ function fetchAndPlot() {
                 }
             }
         });
+
+        if (document.getElementById('live-updates').checked) {
+            startLiveUpdates(instrument, timeframe, requestData.denoise_methods);
+        }
     })
     .catch(error => {
         // Hide loading overlay
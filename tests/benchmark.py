@@ -0,0 +1,454 @@
+"""
+Benchmark suite for the mt5gw feature pipeline.
+
+Every stage runs on seeded synthetic OHLCV data (mt5gw.synthetic), so no terminal
+is needed and runs are comparable across machines and commits. Results are written
+as JSON; pass a previous result file as --baseline to fail (exit code 1) when any
+case got slower than the regression threshold, or was ok in the baseline and now
+fails or no longer runs.
+
+    python tests/benchmark.py --output bench.json
+    python tests/benchmark.py --sizes 1000 10000 --baseline bench.json --threshold 0.2
+"""
+import argparse
+import datetime
+import fnmatch
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from mt5gw import mtds_ni
+from mt5gw.cross_asset import cross_asset_features
+from mt5gw.mt5gw import MetaTraderManager
+from mt5gw.mySSA import mySSA
+from mt5gw.synthetic import SyntheticTerminal, synthetic_frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CONFIG = os.path.join(ROOT, 'samples', 'sample_retrieval.json')
+IMPORT_SCRIPT = ("import json, sys, time; start = time.perf_counter(); import mt5gw; "
+                 "seconds = time.perf_counter() - start; "
+                 "print(json.dumps({'seconds': seconds, 'loaded': sorted(mt5gw.registry.loaded()), "
+                 "'heavy': [m for m in ('MetaTrader5', 'talib', 'ta', 'pandas_ta', 'tulipy', 'pywt', "
+                 "'matplotlib', 'scipy', 'numba') if m in sys.modules]}))")
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+TULIP_INDICATORS = [
+    {"method": "sma", "args": ["c"], "kwargs": {"period": 14}},
+    {"method": "ema", "args": ["c"], "kwargs": {"period": 14}},
+    {"method": "rsi", "args": ["c"], "kwargs": {"period": 14}},
+    {"method": "atr", "args": ["h", "l", "c"], "kwargs": {"period": 14}},
+    {"method": "adx", "args": ["h", "l", "c"], "kwargs": {"period": 14}},
+    {"method": "bbands", "args": ["c"], "kwargs": {"period": 20, "stddev": 2}},
+    {"method": "macd", "args": ["c"], "kwargs": {"short_period": 12, "long_period": 26, "signal_period": 9}},
+    {"method": "stoch", "args": ["h", "l", "c"],
+     "kwargs": {"pct_k_period": 5, "pct_k_slowing_period": 3, "pct_d_period": 3}},
+]
+
+NATIVE_ARGS = {
+    'rvi': ['o', 'h', 'l', 'c'],
+    'supertrend': ['h', 'l', 'c'],
+    'twap': ['o', 'h', 'l', 'c'],
+    'pov': ['c', 'v'],
+    'rsl': ['c'],
+    'ehlers_rpi': ['h', 'l', 'v'],
+    'ultra_wpr': ['h', 'l', 'c'],
+    'ultra_rsi': ['c'],
+    'ssa_forecast': ['c'],
+}
+
+# Native indicators too slow for the largest sizes (one SSA fit per bar)
+NATIVE_MAX_ROWS = {'ssa_forecast': 100000}
+
+CASES = []
+
+
+class Case:
+    """
+    One benchmarked stage.
+
+    Parameters:
+    - name (str): Case name, used in the JSON results and by --cases.
+    - setup (callable): setup(bench, rows) returns the zero-argument callable that is timed.
+    - max_rows (int, optional): Largest size run; bigger sizes are recorded as skipped.
+    - requires (tuple of str): Modules that must be importable, otherwise the case is skipped.
+    """
+
+    def __init__(self, name, setup, max_rows=None, requires=()):
+        self.name = name
+        self.setup = setup
+        self.max_rows = max_rows
+        self.requires = requires
+
+
+def case(name, max_rows=None, requires=()):
+    def register(setup):
+        CASES.append(Case(name, setup, max_rows, requires))
+        return setup
+    return register
+
+
+def optional_module(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+class Bench:
+    """Shared state of a run: the manager on a synthetic terminal and cached input frames."""
+
+    def __init__(self, sizes, seed=0):
+        self.seed = seed
+        self.terminal = SyntheticTerminal(bars=max(sizes) + 1000, ticks=1000, seed=seed)
+        self.manager = MetaTraderManager(terminal=self.terminal)
+        self.frames = {}
+        with open(SAMPLE_CONFIG) as f:
+            self.config = json.load(f)
+
+    def frame(self, rows):
+        """Synthetic OHLCV frame of `rows` bars; callers must copy it before changing it."""
+        frame = self.frames.get(rows)
+        if frame is None:
+            frame = self.frames[rows] = synthetic_frame(rows, seed=self.seed)
+        return frame
+
+    def close(self):
+        self.manager.close()
+
+
+def columns(frame, args):
+    key_map = {'o': 'open', 'h': 'high', 'l': 'low', 'c': 'close', 'v': 'volume'}
+    return [frame[key_map[a]].astype(float) for a in args]
+
+
+@case('add_pivot_levels')
+def bench_pivots(bench, rows):
+    frame = bench.frame(rows)
+    return lambda: bench.manager.add_pivot_levels(frame, num_levels=5)
+
+
+@case('sr_levels')
+def bench_sr_levels(bench, rows):
+    frame = bench.frame(rows)
+    return lambda: bench.manager.build_features(frame.copy(), sr_levels=[5, 10, 20, 50, 100, 200, 500, 1000],
+                                                sr_fields=['open', 'high', 'low', 'close'],
+                                                sr_outputs=['level', 'distance', 'since'], denoise_data=None,
+                                                add_price_summaries=False, drop_na=False, silent=True)
+
+
+def denoise_case(method, max_rows=None, requires=(), **params):
+    @case('denoise_%s' % method, max_rows=max_rows, requires=requires)
+    def bench_denoise(bench, rows):
+        frame = bench.frame(rows)
+        return lambda: bench.manager.denoise_dataframe(frame[['close']].copy(), method=method,
+                                                       apply_columns=['close'], **params)
+    return bench_denoise
+
+
+denoise_case('wavelet')
+denoise_case('kalman', max_rows=100000, requires=('pykalman',))
+denoise_case('ssa', max_rows=100000)
+denoise_case('emd', max_rows=100000, requires=('PyEMD',))
+
+
+def native_case(name, args, max_rows=None):
+    @case('mtds_ni.%s' % name, max_rows=max_rows)
+    def bench_native(bench, rows):
+        inputs = columns(bench.frame(rows), args)
+        func = getattr(mtds_ni, name)
+        return lambda: func(*inputs)
+    return bench_native
+
+
+for _name, _args in NATIVE_ARGS.items():
+    native_case(_name, _args, NATIVE_MAX_ROWS.get(_name))
+
+
+def indicators_case(library_name, config_key=None, indicators=None):
+    @case('add_indicators.%s' % library_name.split('.')[-1], requires=(library_name,))
+    def bench_indicators(bench, rows):
+        library = importlib.import_module(library_name)
+        frame = bench.frame(rows)
+        selected = indicators if indicators is not None else bench.config.get(config_key, [])
+        return lambda: bench.manager.add_indicators(library, selected, frame.copy(), silent=True)
+    return bench_indicators
+
+
+indicators_case('talib', config_key='talib_indicators')
+indicators_case('pandas_ta', config_key='pandasta_indicators')
+indicators_case('tulipy', indicators=TULIP_INDICATORS)
+indicators_case('mt5gw.mtds_ni', config_key='native_indicators')
+
+
+@case('ta_all.ta', max_rows=100000, requires=('ta',))
+def bench_ta_all(bench, rows):
+    # The ta library is only usable through add_all_ta_features (see build_features)
+    frame = bench.frame(rows)
+    return lambda: bench.manager.build_features(frame.copy(), ta_all='ta', denoise_data=None,
+                                                add_price_summaries=False, drop_na=False, silent=True)
+
+
+@case('ta_all.native')
+def bench_ta_all_native(bench, rows):
+    frame = bench.frame(rows)
+    return lambda: bench.manager.build_features(frame.copy(), ta_all=True, denoise_data=None,
+                                                add_price_summaries=False, drop_na=False, silent=True)
+
+
+@case('mtf_fusion')
+def bench_mtf(bench, rows):
+    frame = bench.frame(rows)
+    return lambda: bench.manager.build_features(frame.copy(), timeframe='1min', mtf_timeframes=['15min', '1h', '4h'],
+                                                sr_levels=[10, 50], denoise_data=None, add_price_summaries=False,
+                                                drop_na=False, silent=True)
+
+
+@case('candle_patterns', requires=('talib',))
+def bench_candles(bench, rows):
+    frame = bench.frame(rows)
+    return lambda: bench.manager.build_features(frame.copy(), talib_candle_patterns=True, denoise_data=None,
+                                                add_price_summaries=False, drop_na=False, silent=True)
+
+
+@case('fetch_sample_config')
+def bench_fetch(bench, rows):
+    config = dict(bench.config, bars=rows, silent=True)
+    if optional_module('pandas_ta') is None:
+        config['pandasta_indicators'] = []
+    return lambda: bench.manager.fetch('EURUSD', '1min', **config)
+
+
+@case('multi_instrument_merge')
+def bench_merge(bench, rows):
+    return lambda: bench.manager.fetch(['EURUSD', 'GBPUSD', 'USDJPY'], '1min', bars=rows, denoise_data=None,
+                                       add_price_summaries=False, silent=True)
+
+
+@case('cross_asset_features')
+def bench_cross_asset(bench, rows):
+    # Eight instruments: 28 pairs of correlations, covariances and z-scores, 7 betas
+    closes = np.column_stack([synthetic_frame(rows, seed=bench.seed + k)['close'].to_numpy() for k in range(8)])
+    names = ['S%s' % k for k in range(8)]
+    return lambda: cross_asset_features(closes, names, window=250)
+
+
+@case('mySSA.decompose', max_rows=100000)
+def bench_ssa_decompose(bench, rows):
+    series = bench.frame(rows)['close']
+
+    def run():
+        ssa = mySSA(series)
+        ssa.embed(embedding_dimension=20)
+        ssa.decompose()
+        return ssa
+    return run
+
+
+# Capped like mySSA.decompose, which its setup runs
+@case('mySSA.forecast_recurrent', max_rows=100000)
+def bench_ssa_forecast(bench, rows):
+    ssa = mySSA(bench.frame(rows)['close'])
+    ssa.embed(embedding_dimension=20)
+    ssa.decompose()
+
+    def run():
+        if hasattr(ssa, 'X_com_hat'):
+            del ssa.X_com_hat
+        return ssa.forecast_recurrent(steps_ahead=12)
+    return run
+
+
+def time_import(repeat):
+    """
+    Cold `import mt5gw` time, measured in fresh interpreters (best of `repeat`).
+
+    Returns:
+    - result dict for case 'import mt5gw' (rows 0); 'modules' lists the optional
+      libraries that the import pulled in, which should stay empty.
+    """
+    result = {'case': 'import mt5gw', 'rows': 0, 'seconds': None, 'mean_seconds': None, 'status': 'ok'}
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    timings = []
+    try:
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], env=env, check=True,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            measured = json.loads(out.stdout.strip().splitlines()[-1])
+            timings.append(measured['seconds'])
+        result['seconds'], result['mean_seconds'] = min(timings), sum(timings) / len(timings)
+        result['modules'] = sorted(set(measured['loaded']) | set(measured['heavy']))
+    except (subprocess.CalledProcessError, ValueError) as e:
+        result.update(status='error', error=getattr(e, 'stderr', None) or str(e))
+    return result
+
+
+def time_case(run, repeat):
+    """Best and mean wall time of `repeat` calls, with the garbage collector paused."""
+    timings = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+            gc.collect()
+    finally:
+        if enabled:
+            gc.enable()
+    return min(timings), sum(timings) / len(timings)
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, patterns=None, seed=0, verbose=True):
+    """
+    Run every registered case (or those matching `patterns`) at each size, after
+    timing a cold `import mt5gw`.
+
+    Returns:
+    - list of result dicts with 'case', 'rows', 'seconds' (best of `repeat`), 'mean_seconds'
+      and 'status' ('ok', 'skipped' or 'error', with the reason in 'error').
+    """
+    results = []
+    if not patterns or any(fnmatch.fnmatch('import mt5gw', p) for p in patterns):
+        results.append(time_import(repeat))
+        if verbose:
+            print(format_result(results[-1]))
+    bench = Bench(sizes, seed=seed)
+    try:
+        for c in CASES:
+            if patterns and not any(fnmatch.fnmatch(c.name, p) for p in patterns):
+                continue
+            missing = [m for m in c.requires if optional_module(m) is None]
+            for rows in sizes:
+                result = {'case': c.name, 'rows': rows, 'seconds': None, 'mean_seconds': None, 'status': 'ok'}
+                if missing:
+                    result.update(status='skipped', error='missing %s' % ', '.join(missing))
+                elif c.max_rows is not None and rows > c.max_rows:
+                    result.update(status='skipped', error='above max_rows (%s)' % c.max_rows)
+                else:
+                    try:
+                        result['seconds'], result['mean_seconds'] = time_case(c.setup(bench, rows), repeat)
+                    except Exception as e:
+                        result.update(status='error', error='%s: %s' % (type(e).__name__, e))
+                results.append(result)
+                if verbose:
+                    print(format_result(result))
+    finally:
+        bench.close()
+    return results
+
+
+def format_result(result):
+    if result['status'] == 'ok':
+        outcome = '%10.4fs' % result['seconds']
+    else:
+        outcome = '%s (%s)' % (result['status'], result.get('error', ''))
+    return '%-32s %9d  %s' % (result['case'], result['rows'], outcome)
+
+
+def compare(results, baseline, threshold=0.25, min_seconds=0.005):
+    """
+    Find the cases that got slower than a baseline run, or stopped running.
+
+    A case regresses when its best time exceeds the baseline by more than `threshold`
+    (a fraction: 0.25 is 25% slower) and by more than `min_seconds`, so timer noise on
+    very fast cases is not reported. A case that was ok in the baseline and now fails
+    or is missing from `results` regresses too; pass only the baseline entries the run
+    selected (see selected()). Cases new in `results` are ignored.
+
+    Returns:
+    - list of dicts with 'case', 'rows', 'status' ('slower', 'missing' or the status of the
+      failed run), 'baseline', 'seconds' and 'ratio' (None unless 'slower'), and 'error'.
+    """
+    previous = {(r['case'], r['rows']): r['seconds'] for r in baseline
+                if r.get('status') == 'ok' and r.get('seconds') is not None}
+    current = {(r['case'], r['rows']): r for r in results}
+    regressions = []
+    for key, base in previous.items():
+        r = current.get(key)
+        regression = {'case': key[0], 'rows': key[1], 'baseline': base, 'seconds': None, 'ratio': None,
+                      'error': None}
+        if r is None:
+            regressions.append(dict(regression, status='missing'))
+        elif r['status'] != 'ok':
+            regressions.append(dict(regression, status=r['status'], error=r.get('error')))
+        elif r['seconds'] > base * (1.0 + threshold) and r['seconds'] - base > min_seconds:
+            regressions.append(dict(regression, status='slower', seconds=r['seconds'],
+                                    ratio=r['seconds'] / base))
+    return regressions
+
+
+def selected(result, sizes, patterns=None):
+    """Whether a run with these `sizes` and `patterns` (as run_benchmarks()) includes a result's case."""
+    if result['case'] == 'import mt5gw':
+        return not patterns or any(fnmatch.fnmatch('import mt5gw', p) for p in patterns)
+    return result['rows'] in sizes and (not patterns or any(fnmatch.fnmatch(result['case'], p) for p in patterns))
+
+
+def environment():
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Rows per case.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the best one is kept.')
+    parser.add_argument('--cases', nargs='+', help='Only run cases matching these glob patterns.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', help='Results JSON of a previous run to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown against the baseline, as a fraction (default: 0.25).')
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help='Slowdowns smaller than this are never reported (default: 0.005).')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit.')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('import mt5gw')
+        for c in CASES:
+            print(c.name)
+        return 0
+
+    results = run_benchmarks(sizes=args.sizes, repeat=args.repeat, patterns=args.cases, seed=args.seed)
+    report = {'environment': environment(), 'sizes': args.sizes, 'repeat': args.repeat, 'seed': args.seed,
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print("Results written to %s" % args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = [r for r in json.load(f)['results'] if selected(r, args.sizes, args.cases)]
+        regressions = compare(results, baseline, threshold=args.threshold, min_seconds=args.min_seconds)
+        for r in regressions:
+            if r['status'] == 'slower':
+                print("REGRESSION %-32s %9d  %.4fs -> %.4fs (x%.2f)" % (
+                    r['case'], r['rows'], r['baseline'], r['seconds'], r['ratio']))
+            else:
+                print("REGRESSION %-32s %9d  ok -> %s%s" % (
+                    r['case'], r['rows'], r['status'], ' (%s)' % r['error'] if r['error'] else ''))
+        if regressions:
+            return 1
+        print("No regressions above %.0f%%" % (args.threshold * 100))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Gateway behaviour on the offline SyntheticTerminal: order idempotency errors and
+tick recording.
+
+Run with `python -m pytest tests/test_gateway.py` (no terminal needed).
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from mt5gw.broker import PRIORITY_ORDER
+from mt5gw.mt5gw import MetaTraderManager
+from mt5gw.synthetic import TICKS_DTYPE, SyntheticTerminal
+from mt5gw.ticks import TickSeries
+
+
+@pytest.fixture
+def manager():
+    mt = MetaTraderManager(terminal=SyntheticTerminal(bars=100, ticks=100))
+    yield mt
+    mt.close()
+
+
+def test_place_order_in_flight_key_reaches_caller(manager):
+    order = {'instrument': 'EURUSD', 'order_type': 'buy_market', 'lot_size': 0.1, 'idempotency_key': 'k'}
+    # Another caller is sending the same key
+    manager.orders.in_flight['k'] = threading.Event()
+    # On the broker thread, as AsyncMetaTraderManager.place_order runs it
+    with pytest.raises(RuntimeError, match="already being sent"):
+        manager.broker.call(PRIORITY_ORDER, manager.place_order, order)
+
+
+def test_ticks_split_inside_a_millisecond():
+    ticks = np.zeros(5, dtype=TICKS_DTYPE)
+    ticks['time_msc'] = [1000, 1001, 1001, 1001, 1002]
+    ticks['bid'] = 1.0 + np.arange(5) * 1e-5
+    ticks['ask'] = ticks['bid'] + 2e-5
+    series = TickSeries('EURUSD', 16, 4)
+    # The first poll is cut inside millisecond 1001, the next one starts from the same second again
+    assert series.append(ticks[:2]) == 2
+    assert series.append(ticks) == 3
+    assert series.append(ticks) == 0
+    np.testing.assert_array_equal(series.ring.view()['bid'], ticks['bid'])
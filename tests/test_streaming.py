@@ -0,0 +1,113 @@
+"""
+Parity of the streaming indicators (mt5gw.streaming) with the batch mtds_ni functions:
+bars are replayed one by one and every output is compared with the batch result.
+
+Run with `python -m pytest tests/test_streaming.py` (needs TA-Lib, no terminal).
+"""
+import numpy as np
+import pytest
+
+talib = pytest.importorskip('talib')
+
+from mt5gw import mtds_ni, streaming  # noqa: E402
+
+BARS = 3000
+METHODS = ['EMA', 'SMA', 'WMA', 'DEMA', 'T3', 'KAMA', 'TRIMA']
+# Same recurrences as TA-Lib, but its C build may round some of them differently in the last bits
+RTOL = 1e-10
+
+
+@pytest.fixture(scope='module')
+def bars():
+    rng = np.random.default_rng(7)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-3, BARS))
+    open = np.r_[close[0], close[:-1]] + rng.normal(0, 2e-4, BARS)
+    high = np.maximum(open, close) + rng.random(BARS) * 1e-3
+    low = np.minimum(open, close) - rng.random(BARS) * 1e-3
+    # Flat stretch: zero ranges and no price change
+    open[1000:1020] = high[1000:1020] = low[1000:1020] = close[1000:1020] = close[999]
+    volume = rng.integers(1, 500, BARS).astype(np.float64)
+    return {'open': open, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+def assert_parity(streamed, batch, rtol=0.0, atol=0.0):
+    streamed = streamed if isinstance(streamed, tuple) else (streamed,)
+    batch = batch if isinstance(batch, tuple) else (batch,)
+    assert len(streamed) == len(batch)
+    for s, b in zip(streamed, batch):
+        np.testing.assert_allclose(s, np.asarray(b, dtype=np.float64), rtol=rtol, atol=atol, equal_nan=True)
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('period', [2, 5, 14])
+def test_smoothers(bars, method, period):
+    close = bars['close']
+    # Leading NaN values are skipped, as TA-Lib does
+    series = np.r_[np.full(7, np.nan), close]
+    exact = method in ('EMA', 'SMA', 'DEMA')
+    assert_parity(streaming.smoother(method, period).replay(series),
+                  mtds_ni.apply_smoothing(series, method=method, period=period),
+                  rtol=0.0 if exact else RTOL)
+
+
+def test_unknown_smoother():
+    with pytest.raises(ValueError):
+        streaming.smoother('HMA', 5)
+
+
+@pytest.mark.parametrize('period', [2, 14])
+def test_oscillators(bars, period):
+    h, l, c = bars['high'], bars['low'], bars['close']
+    assert_parity(streaming.RSI(period).replay(c), talib.RSI(c, timeperiod=period))
+    assert_parity(streaming.WILLR(period).replay(h, l, c), talib.WILLR(h, l, c, timeperiod=period))
+    assert_parity(streaming.ATR(period).replay(h, l, c), talib.ATR(h, l, c, timeperiod=period), rtol=RTOL)
+
+
+def test_rvi(bars):
+    o, h, l, c = bars['open'], bars['high'], bars['low'], bars['close']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        batch = mtds_ni.rvi(o, h, l, c)
+    assert_parity(streaming.RVI().replay(o, h, l, c), batch)
+
+
+def test_supertrend(bars):
+    h, l, c = bars['high'], bars['low'], bars['close']
+    assert_parity(streaming.SuperTrend().replay(h, l, c), mtds_ni.supertrend(h, l, c), rtol=RTOL)
+    assert_parity(streaming.SuperTrend(2, 7).replay(h, l, c), mtds_ni.supertrend(h, l, c, 2, 7), rtol=RTOL)
+
+
+@pytest.mark.parametrize('ratio', [True, False])
+def test_twap(bars, ratio):
+    o, h, l, c = bars['open'], bars['high'], bars['low'], bars['close']
+    assert_parity(streaming.TWAP(ratio).replay(o, h, l, c), mtds_ni.twap(o, h, l, c, ratio=ratio))
+
+
+def test_pov_rsl(bars):
+    c, v = bars['close'], bars['volume']
+    assert_parity(streaming.POV().replay(c, v), mtds_ni.pov(c, v))
+    assert_parity(streaming.RSL().replay(c), mtds_ni.rsl(c))
+    assert_parity(streaming.RSL(10, 'EMA').replay(c), mtds_ni.rsl(c, 10, 'EMA'))
+    assert_parity(streaming.RSL(10, 'WMA').replay(c), mtds_ni.rsl(c, 10, 'WMA'), rtol=RTOL)
+
+
+def test_ehlers_rpi(bars):
+    h, l, v = bars['high'], bars['low'], bars['volume']
+    # The filter bank is evaluated with array operations instead of a loop per period
+    assert_parity(streaming.EhlersRPI().replay(h, l, v), mtds_ni.ehlers_rpi(h, l, v), rtol=1e-9)
+
+
+@pytest.mark.parametrize('kwargs, atol', [({}, 0.0), ({'W_Method': 'SMA', 'Step': 3}, 0.0),
+                                          ({'SmoothMethod': 'DEMA', 'SmoothLength': 4}, 1e-12)])
+def test_ultra(bars, kwargs, atol):
+    # Counts compare consecutive smoothed values, so they are only reproduced with bit-exact smoothing
+    h, l, c = bars['high'], bars['low'], bars['close']
+    assert_parity(streaming.UltraRSI(**kwargs).replay(c), mtds_ni.ultra_rsi(c, **kwargs), atol=atol)
+    assert_parity(streaming.UltraWPR(**kwargs).replay(h, l, c), mtds_ni.ultra_wpr(h, l, c, **kwargs), atol=atol)
+
+
+def test_update_bar_and_state(bars):
+    indicator = streaming.SuperTrend()
+    row = {k: v[0] for k, v in bars.items()}
+    assert indicator.update_bar(row) == 0.0
+    # Only the running state is kept
+    assert not hasattr(indicator, '__dict__')